@@ -1,5 +1,6 @@
 from django.contrib import admin
 from datetime import datetime, timedelta
+from .slots import lazy_availability
 from .models import Activity, Period, Included, Excluded, Faq, Catalog, ActivityOffer
 
 # inlines are used to make adding one to many relationship on the
@@ -53,8 +54,10 @@ class ActivityAdmin(admin.ModelAdmin):
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
         # At this point, all the related objects (ActivityOffers) are saved
-        if not change:  # If the activity is being created
-            form.instance.create_periods()
+        # If the activity is being created, lazy mode computes periods on read
+        if not change and not lazy_availability():
+            created = form.instance.create_periods()
+            self.message_user(request, f"{created} periods created")
 
 
 admin.site.register(Period)
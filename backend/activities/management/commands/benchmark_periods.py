@@ -0,0 +1,97 @@
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from activities.models import Activity, ActivityOffer, Period
+from location.models import Location
+from users.models import CustomUser, Supplier
+
+
+class Rollback(Exception):
+    pass
+
+
+# the per-row loop create_periods used before the bulk slot generation,
+# kept here only to compare against
+def legacy_create_periods(activity):
+    for offer in activity.offers.all():
+        current_date = activity.available_from
+        period_duration = timedelta(minutes=activity.period)
+        while current_date <= activity.available_to:
+            period_start_time = datetime.combine(current_date, activity.start_time)
+            period_end_time = period_start_time + period_duration
+            while period_end_time.time() <= activity.end_time:
+                Period.objects.create(
+                    day=current_date,
+                    time_from=period_start_time.time(),
+                    time_to=period_end_time.time(),
+                    stock=offer.stock,
+                    activity_offer=offer,
+                )
+                period_start_time = period_end_time
+                period_end_time = period_start_time + period_duration
+            current_date += timedelta(days=1)
+    return Period.objects.filter(activity_offer__activity=activity).count()
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy per-row period generation with the bulk one"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--period", type=int, default=30, help="minutes")
+        parser.add_argument("--offers", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--skip-legacy", action="store_true", help="only time the bulk path"
+        )
+
+    def handle(self, *args, **options):
+        if not options["skip_legacy"]:
+            self.run("legacy", legacy_create_periods, options)
+        self.run(
+            "bulk",
+            lambda activity: activity.create_periods(batch_size=options["batch_size"]),
+            options,
+        )
+
+    # everything is created inside a transaction that is rolled back so
+    # the benchmark never leaves rows behind
+    def run(self, label, generate, options):
+        try:
+            with transaction.atomic():
+                activity = self.make_activity(options)
+                started = time.perf_counter()
+                created = generate(activity)
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(
+            f"{label}: {created} periods in {elapsed:.2f}s "
+            f"({created / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+
+    def make_activity(self, options):
+        user = CustomUser.objects.create(username="benchmark_periods_supplier")
+        supplier = Supplier.objects.create(user=user)
+        location = Location.objects.create(name="benchmark")
+        available_from = date.today()
+        activity = Activity.objects.create(
+            supplier=supplier,
+            location=location,
+            title="benchmark",
+            description="benchmark",
+            price=0,
+            available_from=available_from,
+            available_to=available_from + timedelta(days=options["days"] - 1),
+            period=options["period"],
+            unit="person",
+            start_time=dtime(8, 0),
+            end_time=dtime(20, 0),
+        )
+        for index in range(options["offers"]):
+            ActivityOffer.objects.create(
+                activity=activity, title=f"offer {index}", price=0, stock=10
+            )
+        return activity
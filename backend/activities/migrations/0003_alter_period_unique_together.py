@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:35
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe_periods(apps, schema_editor):
+    # a slot stored twice for the same offer keeps its first row with the
+    # lowest stock of the two, the bookings of the others move to it
+    Period = apps.get_model("activities", "Period")
+    ActivityBooking = apps.get_model("booking", "ActivityBooking")
+    duplicates = (
+        Period.objects.order_by()
+        .values("activity_offer", "day", "time_from")
+        .annotate(count=Count("pk"), keep=Min("pk"), stock=Min("stock"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        others = Period.objects.filter(
+            activity_offer=row["activity_offer"],
+            day=row["day"],
+            time_from=row["time_from"],
+        ).exclude(pk=row["keep"])
+        ActivityBooking.objects.filter(period__in=others).update(period=row["keep"])
+        others.delete()
+        Period.objects.filter(pk=row["keep"]).update(stock=row["stock"])
+
+
+class Migration(migrations.Migration):
+    # the rows are merged in their own transaction, Postgres refuses to
+    # alter a table with pending foreign key checks
+    atomic = False
+
+    dependencies = [
+        ('activities', '0002_initial'),
+        ('booking', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            dedupe_periods, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AlterUniqueTogether(
+            name='period',
+            unique_together={('activity_offer', 'day', 'time_from')},
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0003_alter_period_unique_together"),
+        ("categories", "0001_initial"),
+        ("location", "0001_initial"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["created_at", "id"], name="activity_created_idx"
+            ),
+        ),
+    ]
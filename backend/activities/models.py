@@ -2,7 +2,9 @@ from django.db import models
 from users.models import Supplier
 from categories.models import Category
 from location.models import Location
-from datetime import datetime, timedelta
+from django.db import transaction
+from itertools import islice
+from .slots import build_slot_grid, is_open_day, iter_slot_times
 
 
 class Activity(models.Model):
@@ -44,34 +46,41 @@ class Activity(models.Model):
 
     class Meta:
         verbose_name_plural = "activities"
+        # the keyset order of the paginated listings
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="activity_created_idx")
+        ]
 
     def __str__(self):
         return self.title
-    def create_periods(self):
-        offers = self.offers.all()  # Use the related name to get the offers
-        for offer in offers:
-            current_date = self.available_from
-            delta = timedelta(days=1)
-            period_duration = timedelta(minutes=self.period)
-
-            activity_start_time = self.start_time
-            activity_end_time = self.end_time
-
-            while current_date <= self.available_to:
-                period_start_time = datetime.combine(current_date, activity_start_time)
-                period_end_time = period_start_time + period_duration
-
-                while period_end_time.time() <= activity_end_time:
-                    Period.objects.create(
-                        day=current_date,
-                        time_from=period_start_time.time(),
-                        time_to=period_end_time.time(),
-                        stock=offer.stock,
-                        activity_offer=offer,
-                    )
-                    period_start_time = period_end_time
-                    period_end_time = period_start_time + period_duration
-                current_date += delta
+
+    def create_periods(self, batch_size=1000):
+        """
+        Generate the Period rows of every offer in one transaction using
+        chunked bulk inserts, returns the number of created rows.
+        """
+        offers = list(self.offers.all())  # Use the related name to get the offers
+        slot_grid = build_slot_grid(self)
+        periods = (
+            Period(
+                day=day,
+                time_from=time_from,
+                time_to=time_to,
+                stock=offer.stock,
+                activity_offer=offer,
+            )
+            for offer in offers
+            for day, time_from, time_to in slot_grid
+        )
+        created = 0
+        with transaction.atomic():
+            while True:
+                batch = list(islice(periods, batch_size))
+                if not batch:
+                    break
+                Period.objects.bulk_create(batch)
+                created += len(batch)
+        return created
 
 
 class ActivityOffer(models.Model):
@@ -85,6 +94,48 @@ class ActivityOffer(models.Model):
     def __str__(self):
         return f"{self.activity.title} - {self.title}"
 
+    def get_periods(self, day):
+        """
+        Periods of a day computed from the activity rules, the stored rows
+        (booked or with an overridden stock) take the place of their slot.
+        """
+        activity = self.activity
+        periods = {period.time_from: period for period in self.periods.filter(day=day)}
+        if is_open_day(
+            day, activity.available_from, activity.available_to, activity.days_off
+        ):
+            for time_from, time_to in iter_slot_times(
+                day, activity.start_time, activity.end_time, activity.period
+            ):
+                periods.setdefault(
+                    time_from,
+                    Period(
+                        day=day,
+                        time_from=time_from,
+                        time_to=time_to,
+                        stock=self.stock,
+                        activity_offer=self,
+                    ),
+                )
+        return sorted(periods.values(), key=lambda period: period.time_from)
+
+    def get_or_create_period(self, day, time_from):
+        """
+        Store the period of a computed slot so it can be booked, raises
+        Period.DoesNotExist if the slot is not part of the activity rules.
+        """
+        for period in self.get_periods(day):
+            if period.time_from == time_from:
+                if period.pk is None:
+                    period, _ = Period.objects.get_or_create(
+                        activity_offer=self,
+                        day=day,
+                        time_from=time_from,
+                        defaults={"time_to": period.time_to, "stock": self.stock},
+                    )
+                return period
+        raise Period.DoesNotExist
+
 
 class Period(models.Model):
     day = models.DateField()
@@ -95,6 +146,9 @@ class Period(models.Model):
         ActivityOffer, on_delete=models.CASCADE, related_name="periods"
     )
 
+    class Meta:
+        unique_together = ("activity_offer", "day", "time_from")
+
 
 class Included(models.Model):
     include = models.CharField(max_length=350)
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from django.db.models import Min
 from .models import Activity, Period, Included, Excluded, Faq, Catalog, ActivityOffer
 from users.models import Supplier
 from categories.models import Category
 from location.serializers import LocationSerializer
+from api.query_plan import QueryPlanMixin
 
 
 class IncludedSerializer(serializers.ModelSerializer):
@@ -78,7 +80,7 @@ class OffActivitySerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
 
-class ActivityOfferSerializer(serializers.ModelSerializer):
+class ActivityOfferSerializer(QueryPlanMixin, serializers.ModelSerializer):
     activity = OffActivitySerializer()
 
     class Meta:
@@ -88,7 +90,7 @@ class ActivityOfferSerializer(serializers.ModelSerializer):
 
 # here the fields are hardwritten one by one so in case we
 # wanted to exclude something from the fields
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(QueryPlanMixin, serializers.ModelSerializer):
     included_items = IncludedSerializer(
         many=True, read_only=True, source="included_set"
     )
@@ -145,3 +147,35 @@ class PeriodSerializer(serializers.ModelSerializer):
     class Meta:
         model = Period
         fields = "__all__"
+
+
+# card representation for the listing endpoints, the detail endpoint is the
+# only one that needs the fully nested ActivitySerializer
+class ActivityListSerializer(QueryPlanMixin, serializers.ModelSerializer):
+    location = LocationSerializer()
+    min_offer_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Activity
+        fields = [
+            "id",
+            "title",
+            "image",
+            "price",
+            "location",
+            "featured",
+            "available_to",
+            "unit",
+            "categories",
+            "min_offer_price",
+        ]
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        return (
+            super()
+            .setup_queryset(queryset)
+            .annotate(min_offer_price=Min("offers__price"))
+        )
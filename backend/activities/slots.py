@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+
+
+# comma separated week days, e.g. "Saturday, sunday"
+def parse_days_off(days_off):
+    if not days_off:
+        return set()
+    return {day.strip().lower() for day in days_off.split(",") if day.strip()}
+
+
+def iter_open_days(available_from, available_to, days_off=None):
+    closed = parse_days_off(days_off)
+    current_day = available_from
+    while current_day <= available_to:
+        if current_day.strftime("%A").lower() not in closed:
+            yield current_day
+        current_day += timedelta(days=1)
+
+
+# slots of `period` minutes between start_time and end_time for one day,
+# a slot never goes past end_time (nor wraps around midnight)
+def iter_slot_times(day, start_time, end_time, period):
+    if not period:
+        return
+    period_duration = timedelta(minutes=period)
+    slot_start = datetime.combine(day, start_time)
+    day_end = datetime.combine(day, end_time)
+    while slot_start + period_duration <= day_end:
+        slot_end = slot_start + period_duration
+        yield slot_start.time(), slot_end.time()
+        slot_start = slot_end
+
+
+def build_slot_grid(activity):
+    """
+    Compute every (day, time_from, time_to) slot of an activity in memory.
+    The daily slot times are the same for every open day so they are
+    computed once and reused.
+    """
+    days = list(
+        iter_open_days(activity.available_from, activity.available_to, activity.days_off)
+    )
+    if not days:
+        return []
+    daily_slots = list(
+        iter_slot_times(days[0], activity.start_time, activity.end_time, activity.period)
+    )
+    return [
+        (day, time_from, time_to) for day in days for time_from, time_to in daily_slots
+    ]
+
+
+def is_open_day(day, available_from, available_to, days_off=None):
+    return (
+        available_from <= day <= available_to
+        and day.strftime("%A").lower() not in parse_days_off(days_off)
+    )
+
+
+# "lazy" availability computes the slots from the offer rules when they are
+# read and only stores a row once it gets booked or its stock is overridden
+def lazy_availability():
+    return getattr(settings, "AVAILABILITY_MODE", "materialized") == "lazy"
@@ -1,3 +1,114 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api.testing import make_activity, make_supplier
+from .models import ActivityOffer, Period
+from .slots import build_slot_grid, iter_open_days, iter_slot_times
 
-# Create your tests here.
+# monday 1 to sunday 7 of January 2024
+MONDAY = date(2024, 1, 1)
+SUNDAY = date(2024, 1, 7)
+
+
+class SlotTests(TestCase):
+    def test_days_off_are_skipped(self):
+        days = list(iter_open_days(MONDAY, SUNDAY, "Saturday, sunday"))
+
+        self.assertEqual([day.day for day in days], [1, 2, 3, 4, 5])
+        self.assertEqual(len(list(iter_open_days(MONDAY, SUNDAY))), 7)
+        self.assertEqual(list(iter_open_days(SUNDAY, MONDAY)), [])
+
+    def test_the_last_slot_ends_by_the_end_time(self):
+        slots = list(iter_slot_times(MONDAY, time(8), time(10), 60))
+        self.assertEqual(slots, [(time(8), time(9)), (time(9), time(10))])
+
+        # a slot that would go past the end time is left out
+        slots = list(iter_slot_times(MONDAY, time(8), time(10, 30), 60))
+        self.assertEqual(slots[-1], (time(9), time(10)))
+        # and so is one that would wrap around midnight
+        slots = list(iter_slot_times(MONDAY, time(22), time(23, 59), 60))
+        self.assertEqual(slots, [(time(22), time(23))])
+        self.assertEqual(list(iter_slot_times(MONDAY, time(8), time(10), 0)), [])
+
+    def test_slot_grid(self):
+        activity = make_activity(
+            make_supplier(),
+            available_from=MONDAY,
+            available_to=SUNDAY,
+            days_off="wednesday",
+            start_time=time(8),
+            end_time=time(11),
+        )
+
+        grid = build_slot_grid(activity)
+
+        self.assertEqual(len(grid), 6 * 3)
+        self.assertNotIn(date(2024, 1, 3), {day for day, _, _ in grid})
+        self.assertEqual(grid[-1], (SUNDAY, time(10), time(11)))
+
+    def test_create_periods_in_batches(self):
+        activity = make_activity(
+            make_supplier(),
+            available_from=MONDAY,
+            available_to=SUNDAY,
+            start_time=time(8),
+            end_time=time(11),
+        )
+        for title, stock in [("Standard", 5), ("Private", 1)]:
+            ActivityOffer.objects.create(
+                activity=activity, title=title, price=10, stock=stock
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            created = activity.create_periods(batch_size=10)
+
+        # 2 offers * 7 days * 3 slots
+        self.assertEqual(created, 42)
+        inserts = [query for query in queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 5)
+        self.assertEqual(Period.objects.count(), 42)
+        self.assertEqual(
+            Period.objects.filter(activity_offer__title="Private", stock=1).count(),
+            21,
+        )
+
+
+class AvailabilityModeTests(TestCase):
+    def periods(self, offer, day):
+        url = reverse("get_daily_periods", kwargs={"offer_id": offer.pk, "day": day})
+        return [
+            (period["day"], period["time_from"], period["time_to"], period["stock"])
+            for period in APIClient().get(url).data
+        ]
+
+    def test_lazy_slots_match_the_stored_ones(self):
+        activity = make_activity(
+            make_supplier(),
+            available_from=MONDAY,
+            available_to=SUNDAY,
+            days_off="sunday",
+            start_time=time(8),
+            end_time=time(10, 30),
+        )
+        offer = ActivityOffer.objects.create(
+            activity=activity, title="Standard", price=10, stock=5
+        )
+        # the days around the range and the day off have no slot
+        days = [MONDAY + timedelta(days=offset) for offset in range(-1, 8)]
+
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            lazy = [self.periods(offer, day) for day in days]
+        activity.create_periods()
+        stored = [self.periods(offer, day) for day in days]
+
+        self.assertEqual(lazy, stored)
+        self.assertEqual(sum(map(len, stored)), 6 * 2)
+        # a slot without stock left is not offered in either mode
+        Period.objects.filter(day=MONDAY, time_from=time(8)).update(stock=0)
+        stored = self.periods(offer, MONDAY)
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            self.assertEqual(self.periods(offer, MONDAY), stored)
+        self.assertEqual(len(stored), 1)
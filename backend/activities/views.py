@@ -1,10 +1,18 @@
-from .models import Activity, Period, ActivityOffer
-from .serializers import ActivitySerializer, PeriodSerializer, ActivityOfferSerializer
+from .models import Activity, ActivityOffer
+from .serializers import (
+    ActivitySerializer,
+    ActivityListSerializer,
+    PeriodSerializer,
+    ActivityOfferSerializer,
+)
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
+from datetime import datetime
+from .slots import lazy_availability
+from api.filters import filtered_response
 
 
 @api_view(["GET"])
@@ -17,7 +25,9 @@ def get_offers_by_activity(request, activity_id):
             {"error": "Activity not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
-    offers = ActivityOffer.objects.filter(activity=activity)
+    offers = ActivityOfferSerializer.setup_queryset(
+        ActivityOffer.objects.filter(activity=activity)
+    )
     serializer = ActivityOfferSerializer(offers, many=True)
     return Response(serializer.data)
 
@@ -29,14 +39,13 @@ def get_all_activities(request):
     current_time = timezone.now()
     # exclude items that their time has passed
     activities = Activity.objects.filter(available_to__gte=current_time)
-    serializer = ActivitySerializer(activities, many=True)
-    return Response(serializer.data)
+    return filtered_response(request, activities, ActivityListSerializer)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_activity(request, pk):
-    activity = Activity.objects.get(pk=pk)
+    activity = ActivitySerializer.setup_queryset(Activity.objects).get(pk=pk)
     serializer = ActivitySerializer(activity)
     return Response(serializer.data)
 
@@ -46,8 +55,10 @@ def get_activity(request, pk):
 @permission_classes([AllowAny])
 def get_activities(request):
     current_time = timezone.now()
-    activities = Activity.objects.filter(available_to__gte=current_time)[:20]
-    serializer = ActivitySerializer(activities, many=True)
+    activities = ActivityListSerializer.setup_queryset(
+        Activity.objects.filter(available_to__gte=current_time)
+    )[:20]
+    serializer = ActivityListSerializer(activities, many=True)
     return Response(serializer.data)
 
 
@@ -55,10 +66,23 @@ def get_activities(request):
 @permission_classes([AllowAny])
 def get_periods_by_offer_and_day(request, offer_id, day):
     try:
-        offer = ActivityOffer.objects.get(pk=offer_id)
+        offer = ActivityOfferSerializer.setup_queryset(ActivityOffer.objects).get(
+            pk=offer_id
+        )
     except ActivityOffer.DoesNotExist:
         return Response({"error": "Offer not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    periods = Period.objects.filter(activity_offer=offer, day=day, stock__gt=0)
+    if lazy_availability():
+        try:
+            day = datetime.strptime(day, "%Y-%m-%d").date()
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        periods = [period for period in offer.get_periods(day) if period.stock > 0]
+    else:
+        # through the offer so the periods reuse it instead of loading it again
+        periods = offer.periods.filter(day=day, stock__gt=0)
     serializer = PeriodSerializer(periods, many=True)
     return Response(serializer.data)
@@ -0,0 +1,34 @@
+from activities.models import Activity
+from activities.serializers import ActivityListSerializer
+from packages.models import Package
+from packages.serializers import PackageListSerializer
+from tours.models import Tour
+from tours.serializers import TourListSerializer
+
+# model and card serializer of every kind of item
+CARDS = {
+    "activity": (Activity, ActivityListSerializer),
+    "tour": (Tour, TourListSerializer),
+    "package": (Package, PackageListSerializer),
+}
+
+
+def serialize_cards(hits, available_on=None):
+    """
+    Cards of the (kind, id) hits in the same order, with their kind in
+    "type". Each kind is loaded with one query. With available_on only the
+    items still available on that day are kept.
+    """
+    cards = {}
+    for kind, (model, serializer_class) in CARDS.items():
+        ids = [pk for hit_kind, pk in hits if hit_kind == kind]
+        if not ids:
+            continue
+        items = model.objects.filter(id__in=ids)
+        if available_on:
+            items = items.filter(available_to__gte=available_on)
+        items = serializer_class.setup_queryset(items)
+        for item in serializer_class(items, many=True).data:
+            cards[kind, item["id"]] = {"type": kind, **item}
+    # a hit whose item was deleted since is left out
+    return [cards[hit] for hit in hits if hit in cards]
@@ -0,0 +1,216 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import (
+    Coalesce,
+    ExtractHour,
+    ExtractMinute,
+    ExtractSecond,
+)
+from rest_framework import status
+from rest_framework.response import Response
+from activities.models import Activity, ActivityOffer, Period
+from activities.slots import lazy_availability
+from packages.models import Package, PackageDay, PackageOffer
+from tours.models import Tour, TourDay, TourOffer
+from .pagination import paginated
+
+# relation from an item to its offers, the offers carry the prices
+OFFERS = {Activity: "offers", Tour: "tour_offer", Package: "offers"}
+
+# the offers of an item with their field pointing to it, and the stock
+# rows of an offer per day with their field pointing to the offer
+SLOTS = {
+    Activity: (ActivityOffer, "activity", Period, "activity_offer"),
+    Tour: (TourOffer, "tour", TourDay, "tour_offer"),
+    Package: (PackageOffer, "package", PackageDay, "package_offer"),
+}
+
+
+def _ids(value, name):
+    try:
+        return [int(pk) for pk in value.split(",") if pk.strip()]
+    except ValueError:
+        raise ValueError(f"{name} must be comma separated ids.")
+
+
+def parse_filters(params):
+    """
+    The catalog filters given in the query string, raises ValueError with a
+    message for the client when one of them is invalid:
+    categories, locations: comma separated ids, an item needs one of them
+    min_price, max_price: an item needs an offer in that range
+    date: YYYY-MM-DD the item has stock left on
+    featured: true or false
+    """
+    filters = {}
+    if params.get("categories"):
+        filters["categories"] = _ids(params["categories"], "categories")
+    if params.get("locations"):
+        filters["locations"] = _ids(params["locations"], "locations")
+    for name in ("min_price", "max_price"):
+        if params.get(name):
+            try:
+                filters[name] = Decimal(params[name])
+            except InvalidOperation:
+                raise ValueError(f"{name} must be a number.")
+            if not filters[name].is_finite():
+                raise ValueError(f"{name} must be a number.")
+    if params.get("date"):
+        try:
+            filters["date"] = datetime.strptime(params["date"], "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+    if params.get("featured"):
+        if params["featured"] not in ("true", "false"):
+            raise ValueError("featured must be true or false.")
+        filters["featured"] = params["featured"] == "true"
+    return filters
+
+
+def filter_items(queryset, filters, skip=None):
+    """
+    Apply filters to a queryset of activities, tours or packages, leaving
+    out the one named skip. The many valued filters are EXISTS subqueries so
+    an item is never returned twice.
+    """
+    model = queryset.model
+    if "categories" in filters and skip != "categories":
+        queryset = queryset.filter(
+            Exists(
+                model.objects.filter(
+                    pk=OuterRef("pk"), categories__in=filters["categories"]
+                )
+            )
+        )
+    if "locations" in filters and skip != "locations":
+        queryset = queryset.filter(location_id__in=filters["locations"])
+    prices = {}
+    if "min_price" in filters:
+        prices[f"{OFFERS[model]}__price__gte"] = filters["min_price"]
+    if "max_price" in filters:
+        prices[f"{OFFERS[model]}__price__lte"] = filters["max_price"]
+    if prices:
+        queryset = queryset.filter(
+            Exists(model.objects.filter(pk=OuterRef("pk"), **prices))
+        )
+    if "date" in filters:
+        queryset = _bookable_on(queryset, filters["date"])
+    if "featured" in filters:
+        queryset = queryset.filter(featured=filters["featured"])
+    return queryset
+
+
+def _bookable_on(queryset, day):
+    """
+    Items open on day (in their date range and not a day off) with an offer
+    that has stock left that day: a stored row with stock or, in lazy mode,
+    an offer with stock that doesn't have all its rows of the day stored.
+    """
+    model = queryset.model
+    offer_model, item_field, slot_model, offer_field = SLOTS[model]
+    queryset = queryset.filter(available_from__lte=day, available_to__gte=day)
+    queryset = queryset.exclude(days_off__icontains=day.strftime("%A"))
+    bookable = Exists(
+        slot_model.objects.filter(
+            **{f"{offer_field}__{item_field}": OuterRef("pk")}, day=day, stock__gt=0
+        )
+    )
+    if lazy_availability():
+        stored = slot_model.objects.filter(**{offer_field: OuterRef("pk")}, day=day)
+        bookable |= Exists(
+            offer_model.objects.filter(
+                **{item_field: OuterRef("pk")}, stock__gt=0
+            ).exclude(Exists(stored))
+        )
+        if model is Activity:
+            bookable |= Exists(_partly_stored_offers(day))
+    return queryset.filter(bookable)
+
+
+def _seconds(field):
+    return ExtractHour(field) * 3600 + ExtractMinute(field) * 60 + ExtractSecond(field)
+
+
+# offers of the outer activity with fewer of the slots of day stored than
+# the activity has, the missing ones still have the stock of the offer. The
+# slot count is the whole periods between start and end, as iter_slot_times
+# makes them.
+def _partly_stored_offers(day):
+    stored = (
+        Period.objects.filter(activity_offer=OuterRef("pk"), day=day)
+        .order_by()
+        .values("activity_offer")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    slots = (_seconds("activity__end_time") - _seconds("activity__start_time")) / (
+        F("activity__period") * 60
+    )
+    return (
+        ActivityOffer.objects.filter(
+            activity=OuterRef("pk"), stock__gt=0, activity__period__gt=0
+        )
+        .annotate(stored=Coalesce(Subquery(stored), 0), slots=slots)
+        .filter(stored__lt=F("slots"))
+    )
+
+
+def facet_counts(querysets, filters):
+    """
+    Number of items per category and per location over the querysets, each
+    counted with every filter but its own so the client can show how many
+    items picking another category or location gives. Two grouped queries
+    per queryset.
+    """
+    categories = {}
+    locations = {}
+    for queryset in querysets:
+        rows = (
+            filter_items(queryset, filters, skip="categories")
+            .filter(categories__isnull=False)
+            .values("categories", "categories__name")
+            .annotate(count=Count("pk", distinct=True))
+            .order_by()
+        )
+        for row in rows:
+            facet = categories.setdefault(
+                row["categories"],
+                {"id": row["categories"], "name": row["categories__name"], "count": 0},
+            )
+            facet["count"] += row["count"]
+        rows = (
+            filter_items(queryset, filters, skip="locations")
+            .values("location", "location__name")
+            .annotate(count=Count("pk"))
+            .order_by()
+        )
+        for row in rows:
+            facet = locations.setdefault(
+                row["location"],
+                {"id": row["location"], "name": row["location__name"], "count": 0},
+            )
+            facet["count"] += row["count"]
+    return {
+        "categories": sorted(categories.values(), key=lambda facet: facet["name"]),
+        "locations": sorted(locations.values(), key=lambda facet: facet["name"]),
+    }
+
+
+def filtered_response(request, queryset, serializer_class):
+    """
+    A paginated listing of the items of queryset passing the filters of the
+    request, the first page also carries the facet counts.
+    """
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError as error:
+        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    data = paginated(
+        request,
+        serializer_class.setup_queryset(filter_items(queryset, filters)),
+        serializer_class,
+    )
+    if not request.GET.get("cursor"):
+        data["facets"] = facet_counts([queryset], filters)
+    return Response(data)
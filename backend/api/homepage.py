@@ -0,0 +1,92 @@
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from activities.models import Activity
+from activities.serializers import ActivityListSerializer
+from packages.models import Package
+from packages.serializers import PackageListSerializer
+from tours.models import Tour
+from tours.serializers import TourListSerializer
+
+CARDS = [
+    ("activities", Activity, ActivityListSerializer),
+    ("tours", Tour, TourListSerializer),
+    ("packages", Package, PackageListSerializer),
+]
+
+
+def _latest():
+    today = timezone.localdate()
+    sizes = {"activities": 4, "tours": 3, "packages": 3}
+    return {
+        name: serializer_class(
+            serializer_class.setup_queryset(model.objects)
+            .filter(available_to__gte=today)
+            .order_by("-created_at")[: sizes[name]],
+            many=True,
+        ).data
+        for name, model, serializer_class in CARDS
+    }
+
+
+def _featured():
+    today = timezone.localdate()
+    return {
+        name: serializer_class(
+            serializer_class.setup_queryset(model.objects)
+            .filter(featured=True, available_to__gte=today)
+            .order_by("-created_at")[:10],
+            many=True,
+        ).data
+        for name, model, serializer_class in CARDS
+    }
+
+
+SNAPSHOTS = {"latest": _latest, "featured": _featured}
+
+
+def _cache():
+    return caches[settings.HOMEPAGE_CACHE]
+
+
+def _timeout():
+    # items leave the homepage the day after their available_to, so a
+    # snapshot never outlives the current day
+    now = timezone.localtime()
+    midnight = timezone.make_aware(
+        datetime.combine(now.date() + timedelta(days=1), time())
+    )
+    return max(1, min(settings.HOMEPAGE_SNAPSHOT_TTL, (midnight - now).seconds))
+
+
+def build(name):
+    """
+    Serialize the homepage section name again and store it in the cache as
+    {"etag", "data"}.
+    """
+    data = json.loads(json.dumps(SNAPSHOTS[name](), cls=DjangoJSONEncoder))
+    body = json.dumps(data, sort_keys=True).encode()
+    snapshot = {"etag": f'"{hashlib.md5(body).hexdigest()}"', "data": data}
+    _cache().set(f"homepage:{name}", snapshot, _timeout())
+    return snapshot
+
+
+def get(name):
+    return _cache().get(f"homepage:{name}") or build(name)
+
+
+def drop_all():
+    _cache().delete_many([f"homepage:{name}" for name in SNAPSHOTS])
+
+
+def invalidate():
+    # dropped once the change is committed, a rolled back change or one
+    # still in its transaction must not end up in the cache. The next read
+    # rebuilds it, so a transaction saving many listings only costs as many
+    # key deletes
+    transaction.on_commit(drop_all)
@@ -0,0 +1,36 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the newest first (created_at, id) order, the
+    cursor is opaque and a page never needs an OFFSET scan however deep it
+    is. ?page_size= changes the page size up to max_page_size.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def paginated(request, queryset, serializer_class, pagination_class=None, prefix=""):
+    """
+    One page of queryset serialized with serializer_class as
+    {"next", "previous", "results"}. Responses with several paginated lists
+    give each one a prefix so their cursors don't collide.
+    """
+    paginator = (pagination_class or CreatedCursorPagination)()
+    if prefix:
+        paginator.cursor_query_param = f"{prefix}_cursor"
+    page = paginator.paginate_queryset(queryset, request)
+    return {
+        "next": paginator.get_next_link(),
+        "previous": paginator.get_previous_link(),
+        "results": serializer_class(page, many=True).data,
+    }
+
+
+def paginated_response(request, queryset, serializer_class, pagination_class=None):
+    return Response(paginated(request, queryset, serializer_class, pagination_class))
@@ -0,0 +1,50 @@
+from rest_framework import serializers
+
+
+def query_plan(serializer, prefix="", joinable=True):
+    """
+    Walk the fields of a serializer and return the (select_related,
+    prefetch_related) lookups that load every relation it renders, nested
+    serializers included. Foreign keys are joined as long as the path to
+    them only goes through foreign keys, anything under a many relation is
+    prefetched.
+    """
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        lookup = prefix + "__".join(field.source_attrs)
+        if isinstance(field, serializers.ListSerializer):
+            prefetch.append(lookup)
+            nested_select, nested_prefetch = query_plan(
+                field.child, lookup + "__", joinable=False
+            )
+            prefetch += nested_select + nested_prefetch
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(lookup)
+        elif isinstance(field, serializers.BaseSerializer):
+            (select if joinable else prefetch).append(lookup)
+            nested_select, nested_prefetch = query_plan(field, lookup + "__", joinable)
+            select += nested_select
+            prefetch += nested_prefetch
+    return select, prefetch
+
+
+class QueryPlanMixin:
+    """
+    Serializers with this mixin load everything they render up front, the
+    views pass their queryset through setup_queryset() so the number of
+    queries does not grow with the number of results. Relations only read
+    by method fields are listed in related.
+    """
+
+    related = []
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        select, prefetch = query_plan(cls())
+        select += cls.related
+        # select_related() without lookups would follow every foreign key
+        if select:
+            queryset = queryset.select_related(*select)
+        return queryset.prefetch_related(*prefetch)
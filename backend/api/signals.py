@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from activities.models import Activity, ActivityOffer
+from categories.models import Category
+from location.models import Location
+from packages.models import Package, PackageOffer
+from tours.models import Tour, TourOffer
+from .homepage import invalidate
+
+# everything the homepage cards show: the items, the prices of their offers
+# and the names of their location and categories
+HOMEPAGE_MODELS = [
+    Activity,
+    Tour,
+    Package,
+    ActivityOffer,
+    TourOffer,
+    PackageOffer,
+    Location,
+    Category,
+]
+
+
+def homepage_changed(sender, **kwargs):
+    invalidate()
+
+
+for model in HOMEPAGE_MODELS:
+    uid = f"homepage_{model.__name__}"
+    post_save.connect(homepage_changed, sender=model, dispatch_uid=uid)
+    post_delete.connect(homepage_changed, sender=model, dispatch_uid=uid)
@@ -0,0 +1,76 @@
+from datetime import date, time, timedelta
+from activities.models import Activity
+from location.models import Location
+from packages.models import Package
+from tours.models import Tour, TourDay, TourOffer
+from users.models import CustomUser, Customer, Supplier
+
+# the catalog the tests of every app are built on, the fields a test
+# doesn't care about get working defaults and any of them can be overridden
+
+
+def make_supplier(username="supplier"):
+    return Supplier.objects.create(
+        user=CustomUser.objects.create(username=username, is_supplier=True)
+    )
+
+
+def make_customer(username="customer"):
+    return Customer.objects.create(
+        user=CustomUser.objects.create(username=username, is_customer=True)
+    )
+
+
+def _listing(supplier, title, location, days, fields):
+    # available from today for `days` more days
+    today = date.today()
+    return {
+        "supplier": supplier,
+        "location": location or Location.objects.get_or_create(name="Beirut")[0],
+        "title": title,
+        "description": "",
+        "available_from": today,
+        "available_to": today + timedelta(days=days),
+        "unit": "person",
+        **fields,
+    }
+
+
+def make_activity(supplier, title="Climbing", location=None, days=0, **fields):
+    defaults = {"price": 10, "period": 60, "start_time": time(8), "end_time": time(12)}
+    return Activity.objects.create(
+        **_listing(supplier, title, location, days, {**defaults, **fields})
+    )
+
+
+def make_tour(supplier, title="Byblos", location=None, days=0, **fields):
+    defaults = {
+        "price": 10,
+        "period": 8,
+        "pickup_location": "Beirut",
+        "pickup_time": time(8),
+        "dropoff_time": time(18),
+    }
+    return Tour.objects.create(
+        **_listing(supplier, title, location, days, {**defaults, **fields})
+    )
+
+
+def make_package(supplier, title="Cedars", location=None, days=1, **fields):
+    defaults = {
+        "duration": f"{days + 1} days",
+        "period": days + 1,
+        "pickup_location": "Beirut",
+        "pickup_time": time(8),
+        "dropoff_time": time(18),
+    }
+    return Package.objects.create(
+        **_listing(supplier, title, location, days, {**defaults, **fields})
+    )
+
+
+def make_tour_day(tour, day=None, stock=5, title="Standard", price=10):
+    offer = TourOffer.objects.create(tour=tour, title=title, price=price, stock=stock)
+    return TourDay.objects.create(
+        tour_offer=offer, day=day or date.today(), stock=stock
+    )
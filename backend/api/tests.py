@@ -1,3 +1,507 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from activities.models import Activity, ActivityOffer, Period
+from booking.models import ActivityBooking, TourBooking, PackageBooking
+from categories.models import Category
+from favorites.models import Favorite
+from location.models import Location
+from notifications.models import Notification
+from packages.models import Package, PackageOffer, PackageDay
+from tours.models import Tour, TourOffer, TourDay
+from .homepage import invalidate
+from .testing import (
+    make_activity,
+    make_customer,
+    make_package,
+    make_supplier,
+    make_tour,
+    make_tour_day,
+)
 
-# Create your tests here.
+
+class QueryCountTests(TestCase):
+    """
+    The number of queries of every listing endpoint is pinned and must stay
+    the same however many items there are.
+    """
+
+    # url name, url kwargs, user, queries
+    endpoints = [
+        ("get_activities", {}, None, 2),
+        ("get_all_activities", {}, None, 4),
+        ("get_tours", {}, None, 2),
+        ("get_all_tours", {}, None, 4),
+        ("get_packages", {}, None, 2),
+        ("get_all_packages", {}, None, 4),
+        ("latest_items_api", {}, None, 6),
+        ("featured-items", {}, None, 6),
+        ("for_you", {}, "customer", 7),
+        ("all_favorites", {}, "customer", 7),
+        ("supplier_dashboard", {}, "supplier", 2),
+        ("supplier_offers", {}, "supplier", 7),
+        ("customer_activity_bookings", {}, "customer", 9),
+        ("supplier_activity_bookings", {}, "supplier", 9),
+        ("customer_tours_booking", {}, "customer", 10),
+        ("supplier_tours_bookings", {}, "supplier", 10),
+        ("customer_package_bookings", {}, "customer", 10),
+        ("supplier_packages_bookings", {}, "supplier", 10),
+    ]
+
+    def setUp(self):
+        self.supplier = make_supplier()
+        self.customer = make_customer()
+        self.location = Location.objects.create(name="Beirut")
+        self.category = Category.objects.create(name="Hiking")
+        self.customer.location.add(self.location)
+        self.customer.preferences.add(self.category)
+        self.today = date.today()
+        self.count = 0
+
+    # one activity, tour and package with everything their serializers
+    # render, booked and liked by the customer
+    def add_items(self):
+        self.count += 1
+        title = f"item {self.count}"
+        common = {"location": self.location, "days": 10, "featured": True}
+
+        activity = make_activity(self.supplier, title, **common)
+        tour = make_tour(self.supplier, title, **common)
+        package = make_package(
+            self.supplier, title, **common, duration="2 days", period=2
+        )
+        for item in (activity, tour, package):
+            item.categories.add(self.category)
+            item.included_set.create(include="lunch")
+            item.excluded_set.create(Exclude="drinks")
+            item.faq_set.create(question="?", answer="!")
+            item.catalog_set.create(image="catalog.png")
+        tour.itinerary_steps.create(title="start", activity="walk")
+        package.itinerary_step_set.create(title="start", activity="walk")
+
+        period = Period.objects.create(
+            activity_offer=ActivityOffer.objects.create(
+                activity=activity, title="Standard", price=10, stock=5
+            ),
+            day=self.today,
+            time_from=time(8),
+            time_to=time(9),
+            stock=5,
+        )
+        tourday = make_tour_day(tour, self.today)
+        package_offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=10, stock=5
+        )
+        PackageDay.objects.create(package_offer=package_offer, day=self.today, stock=5)
+
+        ActivityBooking.objects.create(period=period, customer=self.customer)
+        TourBooking.objects.create(tourday=tourday, customer=self.customer)
+        PackageBooking.objects.create(
+            package_offer=package_offer,
+            customer=self.customer,
+            start_date=self.today,
+            end_date=self.today,
+        )
+        user = self.customer.user
+        for item_type, item in [
+            ("activity", activity),
+            ("tour", tour),
+            ("package", package),
+        ]:
+            Favorite.objects.create(user=user, item_type=item_type, item_id=item.pk)
+
+    def client_for(self, user):
+        client = APIClient()
+        if user:
+            client.force_authenticate(getattr(self, user).user)
+        return client
+
+    def test_query_count_does_not_grow_with_results(self):
+        for items in (1, 3):
+            while self.count < items:
+                # the feeds are refreshed once the items are committed
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.add_items()
+            for name, kwargs, user, queries in self.endpoints:
+                client = self.client_for(user)
+                # the homepage snapshots are counted when they are built
+                cache.clear()
+                with self.subTest(endpoint=name, items=items):
+                    with self.assertNumQueries(queries):
+                        response = client.get(reverse(name, kwargs=kwargs))
+                    self.assertEqual(response.status_code, 200)
+
+    def test_detail_endpoints(self):
+        self.add_items()
+        activity = Activity.objects.get()
+        offer = ActivityOffer.objects.get()
+        client = APIClient()
+        for name, kwargs, queries in [
+            ("get_activity", {"pk": activity.pk}, 7),
+            ("get_tour", {"pk": Tour.objects.get().pk}, 8),
+            ("get_package", {"pk": Package.objects.get().pk}, 8),
+            ("get_offers_by_activity", {"activity_id": activity.pk}, 7),
+            ("get_daily_periods", {"offer_id": offer.pk, "day": self.today}, 7),
+            ("get_tour_days", {"tour_offer_id": TourOffer.objects.get().pk}, 8),
+            (
+                "get_package_days",
+                {"package_offer_id": PackageOffer.objects.get().pk},
+                8,
+            ),
+        ]:
+            with self.subTest(endpoint=name):
+                with self.assertNumQueries(queries):
+                    response = client.get(reverse(name, kwargs=kwargs))
+                self.assertEqual(response.status_code, 200)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = make_customer().user
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        return seen
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        notifications = [
+            Notification.objects.create(user=self.user, message=str(index))
+            for index in range(7)
+        ]
+        # rows created in the same instant are ordered by id
+        Notification.objects.update(created_at=timezone.now())
+
+        seen = self.walk(reverse("list_notification") + "?page_size=3")
+
+        self.assertEqual(seen, [n.id for n in reversed(notifications)])
+
+    def test_favorites_are_paginated(self):
+        supplier = make_supplier()
+        for index in range(3):
+            activity = make_activity(supplier, f"hike {index}")
+            Favorite.objects.create(
+                user=self.user, item_type="activity", item_id=activity.pk
+            )
+
+        response = self.client.get(reverse("all_favorites") + "?page_size=2")
+
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIn("cursor=", response.data["next"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+
+class FilterTests(TestCase):
+    def setUp(self):
+        supplier = make_supplier()
+        self.beirut = Location.objects.create(name="Beirut")
+        self.byblos = Location.objects.create(name="Byblos")
+        self.hiking = Category.objects.create(name="Hiking")
+        self.diving = Category.objects.create(name="Diving")
+        self.today = date.today()
+
+        def activity(title, location, categories, price, featured=False, days=10):
+            activity = make_activity(
+                supplier,
+                title,
+                location,
+                days,
+                price=price,
+                featured=featured,
+                end_time=time(9),
+            )
+            activity.categories.set(categories)
+            ActivityOffer.objects.create(
+                activity=activity, title="Adult", price=price, stock=5
+            )
+            activity.create_periods()
+            return activity
+
+        self.trail = activity("Trail", self.beirut, [self.hiking], 20, featured=True)
+        self.reef = activity("Reef", self.byblos, [self.diving], 50)
+        self.coast = activity(
+            "Coast", self.byblos, [self.hiking, self.diving], 80, days=1
+        )
+
+    def get(self, **params):
+        return APIClient().get(reverse("get_all_activities"), params)
+
+    def titles(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(item["title"] for item in response.data["results"])
+
+    def test_filters(self):
+        self.assertEqual(self.titles(categories=self.hiking.pk), ["Coast", "Trail"])
+        self.assertEqual(
+            self.titles(categories=f"{self.hiking.pk},{self.diving.pk}"),
+            ["Coast", "Reef", "Trail"],
+        )
+        self.assertEqual(self.titles(locations=self.byblos.pk), ["Coast", "Reef"])
+        self.assertEqual(self.titles(min_price=30, max_price=60), ["Reef"])
+        self.assertEqual(self.titles(min_price=50), ["Coast", "Reef"])
+        self.assertEqual(
+            self.titles(date=(self.today + timedelta(days=5)).isoformat()),
+            ["Reef", "Trail"],
+        )
+        self.assertEqual(self.titles(featured="true"), ["Trail"])
+        self.assertEqual(self.titles(categories=self.diving.pk, max_price=60), ["Reef"])
+
+        for params in (
+            {"categories": "a"},
+            {"min_price": "cheap"},
+            {"min_price": "NaN"},
+            {"max_price": "Infinity"},
+            {"date": "tomorrow"},
+            {"featured": "yes"},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+    def test_date_needs_stock_left_that_day(self):
+        day = self.today + timedelta(days=5)
+        self.reef.days_off = day.strftime("%A")
+        self.reef.save()
+        Period.objects.filter(activity_offer__activity=self.trail, day=day).update(
+            stock=0
+        )
+        self.assertEqual(self.titles(date=day.isoformat()), [])
+        self.assertEqual(
+            self.titles(date=self.today.isoformat()), ["Coast", "Reef", "Trail"]
+        )
+
+        # in lazy mode the rows without a booking are not stored
+        Period.objects.exclude(activity_offer__activity=self.trail, day=day).delete()
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            self.assertEqual(self.titles(date=day.isoformat()), [])
+            self.assertEqual(
+                self.titles(date=self.today.isoformat()), ["Coast", "Reef", "Trail"]
+            )
+            # a part of a period is no slot
+            self.trail.end_time = time(9, 59)
+            self.trail.save()
+            self.assertEqual(self.titles(date=day.isoformat()), [])
+            self.trail.end_time = time(10)
+            self.trail.save()
+            # the 9 o'clock slot of the day is not stored, so not booked yet
+            self.assertEqual(self.titles(date=day.isoformat()), ["Trail"])
+
+    def test_facets_count_every_filter_but_their_own(self):
+        response = self.get(categories=self.diving.pk)
+        facets = response.data["facets"]
+
+        self.assertEqual(
+            facets["categories"],
+            [
+                {"id": self.diving.pk, "name": "Diving", "count": 2},
+                {"id": self.hiking.pk, "name": "Hiking", "count": 2},
+            ],
+        )
+        self.assertEqual(
+            facets["locations"], [{"id": self.byblos.pk, "name": "Byblos", "count": 2}]
+        )
+
+        # later pages leave them out
+        response = APIClient().get(self.get(page_size=1).data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertNotIn("facets", response.data)
+
+
+class ListPayloadTests(TestCase):
+    def test_cards_carry_the_cheapest_offer_price(self):
+        supplier = make_supplier()
+        activity = make_activity(supplier, days=5)
+        tour = make_tour(supplier, days=5)
+        package = make_package(supplier, days=5)
+        for price in (30, 25):
+            ActivityOffer.objects.create(activity=activity, title="A", price=price)
+            TourOffer.objects.create(tour=tour, title="A", price=price)
+            PackageOffer.objects.create(package=package, title="A", price=price)
+        # without an offer there is no price to show
+        for make in (make_activity, make_tour, make_package):
+            make(supplier, title="Empty", days=5)
+        client = APIClient()
+
+        for name, extra in [
+            ("get_all_activities", "price"),
+            ("get_all_tours", "price"),
+            ("get_all_packages", "duration"),
+        ]:
+            with self.subTest(endpoint=name):
+                results = client.get(reverse(name)).data["results"]
+                for card in results:
+                    # the card fields only, no nested offers
+                    self.assertEqual(
+                        set(card),
+                        {
+                            "id",
+                            "title",
+                            "image",
+                            extra,
+                            "location",
+                            "featured",
+                            "available_to",
+                            "unit",
+                            "categories",
+                            "min_offer_price",
+                        },
+                    )
+                prices = {card["title"]: card["min_offer_price"] for card in results}
+                self.assertIsNone(prices.pop("Empty"))
+                self.assertEqual(list(prices.values()), ["25.00"])
+
+
+class HomepageSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.supplier = make_supplier()
+        self.today = date.today()
+
+    def add_activity(self, title, available_to=None):
+        return make_activity(
+            self.supplier,
+            title,
+            featured=True,
+            available_to=available_to or self.today,
+        )
+
+    def titles(self, response):
+        return [item["title"] for item in response.data["activities"]]
+
+    def test_served_from_the_cache_with_an_etag(self):
+        self.add_activity("Climbing")
+        self.add_activity("Gone", available_to=self.today - timedelta(days=1))
+        client = APIClient()
+        for name in ("latest_items_api", "featured-items"):
+            with self.subTest(endpoint=name):
+                response = client.get(reverse(name))
+                # items available until today are still shown
+                self.assertEqual(self.titles(response), ["Climbing"])
+                etag = response["ETag"]
+
+                with self.assertNumQueries(0):
+                    response = client.get(reverse(name))
+                self.assertEqual(self.titles(response), ["Climbing"])
+                self.assertEqual(response["ETag"], etag)
+
+                response = client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_rebuilt_when_a_listing_changes(self):
+        activity = self.add_activity("Climbing")
+        client = APIClient()
+        etag = client.get(reverse("latest_items_api"))["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.title = "Kayaking"
+            activity.save()
+        response = client.get(reverse("latest_items_api"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(response), ["Kayaking"])
+        with self.assertNumQueries(0):
+            client.get(reverse("latest_items_api"))
+
+        # the commit only drops the snapshots, however many rows changed
+        with self.assertNumQueries(0):
+            with self.captureOnCommitCallbacks(execute=True):
+                for _ in range(3):
+                    invalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            ActivityOffer.objects.create(activity=activity, title="Std", price=25)
+            ActivityOffer.objects.create(activity=activity, title="VIP", price=40)
+        response = client.get(reverse("featured-items"))
+        self.assertEqual(response.data["activities"][0]["min_offer_price"], "25.00")
+
+
+class AvailabilityCalendarTests(TestCase):
+    def setUp(self):
+        # monday 29 January to sunday 4 February 2024, closed on thursdays
+        supplier = make_supplier()
+        rules = {
+            "available_from": date(2024, 1, 29),
+            "available_to": date(2024, 2, 4),
+            "days_off": "thursday",
+        }
+        self.activity = make_activity(
+            supplier, start_time=time(8), end_time=time(10), **rules
+        )
+        self.tour = make_tour(supplier, **rules)
+        self.package = make_package(supplier, **rules)
+        self.offers = {
+            "activity_offers": ActivityOffer.objects.create(
+                activity=self.activity, title="Standard", price=10, stock=5
+            ),
+            "tour_offers": TourOffer.objects.create(
+                tour=self.tour, title="Standard", price=10, stock=4
+            ),
+            "package_offers": PackageOffer.objects.create(
+                package=self.package, title="Standard", price=10, stock=3
+            ),
+        }
+
+    def calendar(self, year, month):
+        url = reverse("availability_calendar", kwargs={"year": year, "month": month})
+        params = {kind: offer.pk for kind, offer in self.offers.items()}
+        return APIClient().get(url, params)
+
+    def days(self, year, month):
+        data = self.calendar(year, month).data
+        return {
+            kind: [
+                (row["day"].day, row["stock"], row["slots"])
+                for row in data[kind][offer.pk]
+            ]
+            for kind, offer in self.offers.items()
+        }
+
+    def materialize(self):
+        self.activity.create_periods()
+        self.tour.create_tour_days()
+        self.package.create_package_days()
+
+    def test_month_boundaries_and_days_off(self):
+        self.materialize()
+        january = self.days(2024, 1)
+        february = self.days(2024, 2)
+
+        # two slots a day for the activity, one day for the tour and package
+        self.assertEqual(
+            january["activity_offers"], [(day, 10, 2) for day in (29, 30, 31)]
+        )
+        self.assertEqual(january["tour_offers"], [(day, 4, 1) for day in (29, 30, 31)])
+        # the 1st of February is a thursday
+        self.assertEqual(february["package_offers"], [(day, 3, 1) for day in (2, 3, 4)])
+        self.assertEqual(self.days(2023, 12)["tour_offers"], [])
+
+    def test_lazy_mode_matches_the_stored_rows(self):
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            lazy = [self.days(2024, 1), self.days(2024, 2)]
+        self.materialize()
+        Period.objects.filter(day=date(2024, 1, 30), time_from=time(8)).update(stock=0)
+        TourDay.objects.filter(day=date(2024, 2, 2)).update(stock=1)
+        stored = [self.days(2024, 1), self.days(2024, 2)]
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            self.assertEqual([self.days(2024, 1), self.days(2024, 2)], stored)
+
+        self.assertEqual(stored[0]["activity_offers"][1], (30, 5, 1))
+        self.assertEqual(stored[1]["tour_offers"][0], (2, 1, 1))
+        # before the stored rows changed both modes gave the same calendar
+        stored[0]["activity_offers"][1] = (30, 10, 2)
+        stored[1]["tour_offers"][0] = (2, 4, 1)
+        self.assertEqual(lazy, stored)
+
+    def test_invalid_dates(self):
+        for year, month in [(2024, 0), (2024, 13), (0, 1), (9999, 12)]:
+            with self.subTest(year=year, month=month):
+                self.assertEqual(self.calendar(year, month).status_code, 400)
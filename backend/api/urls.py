@@ -5,9 +5,13 @@ from booking.views import (
     activity_booking_create,
     tour_booking_create,
     package_booking_create,
+    ticket_qr_code,
 )
 from dashboard.views import (
     supplier_dashboard,
+    supplier_offers,
+    supplier_analytics,
+    supplier_arrivals,
     supplier_activity_bookings,
     customer_activity_bookings,
     confirm_activity_booking,
@@ -20,6 +24,7 @@ from dashboard.views import (
     confirm_tour_booking,
     confirm_package_payment,
     confirm_tour_payment,
+    check_in,
 )
 from activities.views import (
     get_activities,
@@ -31,15 +36,29 @@ from activities.views import (
 from packages.views import get_packages, get_package_days, get_package, get_all_packages
 from tours.views import get_tours, get_tour_days, get_tour, get_all_tours
 from location.views import get_locations
-from notifications.views import notification_list, mark_notification_as_read
-from .views import latest_items_api, featured_items_api, search, for_you_items
+from notifications.views import (
+    notification_list,
+    notification_stream,
+    mark_notification_as_read,
+    mark_notifications_as_read,
+    unread_count,
+)
+from .views import (
+    latest_items_api,
+    featured_items_api,
+    search,
+    for_you_items,
+    availability_calendar,
+)
 from favorites.views import (
     favorite_activity,
     favorite_tour,
     favorite_package,
     all_favorites,
+    favorite_status,
 )
 from blog.views import PostViewSet, upload_image
+from search.views import suggestions
 
 
 router = DefaultRouter()
@@ -48,7 +67,17 @@ router.register(r"posts", PostViewSet)
 urlpatterns = [
     path("for-you/", for_you_items, name="for_you"),
     path("supplier-dashboard/", supplier_dashboard, name="supplier_dashboard"),
+    path("supplier-dashboard/offers/", supplier_offers, name="supplier_offers"),
+    path(
+        "supplier-dashboard/arrivals/", supplier_arrivals, name="supplier_arrivals"
+    ),
+    path(
+        "supplier-dashboard/analytics/",
+        supplier_analytics,
+        name="supplier_analytics",
+    ),
     path("all-favorites/", all_favorites, name="all_favorites"),
+    path("favorite-status/", favorite_status, name="favorite_status"),
     path(
         "favorite-activity/<int:activity_id>/",
         favorite_activity,
@@ -59,9 +88,13 @@ urlpatterns = [
         "favorite-package/<int:package_id>/", favorite_package, name="favorite_package"
     ),
     path("search", search, name="search"),
+    path("search/suggestions/", suggestions, name="search_suggestions"),
     path("featured-items/", featured_items_api, name="featured-items"),
     path("latest/", latest_items_api, name="latest_items_api"),
     path("notifications/", notification_list, name="list_notification"),
+    path("notifications/stream/", notification_stream, name="notification_stream"),
+    path("notifications/unread/", unread_count, name="unread_notifications"),
+    path("notifications/read/", mark_notifications_as_read, name="read_notifications"),
     path(
         "readnotification/<int:pk>/",
         mark_notification_as_read,
@@ -92,6 +125,11 @@ urlpatterns = [
         get_periods_by_offer_and_day,
         name="get_daily_periods",
     ),
+    path(
+        "availability/<int:year>/<int:month>/",
+        availability_calendar,
+        name="availability_calendar",
+    ),
     path("bookingactivity/", activity_booking_create, name="create_activity_booking"),
     path(
         "supplier/bookings/",
@@ -141,6 +179,12 @@ urlpatterns = [
         confirm_tour_booking,
         name="confirm_tour_booking",
     ),
+    path("supplier/check-in/", check_in, name="check_in"),
+    path(
+        "tickets/<str:ticket>/qr.<str:image_format>",
+        ticket_qr_code,
+        name="ticket_qr_code",
+    ),
     path(
         "supplier/package/<int:booking_id>/confirm-payment/",
         confirm_package_payment,
@@ -153,8 +197,4 @@ urlpatterns = [
     ),
     path("upload-image/", upload_image, name="upload_image"),
     path("", include(router.urls)),  # This will handle /posts/ and /posts/<int:pk>/
-<<<<<<< HEAD
-]
-=======
 ]
->>>>>>> origin/master
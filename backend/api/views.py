@@ -2,147 +2,233 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework import status
-from activities.models import Activity
-from activities.serializers import ActivitySerializer
-from tours.models import Tour
-from tours.serializers import TourSerializer
-from packages.models import Package
-from packages.serializers import PackageSerializer
-from users.models import Customer
-from django.db.models import Q
+from activities.models import ActivityOffer, Period
+from activities.slots import lazy_availability, iter_open_days, iter_slot_times
+from tours.models import TourOffer, TourDay
+from packages.models import PackageOffer, PackageDay
+from django.db.models import Q, Sum, Count
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from datetime import date, timedelta
+from rest_framework.utils.urls import replace_query_param
+from search.index import search as search_index, encode_cursor, decode_cursor
+from search.index import matching
+from recommendations import feed as recommendations
+from . import homepage
+from .cards import CARDS, serialize_cards
+from .filters import facet_counts, filter_items, parse_filters
+from .pagination import CreatedCursorPagination
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def for_you_items(request):
-    customer = Customer.objects.get(user=request.user)
-    preferred_locations = customer.location.all()
-    preferred_categories = customer.preferences.all()
-
-    current_time = timezone.now()
-    activities = Activity.objects.filter(
-        location__in=preferred_locations,
-        categories__in=preferred_categories,
-        available_to__gte=current_time,
-    ).distinct()
-    packages = Package.objects.filter(
-        location__in=preferred_locations,
-        categories__in=preferred_categories,
-        available_to__gte=current_time,
-    ).distinct()
-    tours = Tour.objects.filter(
-        location__in=preferred_locations,
-        categories__in=preferred_categories,
-        available_to__gte=current_time,
-    ).distinct()
-
-    activity_serializer = ActivitySerializer(activities, many=True)
-    package_serializer = PackageSerializer(packages, many=True)
-    tour_serializer = TourSerializer(tours, many=True)
-
-    combined_results = {
-        "activities": activity_serializer.data,
-        "packages": package_serializer.data,
-        "tours": tour_serializer.data,
-    }
-
-    return Response(combined_results)
+    """
+    The "for you" feed of the customer, ranked by how well the items match
+    their preferences, favorites and bookings. The feed is precomputed, the
+    request reads its ids and loads the cards. Empty for anyone else.
+    """
+    hits = recommendations.feed(request.user)
+    return Response(
+        {"results": serialize_cards(hits, available_on=timezone.localdate())}
+    )
+
+
+def _snapshot_response(request, name):
+    # the cards only change with the listings, browsers revalidate their
+    # copy with the ETag and get an empty 304 while it is current
+    snapshot = homepage.get(name)
+    if request.headers.get("If-None-Match") == snapshot["etag"]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(snapshot["data"])
+    response["ETag"] = snapshot["etag"]
+    patch_cache_control(response, no_cache=True)
+    return response
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def latest_items_api(request):
-    current_time = timezone.now()
-    activities = Activity.objects.filter(
-        available_to__gte=current_time,
-    ).order_by(
-        "-created_at"
-    )[:4]
-    tours = Tour.objects.filter(
-        available_to__gte=current_time,
-    ).order_by(
-        "-created_at"
-    )[:3]
-    packages = Package.objects.filter(
-        available_to__gte=current_time,
-    ).order_by(
-        "-created_at"
-    )[:3]
-    activity_serializer = ActivitySerializer(activities, many=True)
-    tour_serializer = TourSerializer(tours, many=True)
-    package_serializer = PackageSerializer(packages, many=True)
-    data = {
-        "activities": activity_serializer.data,
-        "tours": tour_serializer.data,
-        "packages": package_serializer.data,
-    }
-    return Response(data)
+    return _snapshot_response(request, "latest")
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def featured_items_api(request):
-    # Fetch featured items from each model
-    current_time = timezone.now()
-    activities = Activity.objects.filter(
-        featured=True,
-        available_to__gte=current_time,
-    ).order_by("-created_at")[:10]
-    tours = Tour.objects.filter(
-        featured=True,
-        available_to__gte=current_time,
-    ).order_by("-created_at")[:10]
-    packages = Package.objects.filter(
-        featured=True,
-        available_to__gte=current_time,
-    ).order_by("-created_at")[:10]
-    activity_serializer = ActivitySerializer(activities, many=True)
-    tour_serializer = TourSerializer(tours, many=True)
-    package_serializer = PackageSerializer(packages, many=True)
-    data = {
-        "activities": activity_serializer.data,
-        "tours": tour_serializer.data,
-        "packages": package_serializer.data,
-    }
-    return Response(data)
+    return _snapshot_response(request, "featured")
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def search(request):
+    """
+    Activities, tours and packages matching every word of query as a prefix,
+    merged into one list ordered by relevance and paginated with ?cursor=.
+    Takes the catalog filters of api.filters, the first page also carries
+    the facet counts of all the matches.
+    """
     query = request.GET.get("query", "")
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError as error:
+        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = CreatedCursorPagination().get_page_size(request)
 
-    if query:
-        activity_results = Activity.objects.filter(
-            Q(title__icontains=query)
-            | Q(description__icontains=query)
-            | Q(location__name__icontains=query)
+    querysets = None
+    if filters:
+        querysets = {
+            kind: filter_items(model.objects.all(), filters)
+            for kind, (model, _) in CARDS.items()
+        }
+    # the backend checks the shape of the cursor it gets back
+    try:
+        cursor = decode_cursor(request.GET.get("cursor"))
+        hits, next_cursor = search_index(query, page_size, cursor, querysets)
+    except ValueError:
+        return Response(
+            {"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
         )
-        tour_results = Tour.objects.filter(
-            Q(title__icontains=query)
-            | Q(description__icontains=query)
-            | Q(location__name__icontains=query)
+    next_link = None
+    if next_cursor is not None:
+        next_link = replace_query_param(
+            request.build_absolute_uri(), "cursor", encode_cursor(next_cursor)
         )
-        package_results = Package.objects.filter(
-            Q(title__icontains=query)
-            | Q(description__icontains=query)
-            | Q(location__name__icontains=query)
+    data = {"next": next_link, "results": serialize_cards(hits)}
+    if cursor is None:
+        data["facets"] = facet_counts(
+            [
+                matching(model.objects.all(), kind, query)
+                for kind, (model, _) in CARDS.items()
+            ],
+            filters,
         )
-    else:
-        activity_results = Activity.objects.none()
-        tour_results = Tour.objects.none()
-        package_results = Package.objects.none()
+    return Response(data, status=status.HTTP_200_OK)
 
-    activity_serializer = ActivitySerializer(activity_results, many=True)
-    tour_serializer = TourSerializer(tour_results, many=True)
-    package_serializer = PackageSerializer(package_results, many=True)
 
-    return Response(
-        {
-            "activities": activity_serializer.data,
-            "tours": tour_serializer.data,
-            "packages": package_serializer.data,
-        },
-        status=status.HTTP_200_OK,
+def _parse_ids(value):
+    return [int(pk) for pk in value.split(",") if pk.strip().isdigit()] if value else []
+
+
+# remaining stock and number of bookable slots per (offer, day), grouped in
+# the database. stored is the count of all stored rows so that lazy mode can
+# add the computed slots that have no row yet
+def _day_totals(model, offer_field, offer_ids, first_day, last_day):
+    rows = (
+        model.objects.filter(
+            **{f"{offer_field}__in": offer_ids}, day__range=(first_day, last_day)
+        )
+        .values(offer_field, "day")
+        .annotate(
+            remaining=Sum("stock", filter=Q(stock__gt=0), default=0),
+            slots=Count("id", filter=Q(stock__gt=0)),
+            stored=Count("id"),
+        )
     )
+    return {(row[offer_field], row["day"]): row for row in rows}
+
+
+# in lazy mode parent is the activity, tour or package whose rules give the
+# days that have daily_slots computed slots on top of the stored rows
+def _offer_calendar(totals, offer, first_day, last_day, parent=None, daily_slots=1):
+    summary = {}
+    for (offer_id, day), row in totals.items():
+        if offer_id == offer.id:
+            summary[day] = [row["remaining"], row["slots"]]
+    if parent is not None and offer.stock > 0:
+        for day in iter_open_days(
+            max(first_day, parent.available_from),
+            min(last_day, parent.available_to),
+            parent.days_off,
+        ):
+            stored = totals.get((offer.id, day), {}).get("stored", 0)
+            computed = max(daily_slots - stored, 0)
+            stock, slots = summary.get(day, [0, 0])
+            summary[day] = [stock + computed * offer.stock, slots + computed]
+    return [
+        {"day": day, "stock": stock, "slots": slots}
+        for day, (stock, slots) in sorted(summary.items())
+        if slots
+    ]
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def availability_calendar(request, year, month):
+    """
+    Per day remaining stock and slot count of a whole month for the offers
+    given as comma separated ids in activity_offers, tour_offers and
+    package_offers.
+    """
+    if not 1 <= month <= 12:
+        return Response(
+            {"error": "Invalid month."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    # the last day is found through the first day of the next month
+    if not 1 <= year <= date.max.year - 1:
+        return Response(
+            {"error": "Invalid year."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    first_day = date(year, month, 1)
+    last_day = (first_day + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    lazy = lazy_availability()
+
+    data = {"year": year, "month": month}
+    activity_offer_ids = _parse_ids(request.GET.get("activity_offers"))
+    if activity_offer_ids:
+        offers = ActivityOffer.objects.filter(id__in=activity_offer_ids).select_related(
+            "activity"
+        )
+        totals = _day_totals(
+            Period, "activity_offer_id", activity_offer_ids, first_day, last_day
+        )
+        data["activity_offers"] = {
+            offer.id: _offer_calendar(
+                totals,
+                offer,
+                first_day,
+                last_day,
+                offer.activity if lazy else None,
+                len(
+                    list(
+                        iter_slot_times(
+                            first_day,
+                            offer.activity.start_time,
+                            offer.activity.end_time,
+                            offer.activity.period,
+                        )
+                    )
+                ),
+            )
+            for offer in offers
+        }
+
+    tour_offer_ids = _parse_ids(request.GET.get("tour_offers"))
+    if tour_offer_ids:
+        offers = TourOffer.objects.filter(id__in=tour_offer_ids).select_related("tour")
+        totals = _day_totals(
+            TourDay, "tour_offer_id", tour_offer_ids, first_day, last_day
+        )
+        data["tour_offers"] = {
+            offer.id: _offer_calendar(
+                totals, offer, first_day, last_day, offer.tour if lazy else None
+            )
+            for offer in offers
+        }
+
+    package_offer_ids = _parse_ids(request.GET.get("package_offers"))
+    if package_offer_ids:
+        offers = PackageOffer.objects.filter(id__in=package_offer_ids).select_related(
+            "package"
+        )
+        totals = _day_totals(
+            PackageDay, "package_offer_id", package_offer_ids, first_day, last_day
+        )
+        data["package_offers"] = {
+            offer.id: _offer_calendar(
+                totals, offer, first_day, last_day, offer.package if lazy else None
+            )
+            for offer in offers
+        }
+
+    return Response(data)
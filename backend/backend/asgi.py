@@ -13,4 +13,7 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
+# the notification stream (/api/notifications/stream/) holds a connection
+# per user, serve the site with uvicorn backend.asgi:application (see the
+# README). Under runserver (WSGI) the stream falls back to a long poll
 application = get_asgi_application()
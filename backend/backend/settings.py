@@ -51,6 +51,8 @@ INSTALLED_APPS = [
     "dashboard",
     "notifications",
     "favorites",
+    "search",
+    "recommendations",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -123,6 +125,57 @@ REST_KNOX = {
     "TOKEN_TTL": timedelta(days=15),
 }
 
+# "materialized" writes every Period/TourDay/PackageDay row when an offer is
+# created, "lazy" computes them from the offer rules (date range, hours,
+# period, days_off) on read and only stores booked or overridden rows
+AVAILABILITY_MODE = os.environ.get("AVAILABILITY_MODE", "materialized")
+
+# how long a booking keeps its stock before it is confirmed or paid, in
+# seconds, expired holds are released by the release_expired_holds command
+BOOKING_HOLD_TTL = timedelta(
+    seconds=int(os.environ.get("BOOKING_HOLD_TTL", 24 * 60 * 60))
+)
+
+# QR codes are rendered by run_qr_worker processes, a booking claimed by a
+# worker for longer than this is taken over by another one
+QR_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# the QR codes are served from the tickets by /api/tickets/<ticket>/qr.png,
+# set to "true" to also queue a file for every confirmed booking
+QR_EAGER_FILES = os.environ.get("QR_EAGER_FILES", "false").lower() == "true"
+
+# a ticket checks in from the day of its slot until this many days later,
+# the gate refuses it on any other day
+TICKET_GRACE_DAYS = int(os.environ.get("TICKET_GRACE_DAYS", 0))
+
+# channels the notifications are also sent on, name: dotted path of a
+# callable(user, message) like "notifications.channels.email". They are sent
+# from the outbox by send_notifications workers, a delivery claimed by a
+# worker for longer than NOTIFICATION_CLAIM_TIMEOUT is taken over
+NOTIFICATION_CHANNELS = {}
+NOTIFICATION_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# pub/sub behind /api/notifications/stream/. The local broker only reaches
+# the streams of its own process, serving the site with more than one
+# process requires a cross-process broker (see notifications.broker)
+NOTIFICATION_BROKER = os.environ.get(
+    "NOTIFICATION_BROKER", "notifications.broker.LocalBroker"
+)
+
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+# cache alias of the homepage snapshots (latest and featured items), dropped
+# when a listing changes. The local memory cache is per process and a change
+# only drops it in the process that made it: the other processes keep
+# serving their stale snapshot for up to HOMEPAGE_SNAPSHOT_TTL seconds. With
+# a shared cache (redis, memcached) every process sees the change and the
+# TTL can be a day
+HOMEPAGE_CACHE = os.environ.get("HOMEPAGE_CACHE", "default")
+HOMEPAGE_SNAPSHOT_TTL = int(os.environ.get("HOMEPAGE_SNAPSHOT_TTL", 300))
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
@@ -130,10 +183,24 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # a file rather than the shared in memory database, concurrent
+        # writers then wait on the busy timeout like they do on db.sqlite3
+        # instead of failing at once with "database table is locked"
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
 
+# full text index behind /api/search, the FTS5 index table is only created
+# on SQLite and search.backends.LikeBackend works on any other database
+SEARCH_BACKEND = os.environ.get(
+    "SEARCH_BACKEND",
+    "search.backends.Fts5Backend"
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3"
+    else "search.backends.LikeBackend",
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
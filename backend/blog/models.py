@@ -25,6 +25,14 @@ class Post(models.Model):
     published_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['published', 'created_at', 'id'],
+                name='post_published_created_idx',
+            )
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
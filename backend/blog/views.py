@@ -1,6 +1,7 @@
 from rest_framework import viewsets
 from .models import Post
 from .serializers import PostSerializer
+from api.pagination import CreatedCursorPagination
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.core.files.storage import default_storage
@@ -13,6 +14,7 @@ from django.conf import settings
 class PostViewSet(viewsets.ModelViewSet):
     queryset = Post.objects.filter(published=True).order_by('-created_at')
     serializer_class = PostSerializer
+    pagination_class = CreatedCursorPagination
 
 
 @csrf_exempt
@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+from activities.models import Period
+from tours.models import TourDay
+from packages.models import PackageDay
+from .models import ActivityBooking, TourBooking, PackageBooking, Hold
+
+
+class OutOfStock(Exception):
+    pass
+
+
+# stock is only ever changed with conditional UPDATE statements so two
+# concurrent bookings can never both pass the check and oversell, the
+# database does the check and the decrement in one step
+def reserve(queryset, quantity, expected=1):
+    """
+    Take quantity from the stock of every row of queryset in one statement,
+    all or nothing: raises OutOfStock and changes nothing unless exactly
+    expected rows had enough stock.
+    """
+    with transaction.atomic():
+        updated = queryset.filter(stock__gte=quantity).update(
+            stock=F("stock") - quantity
+        )
+        if updated != expected:
+            raise OutOfStock
+    return updated
+
+
+def release(queryset, quantity):
+    return queryset.update(stock=F("stock") + quantity)
+
+
+def reserve_period(period, quantity):
+    return reserve(Period.objects.filter(pk=period.pk), quantity)
+
+
+def reserve_tour_day(tourday, quantity):
+    return reserve(TourDay.objects.filter(pk=tourday.pk), quantity)
+
+
+def package_days(package_offer, start_date, end_date):
+    return PackageDay.objects.filter(
+        package_offer=package_offer, day__range=(start_date, end_date)
+    )
+
+
+def reserve_package_days(package_offer, start_date, end_date, quantity):
+    return reserve(
+        package_days(package_offer, start_date, end_date),
+        quantity,
+        expected=(end_date - start_date).days + 1,
+    )
+
+
+HOLD_FIELDS = {
+    ActivityBooking: "activity_booking",
+    TourBooking: "tour_booking",
+    PackageBooking: "package_booking",
+}
+
+
+# the stock rows a booking takes from and how many of them there are
+def booking_stock(booking):
+    if isinstance(booking, ActivityBooking):
+        return Period.objects.filter(pk=booking.period_id), 1
+    if isinstance(booking, TourBooking):
+        return TourDay.objects.filter(pk=booking.tourday_id), 1
+    return (
+        package_days(booking.package_offer_id, booking.start_date, booking.end_date),
+        (booking.end_date - booking.start_date).days + 1,
+    )
+
+
+def hold_booking(booking):
+    """
+    Keep the stock the booking already reserved for BOOKING_HOLD_TTL, call
+    it in the transaction that reserved the stock.
+    """
+    return Hold.objects.create(
+        **{HOLD_FIELDS[type(booking)]: booking},
+        quantity=booking.quantity,
+        expires_at=timezone.now() + settings.BOOKING_HOLD_TTL,
+    )
+
+
+def settle_booking(booking):
+    """
+    Make the stock of a confirmed or paid booking permanent. The hold is
+    dropped, or the stock is reserved again if the hold already expired,
+    raises OutOfStock if it is gone by then.
+    """
+    with transaction.atomic():
+        # a hold that expired but was not swept yet still has its stock
+        deleted, _ = Hold.objects.filter(
+            **{HOLD_FIELDS[type(booking)]: booking}
+        ).delete()
+        if deleted:
+            return
+        # the sweeper may have released it while this was waiting on its lock
+        booking.refresh_from_db(fields=["expired"])
+        if not booking.expired:
+            return
+        queryset, expected = booking_stock(booking)
+        reserve(queryset, booking.quantity, expected)
+        booking.expired = False
+        booking.save(update_fields=["expired"])
+
+
+def release_expired_holds(now=None):
+    """
+    Give the stock of every hold that expired before now back, mark their
+    bookings expired and delete the holds, each step is one statement per
+    booking type. Returns the number of released holds.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = Hold.objects.filter(expires_at__lte=now)
+        # lock the expired holds so a confirmation can't settle one meanwhile
+        if not list(expired.select_for_update().values_list("pk", flat=True)):
+            return 0
+
+        held = (
+            expired.filter(activity_booking__period=OuterRef("pk"))
+            .values("activity_booking__period")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        Period.objects.filter(Exists(held)).update(stock=F("stock") + Subquery(held))
+
+        held = (
+            expired.filter(tour_booking__tourday=OuterRef("pk"))
+            .values("tour_booking__tourday")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        TourDay.objects.filter(Exists(held)).update(stock=F("stock") + Subquery(held))
+
+        held = (
+            expired.filter(
+                package_booking__package_offer=OuterRef("package_offer"),
+                package_booking__start_date__lte=OuterRef("day"),
+                package_booking__end_date__gte=OuterRef("day"),
+            )
+            .values("package_booking__package_offer")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        PackageDay.objects.filter(Exists(held)).update(
+            stock=F("stock") + Subquery(held)
+        )
+
+        for model in HOLD_FIELDS:
+            model.objects.filter(hold__expires_at__lte=now).update(expired=True)
+        released, _ = expired.delete()
+    return released
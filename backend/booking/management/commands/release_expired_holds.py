@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from booking.inventory import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Give the stock of expired booking holds back, run it from cron or "
+        "keep it running with --every"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="sweep again every given number of seconds instead of once",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_holds()
+            self.stdout.write(f"{released} expired holds released")
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from booking.qr import queue_missing, work
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue every confirmed booking without a QR code for the QR workers, "
+        "the failed ones included, or render them right away with --now"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--now",
+            action="store_true",
+            help="render them in this process instead of leaving them to the workers",
+        )
+
+    def handle(self, *args, **options):
+        queued = queue_missing()
+        self.stdout.write(f"{queued} QR codes queued")
+        if options["now"]:
+            rendered = 0
+            while batch := work(100):
+                rendered += batch
+            self.stdout.write(f"{rendered} QR codes rendered")
@@ -0,0 +1,39 @@
+import time
+from django.core.management.base import BaseCommand
+from booking.qr import work
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the QR codes of confirmed bookings in the background, start "
+        "as many workers as the load needs, they never render the same one"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="bookings of every kind claimed at once",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1,
+            help="seconds to wait when there is nothing to render",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="stop once the queue is empty instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rendered = work(options["batch_size"])
+            if rendered:
+                self.stdout.write(f"{rendered} QR codes rendered")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
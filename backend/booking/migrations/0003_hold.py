@@ -0,0 +1,72 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:39
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# activity bookings used to take their stock only on confirmation, the
+# unconfirmed ones hold nothing and must reserve again when confirmed
+def release_unconfirmed_activity_bookings(apps, schema_editor):
+    ActivityBooking = apps.get_model("booking", "ActivityBooking")
+    ActivityBooking.objects.filter(confirmed=False).update(expired=True)
+
+
+# tour and package bookings took their stock when they were made, the ones
+# that are neither confirmed nor paid get the hold a new booking would have,
+# counted from now, so the sweeper gives their stock back if they never are
+def hold_unsettled_bookings(apps, schema_editor):
+    Hold = apps.get_model("booking", "Hold")
+    expires_at = timezone.now() + timedelta(hours=24)
+    for model_name, field in [
+        ("TourBooking", "tour_booking"),
+        ("PackageBooking", "package_booking"),
+    ]:
+        model = apps.get_model("booking", model_name)
+        bookings = model.objects.filter(confirmed=False, paid=False, expired=False)
+        Hold.objects.bulk_create(
+            Hold(**{field: booking}, quantity=booking.quantity, expires_at=expires_at)
+            for booking in bookings.iterator()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitybooking',
+            name='expired',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='packagebooking',
+            name='expired',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='tourbooking',
+            name='expired',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Hold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('activity_booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='booking.activitybooking')),
+                ('package_booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='booking.packagebooking')),
+                ('tour_booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='booking.tourbooking')),
+            ],
+        ),
+        migrations.RunPython(
+            release_unconfirmed_activity_bookings, migrations.RunPython.noop
+        ),
+        migrations.RunPython(hold_unsettled_bookings, migrations.RunPython.noop),
+    ]
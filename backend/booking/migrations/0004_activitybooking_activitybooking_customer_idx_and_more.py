@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0004_activity_activity_created_idx"),
+        ("booking", "0003_hold"),
+        ("packages", "0003_alter_packageday_unique_together"),
+        ("tours", "0003_alter_tourday_unique_together"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitybooking",
+            index=models.Index(
+                fields=["customer", "created_at", "id"],
+                name="activitybooking_customer_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="packagebooking",
+            index=models.Index(
+                fields=["customer", "created_at", "id"],
+                name="packagebooking_customer_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tourbooking",
+            index=models.Index(
+                fields=["customer", "created_at", "id"], name="tourbooking_customer_idx"
+            ),
+        ),
+    ]
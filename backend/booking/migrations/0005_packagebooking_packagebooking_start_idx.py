@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0004_activitybooking_activitybooking_customer_idx_and_more"),
+        ("packages", "0004_package_package_created_idx"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="packagebooking",
+            index=models.Index(
+                fields=["package_offer", "start_date"], name="packagebooking_start_idx"
+            ),
+        ),
+    ]
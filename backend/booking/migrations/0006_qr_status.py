@@ -0,0 +1,119 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+# bookings whose QR code was rendered during the confirmation are ready,
+# render_missing_qr_codes queues the confirmed ones that have none
+def mark_ready(apps, schema_editor):
+    for model_name in ("ActivityBooking", "TourBooking", "PackageBooking"):
+        model = apps.get_model("booking", model_name)
+        model.objects.exclude(qr_code="").exclude(qr_code__isnull=True).update(
+            qr_status="ready"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0004_activity_activity_created_idx"),
+        ("booking", "0005_packagebooking_packagebooking_start_idx"),
+        ("packages", "0004_package_package_created_idx"),
+        ("tours", "0004_tour_tour_created_idx"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activitybooking",
+            name="qr_claim",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="activitybooking",
+            name="qr_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="activitybooking",
+            name="qr_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("pending", "Pending"),
+                    ("rendering", "Rendering"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="packagebooking",
+            name="qr_claim",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="packagebooking",
+            name="qr_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="packagebooking",
+            name="qr_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("pending", "Pending"),
+                    ("rendering", "Rendering"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="tourbooking",
+            name="qr_claim",
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name="tourbooking",
+            name="qr_claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="tourbooking",
+            name="qr_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "None"),
+                    ("pending", "Pending"),
+                    ("rendering", "Rendering"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activitybooking",
+            index=models.Index(
+                fields=["qr_status", "id"], name="activitybooking_qr_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="packagebooking",
+            index=models.Index(
+                fields=["qr_status", "id"], name="packagebooking_qr_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tourbooking",
+            index=models.Index(fields=["qr_status", "id"], name="tourbooking_qr_idx"),
+        ),
+        migrations.RunPython(mark_ready, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,22 @@
-import io
-import qrcode
-from django.core.files import File
+from django.core.files.base import ContentFile
 from django.db import models
 from users.models import Customer
 from activities.models import Period
 from packages.models import PackageOffer
 from tours.models import TourDay
-from django.urls import reverse
+from .tickets import make_ticket, render_ticket
 
 
-host = "http://localhost:8000"
+# the QR code of a confirmed booking is rendered on request from its ticket,
+# the qr workers only store it as a file when QR_EAGER_FILES is set, see
+# booking/qr.py
+QR_STATUSES = [
+    ("none", "None"),
+    ("pending", "Pending"),
+    ("rendering", "Rendering"),
+    ("ready", "Ready"),
+    ("failed", "Failed"),
+]
 
 
 class ActivityBooking(models.Model):
@@ -18,27 +25,28 @@ class ActivityBooking(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     confirmed = models.BooleanField(default=False)
     paid = models.BooleanField(default=False)
+    # the hold on the stock ran out before confirmation and was released
+    expired = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     qr_code = models.ImageField(upload_to="qrcodes", blank=True, null=True)
+    qr_status = models.CharField(max_length=10, choices=QR_STATUSES, default="none")
+    # the batch of the worker rendering the QR code and since when
+    qr_claim = models.CharField(max_length=32, blank=True)
+    qr_claimed_at = models.DateTimeField(null=True, blank=True)
 
-    def get_qr_code_url(self):
-        return host + reverse("confirm_activity_payment", args=[self.id])
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "created_at", "id"], name="activitybooking_customer_idx"),
+            models.Index(fields=["qr_status", "id"], name="activitybooking_qr_idx")
+        ]
+
+    def get_ticket(self):
+        return make_ticket(self)
 
     def generate_qr_code(self):
-        qr_code_url = f"{self.get_qr_code_url()}"
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_code_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        filebuffer = File(buffer)
-        self.qr_code.save(f"qr_code_{self.id}.png", filebuffer)
+        image = render_ticket(self.get_ticket())
+        # stored by the caller, a full save could undo a concurrent change
+        self.qr_code.save(f"qr_code_{self.id}.png", ContentFile(image), save=False)
 
     def __str__(self):
         return f"Booking for {self.period.activity_offer.activity.title} \
@@ -51,27 +59,28 @@ class TourBooking(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     confirmed = models.BooleanField(default=False)
     paid = models.BooleanField(default=False)
+    # the hold on the stock ran out before confirmation and was released
+    expired = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     qr_code = models.ImageField(upload_to="qrcodes", blank=True, null=True)
+    qr_status = models.CharField(max_length=10, choices=QR_STATUSES, default="none")
+    # the batch of the worker rendering the QR code and since when
+    qr_claim = models.CharField(max_length=32, blank=True)
+    qr_claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "created_at", "id"], name="tourbooking_customer_idx"),
+            models.Index(fields=["qr_status", "id"], name="tourbooking_qr_idx")
+        ]
 
-    def get_qr_code_url(self):
-        return host + reverse("confirm_tour_payment", args=[self.id])
+    def get_ticket(self):
+        return make_ticket(self)
 
     def generate_qr_code(self):
-        qr_code_url = f"{self.get_qr_code_url()}"
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_code_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        filebuffer = File(buffer)
-        self.qr_code.save(f"qr_code_{self.id}.png", filebuffer)
+        image = render_ticket(self.get_ticket())
+        # stored by the caller, a full save could undo a concurrent change
+        self.qr_code.save(f"qr_code_{self.id}.png", ContentFile(image), save=False)
 
     def __str__(self):
         return f"Booking for {self.tourday.tour_offer.title} \
@@ -85,28 +94,80 @@ class PackageBooking(models.Model):
     end_date = models.DateField()
     confirmed = models.BooleanField(default=False)
     paid = models.BooleanField(default=False)
+    # the hold on the stock ran out before confirmation and was released
+    expired = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     quantity = models.PositiveIntegerField(default=1)
     qr_code = models.ImageField(upload_to="qrcodes", blank=True, null=True)
-
-    def get_qr_code_url(self):
-        return host + reverse("confirm_package_payment", args=[self.id])
+    qr_status = models.CharField(max_length=10, choices=QR_STATUSES, default="none")
+    # the batch of the worker rendering the QR code and since when
+    qr_claim = models.CharField(max_length=32, blank=True)
+    qr_claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["customer", "created_at", "id"], name="packagebooking_customer_idx"),
+            models.Index(fields=["qr_status", "id"], name="packagebooking_qr_idx"),
+            # the upcoming arrivals of the supplier dashboard scan a date
+            # range per offer, like the (offer, day) keys of the slot tables
+            models.Index(
+                fields=["package_offer", "start_date"], name="packagebooking_start_idx"
+            ),
+        ]
+
+    def get_ticket(self):
+        return make_ticket(self)
 
     def generate_qr_code(self):
-        qr_code_url = f"{self.get_qr_code_url()}"
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_code_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill="black", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        filebuffer = File(buffer)
-        self.qr_code.save(f"qr_code_{self.id}.png", filebuffer)
+        image = render_ticket(self.get_ticket())
+        # stored by the caller, a full save could undo a concurrent change
+        self.qr_code.save(f"qr_code_{self.id}.png", ContentFile(image), save=False)
 
     def __str__(self):
         return f"Booking for {self.package_offer.package.title} by {self.customer.user.username}"
+
+
+# stock taken by a booking that is not confirmed or paid yet, the sweeper
+# gives it back once expires_at has passed
+class Hold(models.Model):
+    activity_booking = models.OneToOneField(
+        ActivityBooking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="hold",
+    )
+    tour_booking = models.OneToOneField(
+        TourBooking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="hold",
+    )
+    package_booking = models.OneToOneField(
+        PackageBooking,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="hold",
+    )
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+
+# a ticket scanned at the gate. The unique key makes the second scan of a
+# booking fail on its insert, a check-in is a single write
+class CheckIn(models.Model):
+    kind = models.CharField(max_length=20)
+    booking_id = models.PositiveIntegerField()
+    checked_in_at = models.DateTimeField(auto_now_add=True)
+    checked_in_by = models.ForeignKey(
+        "users.CustomUser", on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "booking_id"], name="checkin_booking_key"
+            )
+        ]
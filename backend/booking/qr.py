@@ -0,0 +1,93 @@
+import logging
+import uuid
+from django.conf import settings
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from .models import ActivityBooking, TourBooking, PackageBooking
+
+logger = logging.getLogger(__name__)
+
+# every kind of booking with the path to the supplier its ticket names
+BOOKINGS = {
+    ActivityBooking: "period__activity_offer__activity__supplier",
+    TourBooking: "tourday__tour_offer__tour__supplier",
+    PackageBooking: "package_offer__package__supplier",
+}
+
+# with QR_EAGER_FILES confirming a booking sets its qr_status to
+# "pending" and the QR code is stored as a file as well. The bookings are
+# the queue and any number of run_qr_worker processes render them.
+# Workers claim their batches with conditional UPDATE statements like the
+# stock changes so no booking is rendered by two workers, and a claim
+# older than QR_CLAIM_TIMEOUT belongs to a worker that died and is taken
+# over
+
+
+def _claimable():
+    stale = timezone.now() - settings.QR_CLAIM_TIMEOUT
+    return Q(qr_status="pending") | Q(qr_status="rendering", qr_claimed_at__lt=stale)
+
+
+def claim(model, limit):
+    """
+    Claim up to limit bookings of model waiting for their QR code, returns
+    the claim and the claimed bookings.
+    """
+    token = uuid.uuid4().hex
+    ids = model.objects.filter(_claimable()).order_by("pk").values("pk")[:limit]
+    model.objects.filter(_claimable(), pk__in=Subquery(ids)).update(
+        qr_status="rendering", qr_claim=token, qr_claimed_at=timezone.now()
+    )
+    claimed = model.objects.filter(qr_claim=token, qr_status="rendering")
+    return token, list(claimed.select_related(BOOKINGS[model]))
+
+
+def render(booking, token):
+    """
+    Render and store the QR code of a claimed booking, returns False when
+    it failed or the claim was taken over in the meantime.
+    """
+    claimed = type(booking).objects.filter(pk=booking.pk, qr_claim=token)
+    try:
+        booking.generate_qr_code()
+    except Exception:
+        logger.exception("QR code of %s %s failed", type(booking).__name__, booking.pk)
+        claimed.update(qr_status="failed", qr_claim="", qr_claimed_at=None)
+        return False
+    stored = claimed.update(
+        qr_code=booking.qr_code.name,
+        qr_status="ready",
+        qr_claim="",
+        qr_claimed_at=None,
+    )
+    if not stored:
+        # the booking went to another worker, its file is the one kept
+        booking.qr_code.delete(save=False)
+    return bool(stored)
+
+
+def work(batch_size):
+    """
+    Render one batch of every kind of booking, returns the number of QR
+    codes rendered.
+    """
+    rendered = 0
+    for model in BOOKINGS:
+        token, bookings = claim(model, batch_size)
+        rendered += sum(render(booking, token) for booking in bookings)
+    return rendered
+
+
+def queue_missing():
+    """
+    Queue the confirmed bookings that have no QR code and are not queued
+    yet, the failed ones included. One UPDATE per kind of booking.
+    """
+    queued = 0
+    for model in BOOKINGS:
+        queued += (
+            model.objects.filter(confirmed=True, qr_status__in=["none", "failed"])
+            .filter(Q(qr_code="") | Q(qr_code__isnull=True))
+            .update(qr_status="pending")
+        )
+    return queued
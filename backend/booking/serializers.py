@@ -1,23 +1,46 @@
-from rest_framework.serializers import ModelSerializer
+from django.urls import reverse
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
 from .models import ActivityBooking, PackageBooking, TourBooking
 from activities.serializers import PeriodSerializer
 from packages.serializers import PackageSerializer, PackageOfferSerializer
 from tours.serializers import TourDaySerializer
 from users.serializers import CustomerSerializer
+from api.query_plan import QueryPlanMixin
 
 
-class ActivityBookingSerializer(ModelSerializer):
+class TicketMixin:
+    """
+    qr_code_url of the QR code image of a confirmed booking, rendered on
+    request from its ticket (see booking.views.ticket_qr_code).
+    """
+
+    def get_qr_code_url(self, booking):
+        if not booking.confirmed:
+            return None
+        return reverse(
+            "ticket_qr_code",
+            kwargs={"ticket": booking.get_ticket(), "image_format": "png"},
+        )
+
+
+class ActivityBookingSerializer(TicketMixin, QueryPlanMixin, ModelSerializer):
+    # the ticket names the supplier
+    related = ["period__activity_offer__activity__supplier"]
     customer = CustomerSerializer()
     period = PeriodSerializer()
+    qr_code_url = SerializerMethodField()
 
     class Meta:
         model = ActivityBooking
-        fields = "__all__"
+        exclude = ["qr_claim", "qr_claimed_at"]
 
 
-class PackageBookingSerializer(ModelSerializer):
+class PackageBookingSerializer(TicketMixin, QueryPlanMixin, ModelSerializer):
+    # the ticket names the supplier
+    related = ["package_offer__package__supplier"]
     package_offer = PackageOfferSerializer()
     customer = CustomerSerializer()
+    qr_code_url = SerializerMethodField()
 
     class Meta:
         model = PackageBooking
@@ -29,24 +52,32 @@ class PackageBookingSerializer(ModelSerializer):
             "end_date",
             "confirmed",
             "paid",
+            "expired",
             "quantity",
             "created_at",
             "qr_code",
+            "qr_status",
+            "qr_code_url",
         ]
         read_only_fields = [
             "id",
             "customer",
             "confirmed",
             "paid",
+            "expired",
             "created_at",
             "qr_code",
+            "qr_status",
         ]
 
 
-class TourBookingSerializer(ModelSerializer):
+class TourBookingSerializer(TicketMixin, QueryPlanMixin, ModelSerializer):
+    # the ticket names the supplier
+    related = ["tourday__tour_offer__tour__supplier"]
     tourday = TourDaySerializer()
     customer = CustomerSerializer()
+    qr_code_url = SerializerMethodField()
 
     class Meta:
         model = TourBooking
-        fields = "__all__"
+        exclude = ["qr_claim", "qr_claimed_at"]
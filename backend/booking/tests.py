@@ -1,3 +1,477 @@
-from django.test import TestCase
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from activities.models import ActivityOffer, Period
+from packages.models import PackageOffer, PackageDay
+from tours.models import TourDay, TourOffer
+from rest_framework.test import APIClient
+from users.models import CustomUser
+from api.testing import (
+    make_activity,
+    make_customer,
+    make_package,
+    make_supplier,
+    make_tour,
+    make_tour_day,
+)
+from .models import TourBooking, PackageBooking, Hold
+from .qr import claim, render, work
+from .tickets import make_ticket, read_ticket
+from .inventory import (
+    OutOfStock,
+    reserve,
+    reserve_period,
+    reserve_package_days,
+    booking_stock,
+    hold_booking,
+    settle_booking,
+    release_expired_holds,
+)
 
-# Create your tests here.
+
+class ReservationContentionTests(TransactionTestCase):
+    threads = 20
+
+    def setUp(self):
+        self.supplier = make_supplier()
+        self.today = date.today()
+
+    def contend(self, reserve_once):
+        """
+        Run reserve_once from many threads released at the same time and
+        return how many of them got their reservation. A thread that hit a
+        database error rather than OutOfStock fails the test.
+        """
+        barrier = threading.Barrier(self.threads)
+        reserved = []
+        failed = []
+
+        def worker():
+            try:
+                barrier.wait()
+                reserve_once()
+                reserved.append(True)
+            except OutOfStock:
+                pass
+            except OperationalError as error:
+                failed.append(error)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(failed, [])
+        return len(reserved)
+
+    def test_period_is_never_oversold(self):
+        activity = make_activity(self.supplier, end_time=time(9))
+        offer = ActivityOffer.objects.create(
+            activity=activity, title="Standard", price=10, stock=5
+        )
+        period = Period.objects.create(
+            day=self.today,
+            time_from=time(8),
+            time_to=time(9),
+            stock=5,
+            activity_offer=offer,
+        )
+
+        reserved = self.contend(lambda: reserve_period(period, 2))
+
+        # 5 in stock is enough for exactly two reservations of 2
+        period.refresh_from_db()
+        self.assertEqual(reserved, 2)
+        self.assertEqual(period.stock, 5 - 2 * reserved)
+
+    def test_package_days_are_reserved_together(self):
+        package = make_package(self.supplier, days=2)
+        offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=100, stock=3
+        )
+        PackageDay.objects.bulk_create(
+            PackageDay(
+                day=self.today + timedelta(days=offset), stock=3, package_offer=offer
+            )
+            for offset in range(3)
+        )
+        # the last day has less stock than the others
+        PackageDay.objects.filter(day=self.today + timedelta(days=2)).update(stock=1)
+        end_date = self.today + timedelta(days=2)
+
+        reserved = self.contend(
+            lambda: reserve_package_days(offer, self.today, end_date, 1)
+        )
+
+        # the last day only has room for one
+        self.assertEqual(reserved, 1)
+        stocks = list(
+            PackageDay.objects.order_by("day").values_list("stock", flat=True)
+        )
+        self.assertEqual(stocks, [3 - reserved, 3 - reserved, 1 - reserved])
+        with self.assertRaises(OutOfStock):
+            reserve_package_days(offer, self.today, end_date, 2)
+        self.assertEqual(
+            list(PackageDay.objects.order_by("day").values_list("stock", flat=True)),
+            stocks,
+        )
+
+
+class HoldTests(TestCase):
+    def setUp(self):
+        supplier = make_supplier()
+        self.customer = make_customer()
+        self.today = date.today()
+        self.tourday = make_tour_day(make_tour(supplier))
+        package = make_package(supplier)
+        self.package_offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=100, stock=4
+        )
+        PackageDay.objects.bulk_create(
+            PackageDay(
+                day=self.today + timedelta(days=offset),
+                stock=4,
+                package_offer=self.package_offer,
+            )
+            for offset in range(2)
+        )
+
+    def book(self, booking):
+        queryset, expected = booking_stock(booking)
+        reserve(queryset, booking.quantity, expected)
+        booking.save()
+        hold_booking(booking)
+        return booking
+
+    def test_expired_holds_give_their_stock_back(self):
+        first = self.book(
+            TourBooking(tourday=self.tourday, customer=self.customer, quantity=2)
+        )
+        self.book(TourBooking(tourday=self.tourday, customer=self.customer, quantity=1))
+        package_booking = self.book(
+            PackageBooking(
+                package_offer=self.package_offer,
+                customer=self.customer,
+                start_date=self.today,
+                end_date=self.today + timedelta(days=1),
+                quantity=3,
+            )
+        )
+        settle_booking(first)
+
+        later = timezone.now() + settings.BOOKING_HOLD_TTL + timedelta(seconds=1)
+        self.assertEqual(release_expired_holds(later), 2)
+
+        self.tourday.refresh_from_db()
+        self.assertEqual(self.tourday.stock, 3)
+        self.assertEqual(
+            list(PackageDay.objects.values_list("stock", flat=True)), [4, 4]
+        )
+        self.assertFalse(Hold.objects.exists())
+        self.assertEqual(
+            list(TourBooking.objects.order_by("pk").values_list("expired", flat=True)),
+            [False, True],
+        )
+        package_booking.refresh_from_db()
+        self.assertTrue(package_booking.expired)
+
+        # an expired booking takes its stock again when it gets confirmed
+        settle_booking(package_booking)
+        self.assertFalse(package_booking.expired)
+        self.assertEqual(
+            list(PackageDay.objects.values_list("stock", flat=True)), [1, 1]
+        )
+
+    def test_holds_that_did_not_expire_are_kept(self):
+        self.book(TourBooking(tourday=self.tourday, customer=self.customer, quantity=2))
+        self.assertEqual(release_expired_holds(), 0)
+        self.tourday.refresh_from_db()
+        self.assertEqual(self.tourday.stock, 3)
+        self.assertEqual(Hold.objects.count(), 1)
+
+
+@override_settings(AVAILABILITY_MODE="lazy")
+class LazyPackageBookingTests(TestCase):
+    def setUp(self):
+        self.start = date.today() + timedelta(days=1)
+        package = make_package(make_supplier(), days=6, period=3)
+        self.offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=100, stock=2
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(make_customer().user)
+
+    def book(self, quantity=1):
+        return self.client.post(
+            reverse("create_package_booking"),
+            {
+                "package_offer_id": self.offer.pk,
+                "start_date": f"{self.start:%Y-%m-%d}",
+                "quantity": quantity,
+            },
+        )
+
+    def test_the_days_are_stored_with_the_booking(self):
+        response = self.book()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(PackageDay.objects.order_by("day").values_list("stock", flat=True)),
+            [1, 1, 1],
+        )
+
+    def test_a_failed_booking_stores_no_day(self):
+        response = self.book(quantity=3)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PackageDay.objects.exists())
+
+        # a day off in the range
+        package = self.offer.package
+        package.days_off = f"{self.start + timedelta(days=1):%A}"
+        package.save()
+        response = self.book()
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(PackageDay.objects.exists())
+
+
+@override_settings(AVAILABILITY_MODE="lazy")
+class LazySlotBookingTests(TestCase):
+    def setUp(self):
+        supplier = make_supplier()
+        self.day = date.today() + timedelta(days=1)
+        self.activity_offer = ActivityOffer.objects.create(
+            activity=make_activity(supplier, days=5), title="Std", price=10, stock=2
+        )
+        self.tour_offer = TourOffer.objects.create(
+            tour=make_tour(supplier, days=5), title="Std", price=10, stock=2
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(make_customer().user)
+
+    def book_activity(self, quantity, time_from="08:00"):
+        return self.client.post(
+            reverse("create_activity_booking"),
+            {
+                "offer_id": self.activity_offer.pk,
+                "day": f"{self.day:%Y-%m-%d}",
+                "time_from": time_from,
+                "quantity": quantity,
+            },
+        )
+
+    def book_tour(self, quantity):
+        return self.client.post(
+            reverse("create_tour_booking"),
+            {
+                "tour_offer_id": self.tour_offer.pk,
+                "day": f"{self.day:%Y-%m-%d}",
+                "quantity": quantity,
+            },
+        )
+
+    def test_a_failed_booking_stores_no_slot(self):
+        self.assertEqual(self.book_activity(3).status_code, 400)
+        self.assertEqual(self.book_tour(3).status_code, 400)
+        self.assertEqual(self.book_tour(0).status_code, 400)
+        self.assertFalse(Period.objects.exists())
+        self.assertFalse(TourDay.objects.exists())
+
+        # the slot is stored along with a booking that goes through
+        self.assertEqual(self.book_activity(2).status_code, 201)
+        self.assertEqual(self.book_tour(2).status_code, 201)
+        self.assertEqual(Period.objects.get().stock, 0)
+        self.assertEqual(TourDay.objects.get().stock, 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class QrCodeTests(TestCase):
+    def setUp(self):
+        self.supplier = make_supplier()
+        customer = make_customer()
+        tourday = make_tour_day(make_tour(self.supplier))
+        self.bookings = [
+            TourBooking.objects.create(tourday=tourday, customer=customer)
+            for _ in range(3)
+        ]
+
+    def statuses(self):
+        return list(
+            TourBooking.objects.order_by("pk").values_list("qr_status", flat=True)
+        )
+
+    def test_confirming_serves_the_qr_code_from_the_ticket(self):
+        client = APIClient()
+        client.force_authenticate(self.supplier.user)
+        booking = self.bookings[0]
+
+        url = reverse("confirm_tour_booking", kwargs={"booking_id": booking.pk})
+        response = client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["qr_status"], "none")
+        self.assertEqual(work(10), 0)
+        url = response.data["qr_code_url"]
+        self.assertIn(make_ticket(booking), url)
+
+        with self.assertNumQueries(0):
+            response = APIClient().get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+        response = APIClient().get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_qr_code_formats_and_sizes(self):
+        ticket = make_ticket(self.bookings[0])
+
+        def get(image_format, **params):
+            url = reverse(
+                "ticket_qr_code",
+                kwargs={"ticket": ticket, "image_format": image_format},
+            )
+            return APIClient().get(url, params)
+
+        small = get("png", size="small")
+        large = get("png", size="large")
+        self.assertLess(len(small.content), len(large.content))
+        svg = get("svg")
+        self.assertEqual(svg["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", svg.content)
+        self.assertEqual(get("gif").status_code, 400)
+        self.assertEqual(get("png", size="huge").status_code, 400)
+        ticket += "x"
+        self.assertEqual(get("png").status_code, 404)
+
+    @override_settings(QR_EAGER_FILES=True)
+    def test_confirming_queues_the_qr_code(self):
+        client = APIClient()
+        client.force_authenticate(self.supplier.user)
+        booking = self.bookings[0]
+
+        url = reverse("confirm_tour_booking", kwargs={"booking_id": booking.pk})
+        response = client.post(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["qr_status"], "pending")
+        self.assertIsNone(response.data["qr_code"])
+        self.assertEqual(work(10), 1)
+        booking.refresh_from_db()
+        self.assertEqual(booking.qr_status, "ready")
+        self.assertTrue(booking.qr_code.storage.exists(booking.qr_code.name))
+        self.assertEqual(work(10), 0)
+
+    def test_workers_claim_different_bookings(self):
+        TourBooking.objects.update(confirmed=True, qr_status="pending")
+
+        first, first_bookings = claim(TourBooking, 2)
+        second, second_bookings = claim(TourBooking, 2)
+
+        self.assertEqual(
+            [booking.pk for booking in first_bookings + second_bookings],
+            [booking.pk for booking in self.bookings],
+        )
+        self.assertEqual(claim(TourBooking, 2)[1], [])
+
+        # the claim of a worker that died is taken over, its late result
+        # is dropped
+        TourBooking.objects.filter(qr_claim=first).update(
+            qr_claimed_at=timezone.now() - settings.QR_CLAIM_TIMEOUT
+        )
+        _, taken_over = claim(TourBooking, 5)
+        self.assertEqual(taken_over, first_bookings)
+        storage = first_bookings[0].qr_code.storage
+
+        def files():
+            return storage.listdir("qrcodes")[1] if storage.exists("qrcodes") else []
+
+        before = files()
+        self.assertFalse(render(first_bookings[0], first))
+        # without leaving its file behind
+        self.assertEqual(files(), before)
+        self.assertTrue(render(second_bookings[0], second))
+        self.assertEqual(self.statuses(), ["rendering", "rendering", "ready"])
+
+    def test_render_missing_qr_codes(self):
+        TourBooking.objects.filter(pk=self.bookings[0].pk).update(confirmed=True)
+        TourBooking.objects.filter(pk=self.bookings[1].pk).update(
+            confirmed=True, qr_status="pending"
+        )
+        with mock.patch.object(
+            TourBooking, "generate_qr_code", side_effect=OSError("disk full")
+        ), self.assertLogs("booking.qr", "ERROR"):
+            self.assertEqual(work(10), 0)
+        self.assertEqual(self.statuses(), ["none", "failed", "none"])
+
+        call_command("render_missing_qr_codes", "--now", stdout=mock.Mock())
+
+        # unconfirmed bookings get no QR code
+        self.assertEqual(self.statuses(), ["ready", "ready", "none"])
+
+    def test_tickets_are_signed(self):
+        booking = self.bookings[0]
+        ticket = make_ticket(booking)
+
+        self.assertEqual(
+            read_ticket(ticket),
+            {
+                "type": "tour",
+                "booking_id": booking.pk,
+                "slot": f"{date.today():%Y%m%d}",
+                "quantity": 1,
+                "supplier": self.supplier.user_id,
+            },
+        )
+        forged = ticket.replace(f"t.{booking.pk}.", f"t.{booking.pk + 1}.")
+        for invalid in (forged, "t.1.20240101.1.1", "", None):
+            with self.subTest(ticket=invalid), self.assertRaises(ValueError):
+                read_ticket(invalid)
+
+    def test_check_in(self):
+        client = APIClient()
+        client.force_authenticate(self.supplier.user)
+        ticket = make_ticket(self.bookings[0])
+
+        # a single insert between the statements of its savepoint
+        with self.assertNumQueries(3):
+            response = client.post(reverse("check_in"), {"ticket": ticket})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["booking_id"], self.bookings[0].pk)
+
+        response = client.post(reverse("check_in"), {"ticket": ticket})
+        self.assertEqual(response.status_code, 409)
+        self.assertIsNotNone(response.data["checked_in_at"])
+        response = client.post(reverse("check_in"), {"ticket": ticket + "x"})
+        self.assertEqual(response.status_code, 400)
+
+        other = CustomUser.objects.create(username="other", is_supplier=True)
+        client.force_authenticate(other)
+        ticket = make_ticket(self.bookings[1])
+        response = client.post(reverse("check_in"), {"ticket": ticket})
+        self.assertEqual(response.status_code, 403)
+        response = client.post(reverse("check_in"), [ticket], format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_tickets_only_check_in_on_their_day(self):
+        client = APIClient()
+        client.force_authenticate(self.supplier.user)
+        ticket = make_ticket(self.bookings[0])
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        with mock.patch("django.utils.timezone.localdate", return_value=tomorrow):
+            response = client.post(reverse("check_in"), {"ticket": ticket})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["day"], date.today())
+            with override_settings(TICKET_GRACE_DAYS=1):
+                response = client.post(reverse("check_in"), {"ticket": ticket})
+                self.assertEqual(response.status_code, 201)
@@ -0,0 +1,93 @@
+import functools
+import io
+from datetime import datetime
+import qrcode
+import qrcode.image.svg
+from django.core import signing
+
+# the QR code of a booking is a ticket signed with the SECRET_KEY, the gate
+# checks it without reading the database:
+# <kind>.<booking id>.<slot>.<quantity>.<user id of the supplier>:<signature>
+SIGNER = signing.Signer(salt="booking.ticket")
+
+KINDS = {"a": "activity", "t": "tour", "p": "package"}
+
+
+def _activity(booking):
+    period = booking.period
+    supplier = period.activity_offer.activity.supplier
+    return "a", f"{period.day:%Y%m%d}{period.time_from:%H%M}", supplier.user_id
+
+
+def _tour(booking):
+    tourday = booking.tourday
+    return "t", f"{tourday.day:%Y%m%d}", tourday.tour_offer.tour.supplier.user_id
+
+
+def _package(booking):
+    supplier = booking.package_offer.package.supplier
+    return "p", f"{booking.start_date:%Y%m%d}", supplier.user_id
+
+
+TICKETS = {
+    "ActivityBooking": _activity,
+    "TourBooking": _tour,
+    "PackageBooking": _package,
+}
+
+
+def make_ticket(booking):
+    code, slot, supplier = TICKETS[type(booking).__name__](booking)
+    return SIGNER.sign(f"{code}.{booking.pk}.{slot}.{booking.quantity}.{supplier}")
+
+
+def read_ticket(ticket):
+    """
+    The booking a ticket was made for as {"type", "booking_id", "slot",
+    "quantity", "supplier"}, raises ValueError if it was not signed here.
+    """
+    try:
+        code, booking_id, slot, quantity, supplier = SIGNER.unsign(
+            ticket.strip()
+        ).split(".")
+        return {
+            "type": KINDS[code],
+            "booking_id": int(booking_id),
+            "slot": slot,
+            "quantity": int(quantity),
+            "supplier": int(supplier),
+        }
+    except (signing.BadSignature, AttributeError, KeyError, ValueError) as error:
+        raise ValueError("Invalid ticket") from error
+
+
+def ticket_day(ticket):
+    # the day of the slot of a read ticket, the start day for a package
+    return datetime.strptime(ticket["slot"][:8], "%Y%m%d").date()
+
+
+# box sizes of the QR code images, "medium" is the one stored by the workers
+SIZES = {"small": 4, "medium": 10, "large": 16}
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+# a ticket never changes once it is signed, the images of the last ones
+# asked for are kept per process instead of being rendered on every request
+@functools.lru_cache(maxsize=512)
+def render_ticket(ticket, image_format="png", size="medium"):
+    """
+    The QR code of a ticket as PNG or SVG bytes, in one of SIZES.
+    """
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=SIZES[size],
+        border=4,
+    )
+    qr.add_data(ticket)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    if image_format == "svg":
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer)
+    return buffer.getvalue()
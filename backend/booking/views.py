@@ -1,22 +1,46 @@
+import hashlib
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from notifications.models import Notification
+from notifications.outbox import notify
 from rest_framework.decorators import (
     api_view,
     permission_classes,
 )
-from activities.models import Period
-from tours.models import TourDay
+from activities.models import Period, ActivityOffer
+from activities.slots import lazy_availability
+from tours.models import TourDay, TourOffer
 from packages.models import PackageDay, PackageOffer
 from users.models import Customer
 from .models import ActivityBooking, TourBooking, PackageBooking
+from .tickets import FORMATS, SIZES, read_ticket, render_ticket
 from .serializers import (
     ActivityBookingSerializer,
     TourBookingSerializer,
     PackageBookingSerializer,
 )
+from .inventory import (
+    OutOfStock,
+    hold_booking,
+    reserve_period,
+    reserve_tour_day,
+    reserve_package_days,
+)
+from django.db import transaction
+from dashboard.rollup import record_booking
 from datetime import timedelta, datetime
+from django.utils.dateparse import parse_date, parse_time
+
+
+# invalid quantities come back as 0 so they fail the "at least 1" check
+def get_quantity(request):
+    try:
+        return int(request.data.get("quantity", 1))
+    except (TypeError, ValueError):
+        return 0
 
 
 @permission_classes([IsAuthenticated])
@@ -27,37 +51,73 @@ def activity_booking_create(request):
 
     try:
         period_id = request.data.get("period_id")
-        quantity = request.data.get("quantity")
-        if not period_id:
+        offer_id = request.data.get("offer_id")
+        quantity = get_quantity(request)
+        if quantity < 1:
+            return Response(
+                {"error": "Quantity must be at least 1."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        offer = None
+        if period_id:
+            period = Period.objects.select_related(
+                "activity_offer__activity__supplier__user"
+            ).get(pk=period_id)
+        elif offer_id and lazy_availability():
+            # computed periods have no id yet, they are stored on booking
+            day = parse_date(request.data.get("day") or "")
+            time_from = parse_time(request.data.get("time_from") or "")
+            if not day or not time_from:
+                return Response(
+                    {"error": "Day and time_from are required."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            offer = ActivityOffer.objects.select_related(
+                "activity__supplier__user"
+            ).get(pk=offer_id)
+        else:
             return Response(
                 {"error": "Period is required."}, status=status.HTTP_400_BAD_REQUEST
             )
-        period = Period.objects.get(pk=period_id)
         customer = Customer.objects.get(user=request.user)
 
-        if period.stock < 1:
+        try:
+            # the period stored for a computed slot only stays along with
+            # the booking
+            with transaction.atomic():
+                if offer is not None:
+                    period = offer.get_or_create_period(day, time_from)
+                activity = period.activity_offer.activity
+                reserve_period(period, quantity)
+                booking = ActivityBooking.objects.create(
+                    period=period, customer=customer, quantity=quantity
+                )
+                hold_booking(booking)
+                record_booking(booking, created=True)
+                notify(
+                    (
+                        request.user.pk,
+                        f"Booking {activity.title} created waiting for confirmation from {activity.supplier.user.username}",
+                    ),
+                    (
+                        activity.supplier.user_id,
+                        f"Booking {activity.title} created waiting for your confirmation",
+                    ),
+                )
+        except OutOfStock:
             return Response(
                 {"error": "No available slots for this period."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        booking = ActivityBooking.objects.create(
-            period=period, customer=customer, quantity=quantity
-        )
 
         serializer = ActivityBookingSerializer(booking)
-        Notification.objects.create(
-            user=request.user,
-            message=f"Booking {period.activity_offer.activity.title} created waiting for confirmation from {period.activity_offer.activity.supplier.user.username}",
-        )
-        Notification.objects.create(
-            user=period.activity_offer.activity.supplier.user,
-            message=f"Booking {period.activity_offer.activity.title} created waiting for your confirmation",
-        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     except Period.DoesNotExist:
         return Response(
             {"error": "Period not found."}, status=status.HTTP_404_NOT_FOUND
         )
+    except ActivityOffer.DoesNotExist:
+        return Response({"error": "Offer not found."}, status=status.HTTP_404_NOT_FOUND)
     except Customer.DoesNotExist:
         return Response(
             {"error": "Customer not found."}, status=status.HTTP_404_NOT_FOUND
@@ -71,43 +131,85 @@ def activity_booking_create(request):
 def tour_booking_create(request):
     customer = request.user.customer
     tourday_id = request.data.get("tourday_id")
-    quantity = request.data.get("quantity", 1)
+    tour_offer_id = request.data.get("tour_offer_id")
+    quantity = get_quantity(request)
 
-    if not tourday_id:
+    if not tourday_id and not (tour_offer_id and lazy_availability()):
         return Response(
             {"error": "Tour day ID is required."}, status=status.HTTP_400_BAD_REQUEST
         )
 
+    if quantity < 1:
+        return Response(
+            {"error": "Quantity must be at least 1."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    lazy_offer = None
     try:
-        tourday = TourDay.objects.get(id=tourday_id)
-    except TourDay.DoesNotExist:
+        if tourday_id:
+            tourday = TourDay.objects.select_related(
+                "tour_offer__tour__supplier__user"
+            ).get(id=tourday_id)
+        else:
+            # computed tour days have no id yet, they are stored on booking
+            day = parse_date(request.data.get("day") or "")
+            if not day:
+                return Response(
+                    {"error": "Day is required."}, status=status.HTTP_400_BAD_REQUEST
+                )
+            lazy_offer = TourOffer.objects.select_related("tour__supplier__user").get(
+                id=tour_offer_id
+            )
+    except (TourDay.DoesNotExist, TourOffer.DoesNotExist):
         return Response(
             {"error": "Tour day not found."}, status=status.HTTP_404_NOT_FOUND
         )
 
-    if tourday.stock < quantity:
+    try:
+        # the tour day stored for a computed day only stays along with the
+        # booking
+        with transaction.atomic():
+            if lazy_offer is not None:
+                tourday = lazy_offer.get_or_create_tour_day(day)
+            offer = tourday.tour_offer
+            reserve_tour_day(tourday, quantity)
+            booking = TourBooking.objects.create(
+                tourday=tourday, customer=customer, quantity=quantity
+            )
+            hold_booking(booking)
+            record_booking(booking, created=True)
+            notify(
+                (
+                    request.user.pk,
+                    f"Booking {offer.title} created waiting for confirmation from {offer.tour.supplier.user.username}",
+                ),
+                (
+                    offer.tour.supplier.user_id,
+                    f"New booking for {offer.title} created waiting for your confirmation",
+                ),
+            )
+    except TourDay.DoesNotExist:
+        return Response(
+            {"error": "Tour day not found."}, status=status.HTTP_404_NOT_FOUND
+        )
+    except OutOfStock:
+        # a tour day stored for this booking was rolled back with it and
+        # still has the stock of its offer
+        stock = (
+            TourDay.objects.filter(pk=tourday.pk)
+            .values_list("stock", flat=True)
+            .first()
+        )
         return Response(
             {
-                "error": f"Not enough stock for this tour day. Available stock: {tourday.stock}"
+                "error": f"Not enough stock for this tour day. Available stock: {tourday.stock if stock is None else stock}"
             },
             status=status.HTTP_400_BAD_REQUEST,
         )
-
-    tourday.stock -= quantity
-    tourday.save()
-
-    booking = TourBooking(tourday=tourday, customer=customer, quantity=quantity)
-    booking.save()
+    tourday.refresh_from_db(fields=["stock"])
 
     serializer = TourBookingSerializer(booking)
-    Notification.objects.create(
-        user=request.user,
-        message=f"Booking {tourday.tour_offer.title} created waiting for confirmation from {tourday.tour_offer.tour.supplier.user.username}",
-    )
-    Notification.objects.create(
-        user=tourday.tour_offer.tour.supplier.user,
-        message=f"New booking for {tourday.tour_offer.title} created waiting for your confirmation",
-    )
 
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -144,7 +246,7 @@ def package_booking_create(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    quantity = request.data.get("quantity", 1)
+    quantity = get_quantity(request)
     if quantity < 1:
         return Response(
             {"error": "Quantity must be at least 1."},
@@ -158,35 +260,74 @@ def package_booking_create(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    package_days = PackageDay.objects.filter(
-        package_offer=package_offer, day__range=(start_date, end_date)
-    )
-    if package_days.count() != package_offer.package.period:
-        return Response(
-            {"error": "Package days not fully available."},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    # all the days are reserved in one statement or none of them, and the
+    # days stored for a lazy package only stay along with the booking
+    with transaction.atomic():
+        if lazy_availability():
+            package_days = package_offer.get_or_create_package_days(
+                start_date, end_date
+            )
+        else:
+            package_days = PackageDay.objects.filter(
+                package_offer=package_offer, day__range=(start_date, end_date)
+            )
+        if package_days.count() != package_offer.package.period:
+            transaction.set_rollback(True)
+            return Response(
+                {"error": "Package days not fully available."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-    for day in package_days:
-        if day.stock < quantity:
+        try:
+            reserve_package_days(package_offer, start_date, end_date, quantity)
+        except OutOfStock:
+            day = package_days.order_by("stock").first()
+            transaction.set_rollback(True)
             return Response(
                 {
                     "error": f"Not enough stock for {day.day}. Available stock: {day.stock}"
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-    for day in package_days:
-        day.stock -= quantity
-        day.save()
-
-    booking = PackageBooking.objects.create(
-        package_offer=package_offer,
-        customer=customer,
-        start_date=start_date,
-        end_date=end_date,
-        quantity=quantity,
-    )
+        booking = PackageBooking.objects.create(
+            package_offer=package_offer,
+            customer=customer,
+            start_date=start_date,
+            end_date=end_date,
+            quantity=quantity,
+        )
+        hold_booking(booking)
+        record_booking(booking, created=True)
 
     serializer = PackageBookingSerializer(booking)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# a plain view, the images are not negotiated like the JSON endpoints. The
+# signed ticket is the whole content of the code so the image needs no
+# database read. The ticket is a credential, only the browser of its
+# holder keeps the image and revalidates it with the ETag
+@require_GET
+def ticket_qr_code(request, ticket, image_format):
+    size = request.GET.get("size", "medium")
+    if image_format not in FORMATS or size not in SIZES:
+        return JsonResponse(
+            {"error": "Format must be png or svg, size small, medium or large."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        read_ticket(ticket)
+    except ValueError:
+        return JsonResponse(
+            {"error": "Invalid ticket"}, status=status.HTTP_404_NOT_FOUND
+        )
+
+    image = render_ticket(ticket, image_format, size)
+    etag = f'"{hashlib.md5(image).hexdigest()}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(image, content_type=FORMATS[image_format])
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
@@ -0,0 +1,156 @@
+from datetime import date, datetime, time
+from django.db.models import F, IntegerField, Q, Value
+from django.utils import timezone
+from booking.models import ActivityBooking, TourBooking, PackageBooking
+
+# where every booking model keeps the day and the time its customer arrives
+# and the path to its supplier. The slot orders arrivals starting together
+ARRIVALS = [
+    (
+        "activity",
+        ActivityBooking,
+        "period__day",
+        "period__time_from",
+        "period__activity_offer__activity__supplier",
+    ),
+    (
+        "tour",
+        TourBooking,
+        "tourday__day",
+        "tourday__tour_offer__tour__pickup_time",
+        "tourday__tour_offer__tour__supplier",
+    ),
+    (
+        "package",
+        PackageBooking,
+        "start_date",
+        "package_offer__package__pickup_time",
+        "package_offer__package__supplier",
+    ),
+]
+
+# the arrival with the customer details is read in the same query
+COLUMNS = [
+    "arrival_day",
+    "arrival_time",
+    "slot",
+    "id",
+    "title",
+    "quantity",
+    "confirmed",
+    "paid",
+    "customer__user__username",
+    "customer__user__email",
+    "customer__user__phone",
+]
+TITLES = {
+    "activity": "period__activity_offer__activity__title",
+    "tour": "tourday__tour_offer__tour__title",
+    "package": "package_offer__package__title",
+}
+
+
+def _between(day, time_field, start, end):
+    # the day range is what the (day, time) indexes are scanned by, the
+    # times only matter on the first and the last day
+    return (
+        Q(**{f"{day}__range": (start.date(), end.date())})
+        & (
+            Q(**{f"{day}__gt": start.date()})
+            | Q(**{day: start.date(), f"{time_field}__gte": start.time()})
+        )
+        & (
+            Q(**{f"{day}__lt": end.date()})
+            | Q(**{day: end.date(), f"{time_field}__lte": end.time()})
+        )
+    )
+
+
+def _after(day, time_field, slot, cursor):
+    # rows after the cursor in (day, time, slot, id) order
+    after_day, after_time, after_slot, after_id = cursor
+    later = Q(**{f"{day}__gt": after_day}) | Q(
+        **{day: after_day, f"{time_field}__gt": after_time}
+    )
+    same_start = Q(**{day: after_day, time_field: after_time})
+    if slot > after_slot:
+        return later | same_start
+    if slot == after_slot:
+        return later | (same_start & Q(id__gt=after_id))
+    return later
+
+
+def upcoming_arrivals(supplier, start, end, limit, cursor=None):
+    """
+    Bookings of the supplier whose customers arrive between the local
+    datetimes start and end, ordered by arrival, as a list of arrivals and
+    the cursor of the next page (None on the last one). A cursor is
+    [day, time, slot, id] of the last arrival of a page in ISO format, raises
+    ValueError for any other. A page is a single UNION query.
+    """
+    if cursor:
+        try:
+            after_day, after_time, after_slot, after_id = cursor
+            cursor = [
+                date.fromisoformat(after_day),
+                time.fromisoformat(after_time),
+                int(after_slot),
+                int(after_id),
+            ]
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid cursor") from error
+    parts = []
+    for slot, (kind, model, day, time_field, supplier_path) in enumerate(ARRIVALS):
+        queryset = model.objects.filter(
+            _between(day, time_field, start, end),
+            **{supplier_path: supplier},
+            expired=False,
+        )
+        if cursor:
+            queryset = queryset.filter(_after(day, time_field, slot, cursor))
+        parts.append(
+            queryset.annotate(
+                arrival_day=F(day),
+                arrival_time=F(time_field),
+                slot=Value(slot, output_field=IntegerField()),
+                title=F(TITLES[kind]),
+            )
+            .values_list(*COLUMNS)
+            .order_by()
+        )
+    rows = list(
+        parts[0]
+        .union(*parts[1:], all=True)
+        .order_by("arrival_day", "arrival_time", "slot", "id")[: limit + 1]
+    )
+
+    page = [dict(zip(COLUMNS, row)) for row in rows[:limit]]
+    arrivals = [_arrival(row) for row in page]
+    if len(rows) <= limit:
+        return arrivals, None
+    last = page[-1]
+    return arrivals, [
+        last["arrival_day"].isoformat(),
+        last["arrival_time"].isoformat(),
+        last["slot"],
+        last["id"],
+    ]
+
+
+def _arrival(row):
+    return {
+        "type": ARRIVALS[row["slot"]][0],
+        "booking_id": row["id"],
+        "title": row["title"],
+        "arrives_at": timezone.make_aware(
+            datetime.combine(row["arrival_day"], row["arrival_time"])
+        ),
+        "quantity": row["quantity"],
+        "confirmed": row["confirmed"],
+        "paid": row["paid"],
+        "customer": {
+            "username": row["customer__user__username"],
+            "email": row["customer__user__email"],
+            "phone": row["customer__user__phone"],
+        },
+    }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from dashboard.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the supplier daily sales rollup from the booking history, "
+        "needed once after deploying it and after bookings were changed "
+        "outside of the booking views"
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup()
+        self.stdout.write(f"{rows} rollup rows written")
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SupplierDailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("activity", "Activity"),
+                            ("tour", "Tour"),
+                            ("package", "Package"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("created", models.PositiveIntegerField(default=0)),
+                ("confirmed", models.PositiveIntegerField(default=0)),
+                ("paid", models.PositiveIntegerField(default=0)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.supplier"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "supplier daily sales",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="supplierdailysales",
+            constraint=models.UniqueConstraint(
+                fields=("supplier", "day", "kind"), name="supplier_daily_sales_key"
+            ),
+        ),
+    ]
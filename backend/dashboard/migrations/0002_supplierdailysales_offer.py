@@ -0,0 +1,86 @@
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+# frozen copy of dashboard.rollup.rebuild_rollup as it was when this
+# migration was written, later changes to the live one don't apply here
+BOOKINGS = {
+    "ActivityBooking": ("activity", "period__activity_offer", "activity"),
+    "TourBooking": ("tour", "tourday__tour_offer", "tour"),
+    "PackageBooking": ("package", "package_offer", "package"),
+}
+
+
+# the rows counted so far have no offer, they are rebuilt from the bookings
+def rebuild(apps, schema_editor):
+    SupplierDailySales = apps.get_model("dashboard", "SupplierDailySales")
+    confirmed = Q(confirmed=True)
+    rows = []
+    for model_name, (kind, offer_path, item_field) in BOOKINGS.items():
+        totals = (
+            apps.get_model("booking", model_name)
+            .objects.annotate(day=TruncDate("created_at"))
+            .values(
+                "day",
+                owner=F(f"{offer_path}__{item_field}__supplier"),
+                offer=F(offer_path),
+            )
+            .annotate(
+                created_count=Count("id"),
+                confirmed_count=Count("id", filter=confirmed),
+                paid_count=Count("id", filter=Q(paid=True)),
+                confirmed_quantity=Sum("quantity", filter=confirmed, default=0),
+                confirmed_revenue=Sum(
+                    F("quantity") * F(f"{offer_path}__price"),
+                    filter=confirmed,
+                    default=0,
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+            )
+            .order_by()
+        )
+        rows += [
+            SupplierDailySales(
+                supplier_id=total["owner"],
+                day=total["day"],
+                kind=kind,
+                offer_id=total["offer"],
+                created=total["created_count"],
+                confirmed=total["confirmed_count"],
+                paid=total["paid_count"],
+                quantity=total["confirmed_quantity"],
+                revenue=total["confirmed_revenue"],
+            )
+            for total in totals
+        ]
+    SupplierDailySales.objects.all().delete()
+    SupplierDailySales.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("booking", "0004_activitybooking_activitybooking_customer_idx_and_more"),
+        ("dashboard", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="supplierdailysales",
+            name="supplier_daily_sales_key",
+        ),
+        migrations.AddField(
+            model_name="supplierdailysales",
+            name="offer_id",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name="supplierdailysales",
+            constraint=models.UniqueConstraint(
+                fields=("supplier", "day", "kind", "offer_id"),
+                name="supplier_daily_sales_offer_key",
+            ),
+        ),
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
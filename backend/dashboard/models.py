@@ -1,3 +1,37 @@
 from django.db import models
+from users.models import Supplier
 
-# Create your models here.
+
+# bookings of a supplier by the day they were created and the offer booked,
+# kept up to date by dashboard.rollup so the dashboard and the charts read a
+# few rows instead of the booking history. quantity and revenue count the
+# confirmed bookings
+class SupplierDailySales(models.Model):
+    KIND_CHOICES = [
+        ("activity", "Activity"),
+        ("tour", "Tour"),
+        ("package", "Package"),
+    ]
+
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE)
+    day = models.DateField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # id of the activity, tour or package offer, depending on kind
+    offer_id = models.PositiveIntegerField()
+    created = models.PositiveIntegerField(default=0)
+    confirmed = models.PositiveIntegerField(default=0)
+    paid = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "supplier daily sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["supplier", "day", "kind", "offer_id"],
+                name="supplier_daily_sales_offer_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.supplier} {self.kind} {self.day}"
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from booking.models import ActivityBooking, TourBooking, PackageBooking
+from .models import SupplierDailySales
+
+# kind of every booking model, the path to its offer and the item field of
+# the offer
+BOOKINGS = {
+    ActivityBooking: ("activity", "period__activity_offer", "activity"),
+    TourBooking: ("tour", "tourday__tour_offer", "tour"),
+    PackageBooking: ("package", "package_offer", "package"),
+}
+
+
+def _offer(booking):
+    _, offer_path, _ = BOOKINGS[type(booking)]
+    offer = booking
+    for field in offer_path.split("__"):
+        offer = getattr(offer, field)
+    return offer
+
+
+def record_booking(booking, created=False, confirmed=False, paid=False):
+    """
+    Count a booking that was created, confirmed or paid in the rollup row of
+    its offer and creation day. Call it in the transaction that saves the
+    booking so the rollup never counts a change that was rolled back.
+    """
+    kind, _, item_field = BOOKINGS[type(booking)]
+    offer = _offer(booking)
+    changes = {}
+    if created:
+        changes["created"] = F("created") + 1
+    if confirmed:
+        changes["confirmed"] = F("confirmed") + 1
+        changes["quantity"] = F("quantity") + booking.quantity
+        changes["revenue"] = F("revenue") + booking.quantity * offer.price
+    if paid:
+        changes["paid"] = F("paid") + 1
+    if not changes:
+        return
+    row, _ = SupplierDailySales.objects.get_or_create(
+        supplier_id=getattr(offer, item_field).supplier_id,
+        day=timezone.localdate(booking.created_at),
+        kind=kind,
+        offer_id=offer.pk,
+    )
+    SupplierDailySales.objects.filter(pk=row.pk).update(**changes)
+
+
+def rebuild_rollup(batch_size=1000):
+    """
+    Replace the rollup with the totals of the booking history, grouped in
+    the database with one query per booking model. Returns the number of
+    rows written.
+    """
+    confirmed = Q(confirmed=True)
+    rows = []
+    for model, (kind, offer_path, item_field) in BOOKINGS.items():
+        totals = (
+            model.objects.annotate(day=TruncDate("created_at"))
+            .values(
+                "day",
+                owner=F(f"{offer_path}__{item_field}__supplier"),
+                offer=F(offer_path),
+            )
+            .annotate(
+                created_count=Count("id"),
+                confirmed_count=Count("id", filter=confirmed),
+                paid_count=Count("id", filter=Q(paid=True)),
+                confirmed_quantity=Sum("quantity", filter=confirmed, default=0),
+                confirmed_revenue=Sum(
+                    F("quantity") * F(f"{offer_path}__price"),
+                    filter=confirmed,
+                    default=0,
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+            )
+            .order_by()
+        )
+        rows += [
+            SupplierDailySales(
+                supplier_id=total["owner"],
+                day=total["day"],
+                kind=kind,
+                offer_id=total["offer"],
+                created=total["created_count"],
+                confirmed=total["confirmed_count"],
+                paid=total["paid_count"],
+                quantity=total["confirmed_quantity"],
+                revenue=total["confirmed_revenue"],
+            )
+            for total in totals
+        ]
+    with transaction.atomic():
+        SupplierDailySales.objects.all().delete()
+        SupplierDailySales.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
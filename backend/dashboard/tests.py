@@ -1,3 +1,295 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime, time, timedelta
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from activities.models import ActivityOffer, Period
+from api.testing import (
+    make_activity,
+    make_customer,
+    make_package,
+    make_supplier,
+    make_tour,
+    make_tour_day,
+)
+from booking.models import ActivityBooking, TourBooking, PackageBooking
+from packages.models import PackageOffer
+from search.index import encode_cursor
+from tours.models import TourOffer
+from .models import SupplierDailySales
+from .rollup import rebuild_rollup
 
-# Create your tests here.
+
+class SupplierDashboardTests(TestCase):
+    def setUp(self):
+        self.supplier = make_supplier()
+        self.customer = make_customer()
+        self.today = date.today()
+        self.client = APIClient()
+        self.client.force_authenticate(self.supplier.user)
+
+    def add_tour(self, supplier=None):
+        tour = make_tour(supplier or self.supplier, "Old souks")
+        return make_tour_day(tour, stock=10)
+
+    def test_metrics(self):
+        tourday = self.add_tour()
+        package = make_package(
+            self.supplier, "Weekend", days=0, duration="2 days", period=2
+        )
+        package_offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=10
+        )
+        book = {"customer": self.customer}
+        TourBooking.objects.create(tourday=tourday, quantity=2, confirmed=True, **book)
+        old = TourBooking.objects.create(
+            tourday=tourday, quantity=3, confirmed=True, **book
+        )
+        TourBooking.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+        TourBooking.objects.create(tourday=tourday, quantity=4, **book)
+        PackageBooking.objects.create(
+            package_offer=package_offer,
+            start_date=self.today + timedelta(days=1),
+            end_date=self.today + timedelta(days=2),
+            quantity=5,
+            confirmed=True,
+            **book,
+        )
+        # bookings of another supplier don't count
+        other = make_supplier("x")
+        TourBooking.objects.create(tourday=self.add_tour(other), confirmed=True, **book)
+
+        # bookings made outside of the views reach the rollup by the backfill
+        self.assertEqual(rebuild_rollup(), 4)
+        response = self.client.get(reverse("supplier_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data["total_sales"], 10)
+        self.assertEqual(data["confirmed_bookings"], 3)
+        self.assertEqual(data["unconfirmed_bookings"], 1)
+        self.assertEqual(data["unconfirmed_bookings_this_month"], 1)
+        self.assertEqual(data["confirmed_bookings_this_month"], 2)
+        self.assertNotIn("my_offers", data)
+
+    def test_upcoming_arrivals(self):
+        now = timezone.localtime().replace(microsecond=0)
+        activity = make_activity(
+            self.supplier, days=5, start_time=time(0), end_time=time(23)
+        )
+        offer = ActivityOffer.objects.create(activity=activity, title="Std", price=10)
+
+        def book_slot(starts, **booking):
+            period = Period.objects.create(
+                activity_offer=offer,
+                day=starts.date(),
+                time_from=starts.time(),
+                time_to=starts.time(),
+                stock=5,
+            )
+            return ActivityBooking.objects.create(
+                period=period, customer=self.customer, **booking
+            )
+
+        soon = book_slot(now + timedelta(hours=1))
+        later = book_slot(now + timedelta(hours=20))
+        book_slot(now - timedelta(hours=1))
+        book_slot(now + timedelta(hours=30))
+        # the date counts, not only the time of day
+        book_slot(now + timedelta(days=2, hours=1))
+        book_slot(now + timedelta(hours=2), expired=True)
+        # tours are picked up at 8, the next pickup is within 24 hours
+        tourday = self.add_tour()
+        pickup = timezone.make_aware(datetime.combine(self.today, time(8)))
+        if pickup < now:
+            pickup += timedelta(days=1)
+            tourday.day = pickup.date()
+            tourday.save()
+        tour_booking = TourBooking.objects.create(
+            tourday=tourday, customer=self.customer
+        )
+        expected = sorted(
+            [
+                (now + timedelta(hours=1), "activity", soon.pk),
+                (now + timedelta(hours=20), "activity", later.pk),
+                (pickup, "tour", tour_booking.pk),
+            ]
+        )
+
+        url = reverse("supplier_arrivals") + "?page_size=1"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [
+                (arrival["arrives_at"], arrival["type"], arrival["booking_id"])
+                for arrival in response.data["results"]
+            ]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+        arrivals = self.client.get(reverse("supplier_dashboard")).data[
+            "upcoming_arrivals"
+        ]
+        self.assertEqual(len(arrivals["results"]), 3)
+        self.assertEqual(arrivals["results"][0]["customer"]["username"], "customer")
+        response = self.client.get(reverse("supplier_arrivals"), {"hours": 2})
+        booked = [arrival["booking_id"] for arrival in response.data["results"]]
+        self.assertIn(soon.pk, booked)
+        self.assertNotIn(later.pk, booked)
+        for params in ({"hours": 0}, {"hours": "x"}, {"cursor": encode_cursor([1])}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("supplier_arrivals"), params)
+                self.assertEqual(response.status_code, 400)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_views_keep_the_rollup_up_to_date(self):
+        tourday = self.add_tour()
+        customer = APIClient()
+        customer.force_authenticate(self.customer.user)
+        for quantity in (2, 3):
+            response = customer.post(
+                reverse("create_tour_booking"),
+                {"tourday_id": tourday.pk, "quantity": quantity},
+            )
+            self.assertEqual(response.status_code, 201)
+        booking = TourBooking.objects.get(quantity=3)
+        for name in ("confirm_tour_booking", "confirm_tour_payment"):
+            self.client.post(reverse(name, kwargs={"booking_id": booking.pk}))
+        # paying twice counts once
+        self.client.post(
+            reverse("confirm_tour_payment", kwargs={"booking_id": booking.pk})
+        )
+
+        fields = ["supplier", "day", "kind", "created", "confirmed", "paid"]
+        fields += ["quantity", "revenue"]
+        rows = list(SupplierDailySales.objects.values(*fields))
+        self.assertEqual(
+            rows,
+            [
+                {
+                    "supplier": self.supplier.pk,
+                    "day": self.today,
+                    "kind": "tour",
+                    "created": 2,
+                    "confirmed": 1,
+                    "paid": 1,
+                    "quantity": 3,
+                    "revenue": 30,
+                }
+            ],
+        )
+        rebuild_rollup()
+        self.assertEqual(list(SupplierDailySales.objects.values(*fields)), rows)
+
+        data = self.client.get(reverse("supplier_dashboard")).data
+        self.assertEqual(data["confirmed_bookings"], 1)
+        self.assertEqual(data["unconfirmed_bookings"], 1)
+
+    def test_offers_are_paginated_cards(self):
+        for _ in range(3):
+            self.add_tour()
+
+        response = self.client.get(reverse("supplier_offers") + "?page_size=2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["tours"]["results"]), 2)
+        self.assertIn("tours_cursor=", response.data["tours"]["next"])
+        self.assertEqual(response.data["activities"]["results"], [])
+        self.assertIn("min_offer_price", response.data["tours"]["results"][0])
+
+        self.client.force_authenticate(self.customer.user)
+        self.assertEqual(self.client.get(reverse("supplier_offers")).status_code, 404)
+
+
+class SupplierAnalyticsTests(TestCase):
+    def setUp(self):
+        self.supplier = make_supplier()
+        tour = make_tour(
+            self.supplier,
+            "Old souks",
+            available_from=date(2024, 1, 1),
+            available_to=date(2024, 12, 31),
+        )
+        self.morning = TourOffer.objects.create(tour=tour, title="Morning", price=10)
+        self.evening = TourOffer.objects.create(tour=tour, title="Evening", price=20)
+        # monday 1 and wednesday 3 of the same week, then the next month
+        for day, offer, created in [
+            (date(2024, 1, 1), self.morning, 1),
+            (date(2024, 1, 3), self.morning, 2),
+            (date(2024, 1, 3), self.evening, 4),
+            (date(2024, 2, 5), self.evening, 8),
+        ]:
+            SupplierDailySales.objects.create(
+                supplier=self.supplier,
+                day=day,
+                kind="tour",
+                offer_id=offer.pk,
+                created=created,
+                confirmed=created,
+                quantity=created,
+                revenue=created * offer.price,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.supplier.user)
+
+    def get(self, **params):
+        params = {"start": "2024-01-01", "end": "2024-12-31", **params}
+        return self.client.get(reverse("supplier_analytics"), params)
+
+    def series(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return [
+            (str(bucket["period_start"]), bucket["bookings"], bucket["total_revenue"])
+            for bucket in response.data["results"]
+        ]
+
+    def test_buckets(self):
+        self.assertEqual(
+            self.series(granularity="week"),
+            [("2024-01-01", 7, 110), ("2024-02-05", 8, 160)],
+        )
+        self.assertEqual(
+            self.series(granularity="month", end="2024-01-31"),
+            [("2024-01-01", 7, 110)],
+        )
+        self.assertEqual(
+            self.series(start="2024-01-02", end="2024-01-03"),
+            [("2024-01-03", 6, 100)],
+        )
+        self.assertEqual(self.series(kind="activity"), [])
+        self.assertEqual(
+            self.series(kind="tour", offer=self.morning.pk, granularity="month"),
+            [("2024-01-01", 3, 30)],
+        )
+
+    def test_per_offer(self):
+        with self.assertNumQueries(3):
+            response = self.get(granularity="month", per_offer="true")
+
+        self.assertEqual(
+            [
+                (str(b["period_start"]), b["offer_title"], b["bookings"])
+                for b in response.data["results"]
+            ],
+            [
+                ("2024-01-01", "Morning", 3),
+                ("2024-01-01", "Evening", 4),
+                ("2024-02-01", "Evening", 8),
+            ],
+        )
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"granularity": "year"},
+            {"start": "2024-13-01"},
+            {"start": "2024-02-01", "end": "2024-01-01"},
+            {"kind": "cruise"},
+            {"offer": self.morning.pk},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.get(**params).status_code, 400)
@@ -2,11 +2,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from notifications.models import Notification
-from booking.models import ActivityBooking, PackageBooking, TourBooking
-from activities.models import Period, Activity
-from packages.models import Package, PackageDay, PackageOffer
+from django.urls import reverse
+from rest_framework.utils.urls import replace_query_param
+from notifications.outbox import notify
+from booking.models import ActivityBooking, CheckIn, PackageBooking, TourBooking
+from activities.models import Period, Activity, ActivityOffer
+from packages.models import Package, PackageOffer
 from tours.models import Tour, TourDay, TourOffer
 from users.models import Supplier, Customer
 from booking.serializers import (
@@ -14,18 +17,36 @@ from booking.serializers import (
     PackageBookingSerializer,
     TourBookingSerializer,
 )
-from datetime import timedelta
+from datetime import datetime, timedelta
 from django.utils import timezone
-from django.db.models import Sum
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.db import IntegrityError, transaction
+from booking.inventory import OutOfStock, settle_booking
+from booking.tickets import read_ticket, ticket_day
+from .arrivals import upcoming_arrivals
+from .models import SupplierDailySales
+from .rollup import record_booking
+from api.pagination import CreatedCursorPagination, paginated, paginated_response
+from search.index import decode_cursor, encode_cursor
 
-from activities.serializers import ActivitySerializer
-from tours.serializers import TourSerializer
-from packages.serializers import PackageSerializer
+from activities.serializers import ActivityListSerializer
+from tours.serializers import TourListSerializer
+from packages.serializers import PackageListSerializer
+
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def supplier_dashboard(request):
+    """
+    Booking metrics of the supplier read from its daily sales rollup and the
+    first page of its upcoming arrivals. The offers are listed by
+    supplier_offers.
+    """
     user = request.user
     try:
         supplier = user.supplier
@@ -34,163 +55,213 @@ def supplier_dashboard(request):
             {"detail": "You are not authorized to view this information."}, status=403
         )
 
-    # My offers
-    activities = supplier.activity_set.all()
-    tours = supplier.tour_set.all()
-    packages = supplier.package_set.all()
-
-    activity_serialized = ActivitySerializer(activities, many=True)
-    tour_serialized = TourSerializer(tours, many=True)
-    package_serialized = PackageSerializer(packages, many=True)
-
-    # Total sales
-    total_sales = (
-        (
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier, confirmed=True
-            ).aggregate(total_sales=Sum("quantity"))["total_sales"]
-            or 0
-        )
-        + (
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier, confirmed=True
-            ).aggregate(total_sales=Sum("quantity"))["total_sales"]
-            or 0
-        )
-        + (
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier, confirmed=True
-            ).aggregate(total_sales=Sum("quantity"))["total_sales"]
-            or 0
-        )
+    start_of_month = timezone.localdate().replace(day=1)
+    this_month = Q(day__gte=start_of_month)
+    totals = SupplierDailySales.objects.filter(supplier=supplier).aggregate(
+        total_sales=Sum("quantity", default=0),
+        confirmed_bookings=Sum("confirmed", default=0),
+        confirmed_bookings_this_month=Sum("confirmed", filter=this_month, default=0),
+        bookings=Sum("created", default=0),
+        bookings_this_month=Sum("created", filter=this_month, default=0),
     )
+    metrics = {
+        "total_sales": totals["total_sales"],
+        "confirmed_bookings": totals["confirmed_bookings"],
+        "confirmed_bookings_this_month": totals["confirmed_bookings_this_month"],
+        "unconfirmed_bookings": totals["bookings"] - totals["confirmed_bookings"],
+        "unconfirmed_bookings_this_month": (
+            totals["bookings_this_month"] - totals["confirmed_bookings_this_month"]
+        ),
+    }
 
-    # Confirmed bookings combined
-    confirmed_bookings = (
-        (
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier, confirmed=True
-            ).count()
-        )
-        + (
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier, confirmed=True
-            ).count()
+    # the first page of the arrivals of the next 24 hours, the next pages
+    # come from supplier_arrivals
+    arrivals, cursor = _arrivals(supplier, 24, _page_size(request))
+    next_link = None
+    if cursor is not None:
+        next_link = request.build_absolute_uri(
+            f"{reverse('supplier_arrivals')}?cursor={encode_cursor(cursor)}"
         )
-        + (
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier, confirmed=True
-            ).count()
-        )
-    )
+    metrics["upcoming_arrivals"] = {"next": next_link, "results": arrivals}
+    return Response(metrics)
 
-    # Confirmed bookings this month
-    start_of_month = timezone.now().replace(day=1)
-    confirmed_bookings_this_month = (
-        (
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier,
-                confirmed=True,
-                created_at__gte=start_of_month,
-            ).count()
-        )
-        + (
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier,
-                confirmed=True,
-                created_at__gte=start_of_month,
-            ).count()
-        )
-        + (
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier,
-                confirmed=True,
-                created_at__gte=start_of_month,
-            ).count()
-        )
+
+# SQLite truncates dates with a Python function called for every row, its
+# native date() modifiers do the same many times faster
+class StartOfWeek(TruncWeek):
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"date({sql}, '-6 days', 'weekday 1')", params
+
+
+class StartOfMonth(TruncMonth):
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"date({sql}, 'start of month')", params
+
+
+def _page_size(request):
+    return CreatedCursorPagination().get_page_size(request)
+
+
+def _arrivals(supplier, hours, limit, cursor=None):
+    start = timezone.localtime()
+    return upcoming_arrivals(
+        supplier, start, start + timedelta(hours=hours), limit, cursor
     )
 
-    # Unconfirmed bookings
-    unconfirmed_bookings = (
-        (
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier, confirmed=False
-            ).count()
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def supplier_arrivals(request):
+    """
+    Customers of the supplier arriving in the next ?hours= (24, at most a
+    week) for an activity slot, a tour or the first day of a package,
+    ordered by arrival and paginated with ?cursor=.
+    """
+    supplier = get_object_or_404(Supplier, user=request.user)
+    try:
+        hours = int(request.GET.get("hours", 24))
+    except ValueError:
+        hours = 0
+    if not 1 <= hours <= 7 * 24:
+        return Response(
+            {"error": "hours must be between 1 and 168."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        arrivals, next_cursor = _arrivals(
+            supplier,
+            hours,
+            _page_size(request),
+            decode_cursor(request.GET.get("cursor")),
         )
-        + (
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier, confirmed=False
-            ).count()
+    except ValueError:
+        return Response(
+            {"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST
         )
-        + (
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier, confirmed=False
-            ).count()
+    next_link = None
+    if next_cursor is not None:
+        next_link = replace_query_param(
+            request.build_absolute_uri(), "cursor", encode_cursor(next_cursor)
         )
-    )
+    return Response({"next": next_link, "results": arrivals})
+
+
+# bucket functions of the analytics granularities, a bucket is named by the
+# date it starts on. The rollup has one row per day already
+TRUNCATE = {"day": F, "week": StartOfWeek, "month": StartOfMonth}
+OFFER_MODELS = {"activity": ActivityOffer, "tour": TourOffer, "package": PackageOffer}
 
-    # Unconfirmed bookings this month
-    unconfirmed_bookings_this_month = (
-        (
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier,
-                confirmed=False,
-                created_at__gte=start_of_month,
-            ).count()
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def supplier_analytics(request):
+    """
+    Bookings, confirmations, payments, quantity and revenue of the supplier
+    per item kind bucketed by ?granularity=day|week|month (day) from ?start
+    to ?end (the last 30 days), by booking creation day. ?kind= keeps one
+    kind, ?offer= one offer of it and ?per_offer=true splits every bucket by
+    offer. Grouped in the database over the daily sales rollup, empty buckets
+    are left out.
+    """
+    supplier = get_object_or_404(Supplier, user=request.user)
+    granularity = request.GET.get("granularity", "day")
+    if granularity not in TRUNCATE:
+        return Response(
+            {"error": "granularity must be day, week or month."},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-        + (
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier,
-                confirmed=False,
-                created_at__gte=start_of_month,
-            ).count()
+    try:
+        end = _parse_day(request.GET.get("end")) or timezone.localdate()
+        start = _parse_day(request.GET.get("start")) or end - timedelta(days=29)
+    except ValueError:
+        return Response(
+            {"error": "Invalid date format. Use YYYY-MM-DD."},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-        + (
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier,
-                confirmed=False,
-                created_at__gte=start_of_month,
-            ).count()
+    if start > end:
+        return Response(
+            {"error": "start must not be after end."},
+            status=status.HTTP_400_BAD_REQUEST,
         )
-    )
 
-    # Today's customers
-    next_24_hours = timezone.now() + timedelta(hours=24)
-    todays_customers = (
-        list(
-            ActivityBooking.objects.filter(
-                period__activity_offer__activity__supplier=supplier,
-                period__time_from__range=(timezone.now().time(), next_24_hours.time()),
-            ).values_list("customer__user__username", "created_at")
-        )
-        + list(
-            TourBooking.objects.filter(
-                tourday__tour_offer__tour__supplier=supplier,
-                tourday__day=timezone.now().date(),
-            ).values_list("customer__user__username", "created_at")
-        )
-        + list(
-            PackageBooking.objects.filter(
-                package_offer__package__supplier=supplier,
-                start_date=timezone.now().date(),
-            ).values_list("customer__user__username", "created_at")
+    rows = SupplierDailySales.objects.filter(supplier=supplier, day__range=(start, end))
+    kind = request.GET.get("kind")
+    if kind:
+        if kind not in OFFER_MODELS:
+            return Response(
+                {"error": "kind must be activity, tour or package."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = rows.filter(kind=kind)
+    offer = request.GET.get("offer")
+    if offer:
+        if not kind or not offer.isdigit():
+            return Response(
+                {"error": "offer must be the id of an offer of the given kind."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = rows.filter(offer_id=offer)
+    per_offer = request.GET.get("per_offer") == "true"
+
+    fields = ["period_start", "kind"] + (["offer_id"] if per_offer else [])
+    buckets = list(
+        rows.annotate(period_start=TRUNCATE[granularity]("day"))
+        .values(*fields)
+        .annotate(
+            bookings=Sum("created"),
+            confirmed_bookings=Sum("confirmed"),
+            paid_bookings=Sum("paid"),
+            total_quantity=Sum("quantity"),
+            total_revenue=Sum("revenue"),
         )
+        .order_by(*fields)
+    )
+    if per_offer:
+        # one query per kind for the titles of the offers in the buckets
+        titles = {}
+        for offer_kind, model in OFFER_MODELS.items():
+            ids = {b["offer_id"] for b in buckets if b["kind"] == offer_kind}
+            if ids:
+                for pk, title in model.objects.filter(pk__in=ids).values_list(
+                    "pk", "title"
+                ):
+                    titles[offer_kind, pk] = title
+        for bucket in buckets:
+            bucket["offer_title"] = titles.get((bucket["kind"], bucket["offer_id"]))
+
+    return Response(
+        {
+            "start": start,
+            "end": end,
+            "granularity": granularity,
+            "results": buckets,
+        }
     )
 
-    data = {
-        "my_offers": {
-            "activities": activity_serialized.data,
-            "tours": tour_serialized.data,
-            "packages": package_serialized.data,
-        },
-        "total_sales": total_sales,
-        "confirmed_bookings": confirmed_bookings,
-        "confirmed_bookings_this_month": confirmed_bookings_this_month,
-        "unconfirmed_bookings": unconfirmed_bookings,
-        "unconfirmed_bookings_this_month": unconfirmed_bookings_this_month,
-        "todays_customers": todays_customers,
-    }
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def supplier_offers(request):
+    """
+    The activities, tours and packages of the supplier as cards, each list
+    paginated with its own cursor (activities_cursor, tours_cursor,
+    packages_cursor).
+    """
+    supplier = get_object_or_404(Supplier, user=request.user)
+    data = {}
+    for prefix, queryset, serializer_class in [
+        ("activities", supplier.activity_set.all(), ActivityListSerializer),
+        ("tours", supplier.tour_set.all(), TourListSerializer),
+        ("packages", supplier.package_set.all(), PackageListSerializer),
+    ]:
+        data[prefix] = paginated(
+            request,
+            serializer_class.setup_queryset(queryset),
+            serializer_class,
+            prefix=prefix,
+        )
     return Response(data)
 
 
@@ -199,9 +270,10 @@ def supplier_dashboard(request):
 @permission_classes([IsAuthenticated])
 def customer_activity_bookings(request):
     customer = get_object_or_404(Customer, user=request.user)
-    bookings = ActivityBooking.objects.filter(customer=customer)
-    serializer = ActivityBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = ActivityBookingSerializer.setup_queryset(
+        ActivityBooking.objects.filter(customer=customer)
+    )
+    return paginated_response(request, bookings, ActivityBookingSerializer)
 
 
 # Supplier views for activity bookings
@@ -211,16 +283,22 @@ def supplier_activity_bookings(request):
     supplier = get_object_or_404(Supplier, user=request.user)
     activities = Activity.objects.filter(supplier=supplier)
     periods = Period.objects.filter(activity_offer__activity__in=activities)
-    bookings = ActivityBooking.objects.filter(period__in=periods)
-    serializer = ActivityBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = ActivityBookingSerializer.setup_queryset(
+        ActivityBooking.objects.filter(period__in=periods)
+    )
+    return paginated_response(request, bookings, ActivityBookingSerializer)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def confirm_activity_booking(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(ActivityBooking, id=booking_id)
+    booking = get_object_or_404(
+        ActivityBooking.objects.select_related(
+            "period__activity_offer__activity__supplier", "customer"
+        ),
+        id=booking_id,
+    )
     period = get_object_or_404(Period, pk=booking.period_id)
     if booking.period.activity_offer.activity.supplier != supplier:
         return Response(
@@ -228,16 +306,35 @@ def confirm_activity_booking(request, booking_id):
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    booking.confirmed = True
-    booking.generate_qr_code()
-    period.stock -= booking.quantity
-    period.save()
-    booking.save()
+    if booking.confirmed:
+        return Response(
+            {"detail": "Booking is already confirmed."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    # the stock held since the booking was created becomes permanent
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.confirmed = True
+            # the file is rendered by the QR workers, the supplier doesn't
+            # wait for it
+            if settings.QR_EAGER_FILES:
+                booking.qr_status = "pending"
+            booking.save(update_fields=["confirmed", "qr_status"])
+            record_booking(booking, confirmed=True)
+            notify(
+                (
+                    booking.customer.user_id,
+                    f"Activity {period.activity_offer.activity.title} got confirmed",
+                )
+            )
+    except OutOfStock:
+        return Response(
+            {"error": "No available stock for this period."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
 
-    Notification.objects.create(
-        user=booking.customer.user,
-        message=f"Activity {period.activity_offer.activity.title} got confirmed",
-    )
     serializer = ActivityBookingSerializer(booking)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -246,24 +343,41 @@ def confirm_activity_booking(request, booking_id):
 @permission_classes([IsAuthenticated])
 def confirm_payment(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(ActivityBooking, id=booking_id)
+    booking = get_object_or_404(
+        ActivityBooking.objects.select_related(
+            "period__activity_offer__activity__supplier", "customer"
+        ),
+        id=booking_id,
+    )
     if booking.period.activity_offer.activity.supplier != supplier:
         return Response(
             {"detail": "Not authorized to confirm payment for this booking."},
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    booking.paid = True
-    booking.save()
+    # a payment confirmed twice is counted once
+    was_paid = booking.paid
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.paid = True
+            # the QR workers write the other fields concurrently
+            booking.save(update_fields=["paid"])
+            if not was_paid:
+                record_booking(booking, paid=True)
+            notify(
+                (booking.customer.user_id, "Activity Booking got paid"),
+                (
+                    booking.period.activity_offer.activity.supplier.user_id,
+                    "Activity Booking got paid",
+                ),
+            )
+    except OutOfStock:
+        return Response(
+            {"error": "No available stock for this booking."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     serializer = ActivityBookingSerializer(booking)
-
-    Notification.objects.create(
-        user=booking.customer.user, message="Activity Booking got paid"
-    )
-    Notification.objects.create(
-        user=booking.period.activity_offer.activity.supplier.user,
-        message="Activity Booking got paid",
-    )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -272,9 +386,10 @@ def confirm_payment(request, booking_id):
 @permission_classes([IsAuthenticated])
 def customer_package_bookings(request):
     customer = get_object_or_404(Customer, user=request.user)
-    bookings = PackageBooking.objects.filter(customer=customer)
-    serializer = PackageBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = PackageBookingSerializer.setup_queryset(
+        PackageBooking.objects.filter(customer=customer)
+    )
+    return paginated_response(request, bookings, PackageBookingSerializer)
 
 
 # Supplier views for package bookings
@@ -283,16 +398,22 @@ def customer_package_bookings(request):
 def supplier_packages_bookings(request):
     supplier = get_object_or_404(Supplier, user=request.user)
     packages = Package.objects.filter(supplier=supplier)
-    bookings = PackageBooking.objects.filter(package_offer__package__in=packages)
-    serializer = PackageBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = PackageBookingSerializer.setup_queryset(
+        PackageBooking.objects.filter(package_offer__package__in=packages)
+    )
+    return paginated_response(request, bookings, PackageBookingSerializer)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def confirm_package_booking(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(PackageBooking, id=booking_id)
+    booking = get_object_or_404(
+        PackageBooking.objects.select_related(
+            "package_offer__package__supplier", "customer"
+        ),
+        id=booking_id,
+    )
 
     if booking.package_offer.package.supplier != supplier:
         return Response(
@@ -306,31 +427,29 @@ def confirm_package_booking(request, booking_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    # the stock held since the booking was created becomes permanent
     package = booking.package_offer.package
-    start_date = booking.start_date
-    end_date = start_date + timedelta(days=package.period - 1)
-    package_days = PackageDay.objects.filter(
-        package_offer=booking.package_offer, day__range=(start_date, end_date)
-    )
-
-    for day in package_days:
-        if day.stock < 1:
-            return Response(
-                {"error": f"No available stock for {day.day}."},
-                status=status.HTTP_400_BAD_REQUEST,
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.confirmed = True
+            # the file is rendered by the QR workers, the supplier doesn't
+            # wait for it
+            if settings.QR_EAGER_FILES:
+                booking.qr_status = "pending"
+            booking.save(update_fields=["confirmed", "qr_status"])
+            record_booking(booking, confirmed=True)
+            notify(
+                (
+                    booking.customer.user_id,
+                    f"Package {package.title} got confirmed, enjoy your time",
+                )
             )
-
-    for day in package_days:
-        day.stock -= booking.quantity
-        day.save()
-
-    booking.confirmed = True
-    booking.generate_qr_code()
-    booking.save()
-    Notification.objects.create(
-        user=booking.customer.user,
-        message=f"Package {package.title} got confirmed, enjoy your time",
-    )
+    except OutOfStock:
+        return Response(
+            {"error": "No available stock for these package days."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     serializer = PackageBookingSerializer(booking)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -339,24 +458,41 @@ def confirm_package_booking(request, booking_id):
 @permission_classes([IsAuthenticated])
 def confirm_package_payment(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(PackageBooking, id=booking_id)
+    booking = get_object_or_404(
+        PackageBooking.objects.select_related(
+            "package_offer__package__supplier", "customer"
+        ),
+        id=booking_id,
+    )
     if booking.package_offer.package.supplier != supplier:
         return Response(
             {"detail": "Not authorized to confirm payment for this booking."},
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    booking.paid = True
-    booking.save()
+    # a payment confirmed twice is counted once
+    was_paid = booking.paid
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.paid = True
+            # the QR workers write the other fields concurrently
+            booking.save(update_fields=["paid"])
+            if not was_paid:
+                record_booking(booking, paid=True)
+            notify(
+                (booking.customer.user_id, "Package Booking got paid"),
+                (
+                    booking.package_offer.package.supplier.user_id,
+                    "Package Booking got paid",
+                ),
+            )
+    except OutOfStock:
+        return Response(
+            {"error": "No available stock for this booking."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     serializer = PackageBookingSerializer(booking)
-
-    Notification.objects.create(
-        user=booking.customer.user, message="Package Booking got paid"
-    )
-    Notification.objects.create(
-        user=booking.package_offer.package.supplier.user,
-        message="Package Booking got paid",
-    )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -365,9 +501,10 @@ def confirm_package_payment(request, booking_id):
 @permission_classes([IsAuthenticated])
 def customer_tour_bookings(request):
     customer = get_object_or_404(Customer, user=request.user)
-    bookings = TourBooking.objects.filter(customer=customer)
-    serializer = TourBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = TourBookingSerializer.setup_queryset(
+        TourBooking.objects.filter(customer=customer)
+    )
+    return paginated_response(request, bookings, TourBookingSerializer)
 
 
 # Supplier views for tour bookings
@@ -377,16 +514,22 @@ def supplier_tours_bookings(request):
     supplier = get_object_or_404(Supplier, user=request.user)
     tours = Tour.objects.filter(supplier=supplier)
     days = TourDay.objects.filter(tour_offer__tour__in=tours)
-    bookings = TourBooking.objects.filter(tourday__in=days)
-    serializer = TourBookingSerializer(bookings, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    bookings = TourBookingSerializer.setup_queryset(
+        TourBooking.objects.filter(tourday__in=days)
+    )
+    return paginated_response(request, bookings, TourBookingSerializer)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def confirm_tour_booking(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(TourBooking, id=booking_id)
+    booking = get_object_or_404(
+        TourBooking.objects.select_related(
+            "tourday__tour_offer__tour__supplier", "customer"
+        ),
+        id=booking_id,
+    )
     if booking.tourday.tour_offer.tour.supplier != supplier:
         return Response(
             {"detail": "Not authorized to confirm this booking."},
@@ -399,23 +542,24 @@ def confirm_tour_booking(request, booking_id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    tourday = booking.tourday
-    if tourday.stock < 1:
+    # the stock held since the booking was created becomes permanent
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.confirmed = True
+            # the file is rendered by the QR workers, the supplier doesn't
+            # wait for it
+            if settings.QR_EAGER_FILES:
+                booking.qr_status = "pending"
+            booking.save(update_fields=["confirmed", "qr_status"])
+            record_booking(booking, confirmed=True)
+            notify((booking.customer.user_id, "Tour got confirmed, enjoy your time"))
+    except OutOfStock:
         return Response(
             {"error": "No available stock for this tour day."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    tourday.stock -= booking.quantity
-    tourday.save()
-
-    booking.confirmed = True
-    booking.generate_qr_code()
-    booking.save()
-
-    Notification.objects.create(
-        user=booking.customer.user, message="Tour got confirmed, enjoy your time"
-    )
     serializer = TourBookingSerializer(booking)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -424,21 +568,85 @@ def confirm_tour_booking(request, booking_id):
 @permission_classes([IsAuthenticated])
 def confirm_tour_payment(request, booking_id):
     supplier = get_object_or_404(Supplier, user=request.user)
-    booking = get_object_or_404(TourBooking, id=booking_id)
+    booking = get_object_or_404(
+        TourBooking.objects.select_related(
+            "tourday__tour_offer__tour__supplier", "customer"
+        ),
+        id=booking_id,
+    )
     if booking.tourday.tour_offer.tour.supplier != supplier:
         return Response(
             {"detail": "Not authorized to confirm payment for this booking."},
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    booking.paid = True
-    booking.save()
+    # a payment confirmed twice is counted once
+    was_paid = booking.paid
+    try:
+        with transaction.atomic():
+            settle_booking(booking)
+            booking.paid = True
+            # the QR workers write the other fields concurrently
+            booking.save(update_fields=["paid"])
+            if not was_paid:
+                record_booking(booking, paid=True)
+            notify(
+                (booking.customer.user_id, "Tour Booking got paid"),
+                (
+                    booking.tourday.tour_offer.tour.supplier.user_id,
+                    "Tour Booking got paid",
+                ),
+            )
+    except OutOfStock:
+        return Response(
+            {"error": "No available stock for this booking."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     serializer = TourBookingSerializer(booking)
-    Notification.objects.create(
-        user=booking.customer.user, message="Tour Booking got paid"
-    )
-    Notification.objects.create(
-        user=booking.tourday.tour_offer.tour.supplier.user,
-        message="Tour Booking got paid",
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def check_in(request):
+    """
+    Check in the booking of the ticket read from its QR code. The signature,
+    the supplier and the day are checked without reading the database, the
+    check-in is one insert. A ticket already checked in gets a 409 with the
+    time it was.
+    """
+    data = request.data if isinstance(request.data, dict) else {}
+    try:
+        ticket = read_ticket(data.get("ticket") or "")
+    except ValueError as error:
+        return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    if ticket["supplier"] != request.user.pk:
+        return Response(
+            {"detail": "Not authorized to check in this booking."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    day = ticket_day(ticket)
+    today = timezone.localdate()
+    if not day <= today <= day + timedelta(days=settings.TICKET_GRACE_DAYS):
+        return Response(
+            {"error": "Ticket is not valid today.", "day": day},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    booking = {"kind": ticket["type"], "booking_id": ticket["booking_id"]}
+    try:
+        with transaction.atomic():
+            checked_in = CheckIn.objects.create(**booking, checked_in_by=request.user)
+    except IntegrityError:
+        checked_in = CheckIn.objects.filter(**booking).first()
+        return Response(
+            {
+                "error": "Ticket already checked in.",
+                "checked_in_at": checked_in and checked_in.checked_in_at,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response(
+        {**ticket, "checked_in_at": checked_in.checked_in_at},
+        status=status.HTTP_201_CREATED,
     )
-    return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
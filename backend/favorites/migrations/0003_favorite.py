@@ -0,0 +1,124 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# the item field of the tables the favorites are moved out of
+TABLES = {
+    "FavoriteActivity": ("activity", "activity_id"),
+    "FavoriteTour": ("tour", "tour_id"),
+    "FavoritePackage": ("package", "package_id"),
+}
+
+
+def copy_favorites(apps, schema_editor):
+    Favorite = apps.get_model("favorites", "Favorite")
+    for model_name, (item_type, item_field) in TABLES.items():
+        model = apps.get_model("favorites", model_name)
+        Favorite.objects.bulk_create(
+            (
+                Favorite(user_id=user_id, item_type=item_type, item_id=item_id)
+                for user_id, item_id in model.objects.order_by("pk")
+                .values_list("user_id", item_field)
+                .iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("favorites", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Favorite",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "item_type",
+                    models.CharField(
+                        choices=[
+                            ("activity", "Activity"),
+                            ("tour", "Tour"),
+                            ("package", "Package"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("item_id", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="favorite_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["item_type", "item_id"], name="favorite_type_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="favorite",
+            constraint=models.UniqueConstraint(
+                fields=("user", "item_type", "item_id"), name="favorite_item_key"
+            ),
+        ),
+        migrations.RunPython(copy_favorites, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="favoritepackage",
+            unique_together=None,
+        ),
+        migrations.RemoveField(
+            model_name="favoritepackage",
+            name="package",
+        ),
+        migrations.RemoveField(
+            model_name="favoritepackage",
+            name="user",
+        ),
+        migrations.AlterUniqueTogether(
+            name="favoritetour",
+            unique_together=None,
+        ),
+        migrations.RemoveField(
+            model_name="favoritetour",
+            name="tour",
+        ),
+        migrations.RemoveField(
+            model_name="favoritetour",
+            name="user",
+        ),
+        migrations.DeleteModel(
+            name="FavoriteActivity",
+        ),
+        migrations.DeleteModel(
+            name="FavoritePackage",
+        ),
+        migrations.DeleteModel(
+            name="FavoriteTour",
+        ),
+    ]
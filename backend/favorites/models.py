@@ -1,32 +1,31 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from activities.models import Activity
-from tours.models import Tour
-from packages.models import Package
 
 
 User = get_user_model()
 
-
-class FavoriteActivity(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    activity = models.ForeignKey(Activity, on_delete=models.CASCADE)
-
-    class Meta:
-        unique_together = ('user', 'activity')
-
-
-class FavoriteTour(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    tour = models.ForeignKey(Tour, on_delete=models.CASCADE)
-
-    class Meta:
-        unique_together = ('user', 'tour')
+ITEM_TYPES = [
+    ('activity', 'Activity'),
+    ('tour', 'Tour'),
+    ('package', 'Package'),
+]
 
 
-class FavoritePackage(models.Model):
+# one row per item a user liked, whatever its kind, so all of the favorites
+# of a user are listed newest first from a single index
+class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    package = models.ForeignKey(Package, on_delete=models.CASCADE)
+    item_type = models.CharField(max_length=20, choices=ITEM_TYPES)
+    item_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('user', 'package')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'item_type', 'item_id'], name='favorite_item_key'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='favorite_user_idx'),
+            models.Index(fields=['item_type', 'item_id'], name='favorite_type_idx'),
+        ]
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from search.index import MODELS
+from .models import Favorite
+
+KINDS = {model: kind for kind, model in MODELS.items()}
+
+
+# favorites point at their item by id, they go away with it
+def item_deleted(sender, instance, **kwargs):
+    Favorite.objects.filter(item_type=KINDS[sender], item_id=instance.pk).delete()
+
+
+for model in MODELS.values():
+    post_delete.connect(
+        item_deleted, sender=model, dispatch_uid=f'favorites_{model.__name__}'
+    )
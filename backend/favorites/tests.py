@@ -1,3 +1,64 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api.testing import make_activity, make_customer, make_supplier, make_tour
+from .models import Favorite
 
-# Create your tests here.
+
+class FavoriteTests(TestCase):
+    def setUp(self):
+        supplier = make_supplier()
+        self.activities = [
+            make_activity(supplier, f'Activity {index}') for index in range(3)
+        ]
+        self.user = make_customer().user
+        other = make_customer('other').user
+        Favorite.objects.create(
+            user=self.user, item_type='activity', item_id=self.activities[1].pk
+        )
+        Favorite.objects.create(
+            user=other, item_type='activity', item_id=self.activities[2].pk
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_status_of_a_page_of_cards(self):
+        ids = ','.join(str(activity.pk) for activity in self.activities)
+
+        # one query for every list
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('favorite_status'), {'activities': ids, 'tours': ids}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data,
+            {'activities': [self.activities[1].pk], 'tours': [], 'packages': []},
+        )
+
+    def test_invalid_requests(self):
+        for params in ({'tours': '1,x'}, {'packages': ','.join(map(str, range(101)))}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('favorite_status'), params)
+                self.assertEqual(response.status_code, 400)
+        response = APIClient().get(reverse('favorite_status'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_all_favorites_newest_first(self):
+        tour = make_tour(self.activities[0].supplier, 'Old souks')
+        for url in (
+            reverse('favorite_tour', kwargs={'tour_id': tour.pk}),
+            reverse('favorite_activity', kwargs={'activity_id': self.activities[0].pk}),
+        ):
+            self.assertEqual(self.client.post(url).status_code, 201)
+
+        response = self.client.get(reverse('all_favorites'))
+
+        self.assertEqual(
+            [(card['type'], card['title']) for card in response.data['results']],
+            [('activity', 'Activity 0'), ('tour', 'Old souks'), ('activity', 'Activity 1')],
+        )
+        # deleted items leave the favorites
+        tour.delete()
+        self.assertFalse(Favorite.objects.filter(item_type='tour').exists())
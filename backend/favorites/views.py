@@ -1,102 +1,107 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from activities.models import Activity
 from tours.models import Tour
 from packages.models import Package
-from .models import FavoriteActivity, FavoriteTour, FavoritePackage
-from django.contrib.auth import get_user_model
-from .serializers import FavoriteActivitySerializer, FavoriteTourSerializer, FavoritePackageSerializer
-
-User = get_user_model()
-
-
+from .models import Favorite
+from api.cards import serialize_cards
+from api.pagination import CreatedCursorPagination
+
+# item type of every list of ids favorite_status takes
+FAVORITE_LISTS = {
+    'activities': 'activity',
+    'tours': 'tour',
+    'packages': 'package',
+}
+MAX_STATUS_IDS = 100
+
+
+# All the favorites of the user newest first as one list of cards of any
+# kind, paginated with ?cursor=. A page loads its favorites with one query
+# and the cards with one query per kind
 @api_view(['GET'])
+@permission_classes([IsAuthenticated])
 def all_favorites(request):
-    user = request.user
-
-    favorite_activities = FavoriteActivity.objects.filter(user=user)
-    favorite_tours = FavoriteTour.objects.filter(user=user)
-    favorite_packages = FavoritePackage.objects.filter(user=user)
-
-    activity_serializer = FavoriteActivitySerializer(favorite_activities, many=True)
-    tour_serializer = FavoriteTourSerializer(favorite_tours, many=True)
-    package_serializer = FavoritePackageSerializer(favorite_packages, many=True)
-
-    combined_favorites = {
-        'activities': activity_serializer.data,
-        'tours': tour_serializer.data,
-        'packages': package_serializer.data
+    paginator = CreatedCursorPagination()
+    page = paginator.paginate_queryset(Favorite.objects.filter(user=request.user), request)
+    favorites = {
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': serialize_cards([(favorite.item_type, favorite.item_id) for favorite in page]),
     }
 
-    return Response(combined_favorites, status=status.HTTP_200_OK)
+    return Response(favorites, status=status.HTTP_200_OK)
 
 
-# Add or remove favorite activity, and check if it's a favorite
-@api_view(['POST', 'DELETE', 'GET'])
-def favorite_activity(request, activity_id):
+# Add or remove a favorite item, and check if it's a favorite
+def _favorite(request, item_type, model, item_id):
     user = request.user
-    activity = get_object_or_404(Activity, id=activity_id)
+    item = get_object_or_404(model, id=item_id)
+    label = item_type.capitalize()
+    favorite = {'user': user, 'item_type': item_type, 'item_id': item.id}
 
     if request.method == 'POST':
-        favorite, created = FavoriteActivity.objects.get_or_create(user=user, activity=activity)
+        favorite, created = Favorite.objects.get_or_create(**favorite)
         if created:
-            return Response({'status': 'Activity added to favorites'}, status=status.HTTP_201_CREATED)
+            return Response({'status': f'{label} added to favorites'}, status=status.HTTP_201_CREATED)
         else:
-            return Response({'status': 'Activity already in favorites'}, status=status.HTTP_200_OK)
+            return Response({'status': f'{label} already in favorites'}, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        favorite = get_object_or_404(FavoriteActivity, user=user, activity=activity)
+        favorite = get_object_or_404(Favorite, **favorite)
         favorite.delete()
-        return Response({'status': 'Activity removed from favorites'}, status=status.HTTP_204_NO_CONTENT)
+        return Response({'status': f'{label} removed from favorites'}, status=status.HTTP_204_NO_CONTENT)
 
     elif request.method == 'GET':
-        is_favorite = FavoriteActivity.objects.filter(user=user, activity=activity).exists()
+        is_favorite = Favorite.objects.filter(**favorite).exists()
         return Response({'is_favorite': is_favorite}, status=status.HTTP_200_OK)
 
 
-# Add or remove favorite tour, and check if it's a favorite
 @api_view(['POST', 'DELETE', 'GET'])
-def favorite_tour(request, tour_id):
-    user = request.user
-    tour = get_object_or_404(Tour, id=tour_id)
-
-    if request.method == 'POST':
-        favorite, created = FavoriteTour.objects.get_or_create(user=user, tour=tour)
-        if created:
-            return Response({'status': 'Tour added to favorites'}, status=status.HTTP_201_CREATED)
-        else:
-            return Response({'status': 'Tour already in favorites'}, status=status.HTTP_200_OK)
+@permission_classes([IsAuthenticated])
+def favorite_activity(request, activity_id):
+    return _favorite(request, 'activity', Activity, activity_id)
 
-    elif request.method == 'DELETE':
-        favorite = get_object_or_404(FavoriteTour, user=user, tour=tour)
-        favorite.delete()
-        return Response({'status': 'Tour removed from favorites'}, status=status.HTTP_204_NO_CONTENT)
 
-    elif request.method == 'GET':
-        is_favorite = FavoriteTour.objects.filter(user=user, tour=tour).exists()
-        return Response({'is_favorite': is_favorite}, status=status.HTTP_200_OK)
+@api_view(['POST', 'DELETE', 'GET'])
+@permission_classes([IsAuthenticated])
+def favorite_tour(request, tour_id):
+    return _favorite(request, 'tour', Tour, tour_id)
 
 
-# Add or remove favorite package, and check if it's a favorite
 @api_view(['POST', 'DELETE', 'GET'])
+@permission_classes([IsAuthenticated])
 def favorite_package(request, package_id):
-    user = request.user
-    package = get_object_or_404(Package, id=package_id)
-
-    if request.method == 'POST':
-        favorite, created = FavoritePackage.objects.get_or_create(user=user, package=package)
-        if created:
-            return Response({'status': 'Package added to favorites'}, status=status.HTTP_201_CREATED)
-        else:
-            return Response({'status': 'Package already in favorites'}, status=status.HTTP_200_OK)
+    return _favorite(request, 'package', Package, package_id)
 
-    elif request.method == 'DELETE':
-        favorite = get_object_or_404(FavoritePackage, user=user, package=package)
-        favorite.delete()
-        return Response({'status': 'Package removed from favorites'}, status=status.HTTP_204_NO_CONTENT)
 
-    elif request.method == 'GET':
-        is_favorite = FavoritePackage.objects.filter(user=user, package=package).exists()
-        return Response({'is_favorite': is_favorite}, status=status.HTTP_200_OK)
+# Which of the listed items the user has favorited, for the hearts of a page
+# of cards in a single request:
+# ?activities=1,2&tours=3&packages= gives {"activities": [2], "tours": [], ...}
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def favorite_status(request):
+    requested = Q()
+    for name, item_type in FAVORITE_LISTS.items():
+        value = request.GET.get(name) or ''
+        try:
+            ids = {int(pk) for pk in value.split(',') if pk.strip()}
+        except ValueError:
+            return Response({'error': f'{name} must be comma separated ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > MAX_STATUS_IDS:
+            return Response({'error': f'At most {MAX_STATUS_IDS} {name} at once.'}, status=status.HTTP_400_BAD_REQUEST)
+        if ids:
+            requested |= Q(item_type=item_type, item_id__in=ids)
+
+    favorited = {name: [] for name in FAVORITE_LISTS}
+    if requested:
+        # a single lookup on the (user, item_type, item_id) unique index
+        rows = Favorite.objects.filter(requested, user=request.user).order_by('item_id')
+        names = {item_type: name for name, item_type in FAVORITE_LISTS.items()}
+        for item_type, item_id in rows.values_list('item_type', 'item_id'):
+            favorited[names[item_type]].append(item_id)
+    return Response(favorited, status=status.HTTP_200_OK)
@@ -0,0 +1,57 @@
+import asyncio
+import contextlib
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.NOTIFICATION_BROKER)()
+
+
+class LocalBroker:
+    """
+    In-process pub/sub of the new notifications. It only reaches the streams
+    of the process that created the notification, so the site must be
+    served by a single process (one uvicorn worker, runserver). Notifications
+    created in another process, a second worker or a management command,
+    only reach the streams when they reconnect. Running several processes
+    needs a cross-process broker (Redis, Postgres LISTEN/NOTIFY) with the
+    same publish() and subscribe().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, user_id, event):
+        # called from any thread, the event is handed to the loop of every
+        # stream of the user
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # the loop of a stream closed before it unsubscribed
+                pass
+
+    @contextlib.contextmanager
+    def subscribe(self, user_id):
+        """
+        An asyncio.Queue of the events published for a user while the
+        context is open, entered from the event loop that reads it.
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+                if not self._subscribers[user_id]:
+                    del self._subscribers[user_id]
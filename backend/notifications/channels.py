@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+# the channels of NOTIFICATION_CHANNELS are callables taking the user and
+# the message, an exception makes the outbox try again later. SMS and push
+# providers plug in the same way
+
+
+def email(user, message):
+    if user.email:
+        send_mail("Notification", message, settings.DEFAULT_FROM_EMAIL, [user.email])
@@ -0,0 +1,39 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import work
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the notifications queued on the NOTIFICATION_CHANNELS (email, "
+        "SMS, push), start as many workers as the load needs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="deliveries claimed at once",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1,
+            help="seconds to wait when there is nothing to send",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="stop once the outbox is empty instead of waiting for more",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = work(options["batch_size"])
+            if sent:
+                self.stdout.write(f"{sent} notifications sent")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
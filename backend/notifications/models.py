@@ -9,3 +9,46 @@ class Notification(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"], name="notification_user_created_idx"
+            ),
+            # the unread count of a user only reads the unread rows
+            models.Index(
+                fields=["user"],
+                condition=models.Q(read=False),
+                name="notification_unread_idx",
+            ),
+        ]
+
+
+DELIVERY_STATUSES = [
+    ("pending", "Pending"),
+    ("sending", "Sending"),
+    ("sent", "Sent"),
+    ("failed", "Failed"),
+]
+
+
+# the outbox, a notification to send on one of the NOTIFICATION_CHANNELS
+# (email, SMS, push). It is written in the transaction of the change it is
+# about and sent later by the send_notifications workers, see
+# notifications/outbox.py
+class Delivery(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    channel = models.CharField(max_length=20)
+    message = models.TextField()
+    status = models.CharField(
+        max_length=10, choices=DELIVERY_STATUSES, default="pending"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # the batch of the worker sending it and since when
+    claim = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="delivery_status_idx")]
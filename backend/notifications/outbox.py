@@ -0,0 +1,111 @@
+import logging
+import uuid
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Subquery
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .broker import get_broker
+from .models import Delivery, Notification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+# a delivery is given up after this many failed attempts
+MAX_ATTEMPTS = 5
+
+
+@lru_cache(maxsize=None)
+def _channel(path):
+    return import_string(path)
+
+
+def notify(*notifications):
+    """
+    Write the (user id, message) notifications produced by a change with a
+    single INSERT, and queue them on every NOTIFICATION_CHANNELS with one
+    more. Called in the transaction of the change so both are committed or
+    rolled back with it, the request never waits for a channel. The open
+    notification streams get them once they are committed.
+    """
+    created = Notification.objects.bulk_create(
+        Notification(user_id=user_id, message=message)
+        for user_id, message in notifications
+    )
+    Delivery.objects.bulk_create(
+        Delivery(user_id=user_id, channel=channel, message=message)
+        for user_id, message in notifications
+        for channel in settings.NOTIFICATION_CHANNELS
+    )
+    transaction.on_commit(lambda: publish(created))
+    return created
+
+
+def publish(notifications):
+    broker = get_broker()
+    for notification in notifications:
+        broker.publish(notification.user_id, NotificationSerializer(notification).data)
+
+
+# the deliveries are claimed in batches like the QR codes (booking/qr.py),
+# any number of send_notifications workers can run and a claim older than
+# NOTIFICATION_CLAIM_TIMEOUT belongs to a worker that died and is taken over
+
+
+def _claimable():
+    stale = timezone.now() - settings.NOTIFICATION_CLAIM_TIMEOUT
+    return Q(status="pending") | Q(status="sending", claimed_at__lt=stale)
+
+
+def claim(limit):
+    """
+    Claim up to limit deliveries waiting to be sent, returns the claim and
+    the claimed deliveries.
+    """
+    token = uuid.uuid4().hex
+    ids = Delivery.objects.filter(_claimable()).order_by("pk").values("pk")[:limit]
+    Delivery.objects.filter(_claimable(), pk__in=Subquery(ids)).update(
+        status="sending", claim=token, claimed_at=timezone.now()
+    )
+    claimed = Delivery.objects.filter(claim=token, status="sending")
+    return token, list(claimed.select_related("user"))
+
+
+def send(delivery, token):
+    """
+    Send a claimed delivery on its channel, returns False when it failed or
+    the claim was taken over in the meantime. A failed delivery is tried
+    again by the next batch until MAX_ATTEMPTS.
+    """
+    claimed = Delivery.objects.filter(pk=delivery.pk, claim=token)
+    try:
+        path = settings.NOTIFICATION_CHANNELS[delivery.channel]
+        _channel(path)(delivery.user, delivery.message)
+    except Exception:
+        logger.exception("Delivery %s on %s failed", delivery.pk, delivery.channel)
+        retry = delivery.attempts + 1 < MAX_ATTEMPTS
+        claimed.update(
+            status="pending" if retry else "failed",
+            attempts=F("attempts") + 1,
+            claim="",
+            claimed_at=None,
+        )
+        return False
+    return bool(
+        claimed.update(
+            status="sent",
+            attempts=F("attempts") + 1,
+            claim="",
+            claimed_at=None,
+            sent_at=timezone.now(),
+        )
+    )
+
+
+def work(batch_size):
+    """
+    Send one batch of deliveries, returns the number sent.
+    """
+    token, deliveries = claim(batch_size)
+    return sum(send(delivery, token) for delivery in deliveries)
@@ -1,3 +1,190 @@
-from django.test import TestCase
+import asyncio
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from knox.models import AuthToken
+from rest_framework.test import APIClient
+from api.testing import make_customer, make_supplier, make_tour, make_tour_day
+from users.models import CustomUser
+from .models import Delivery, Notification
+from .outbox import MAX_ATTEMPTS, notify, work
 
-# Create your tests here.
+SENT = []
+
+
+def record(user, message):
+    SENT.append((user.username, message))
+
+
+def fail(user, message):
+    raise ConnectionError("provider down")
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        SENT.clear()
+        self.supplier = make_supplier()
+        self.customer = make_customer()
+        self.tourday = make_tour_day(make_tour(self.supplier))
+
+    @override_settings(NOTIFICATION_CHANNELS={"sms": "notifications.tests.record"})
+    def test_a_booking_writes_its_notifications_at_once(self):
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                reverse("create_tour_booking"), {"tourday_id": self.tourday.pk}
+            )
+        self.assertEqual(response.status_code, 201)
+        inserts = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(
+                (
+                    'INSERT INTO "notifications_notification"',
+                    'INSERT INTO "notifications_delivery"',
+                )
+            )
+        ]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user__username", flat=True)),
+            ["customer", "supplier"],
+        )
+
+        # sent after the request by the workers
+        self.assertEqual(SENT, [])
+        self.assertEqual(work(10), 2)
+        self.assertEqual(
+            SENT,
+            [
+                (
+                    "customer",
+                    "Booking Standard created waiting for confirmation from supplier",
+                ),
+                (
+                    "supplier",
+                    "New booking for Standard created waiting for your confirmation",
+                ),
+            ],
+        )
+        self.assertEqual(work(10), 0)
+
+    def test_no_channel_no_delivery(self):
+        notify((self.customer.user_id, "Hello"))
+
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertFalse(Delivery.objects.exists())
+
+    @override_settings(NOTIFICATION_CHANNELS={"sms": "notifications.tests.fail"})
+    def test_failed_deliveries_are_retried(self):
+        notify((self.customer.user_id, "Hello"))
+
+        with self.assertLogs("notifications.outbox", "ERROR"):
+            for _ in range(MAX_ATTEMPTS + 1):
+                self.assertEqual(work(10), 0)
+        delivery = Delivery.objects.get()
+        self.assertEqual(delivery.status, "failed")
+        self.assertEqual(delivery.attempts, MAX_ATTEMPTS)
+
+
+class ReadTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="customer", is_customer=True)
+        other = CustomUser.objects.create(username="other", is_customer=True)
+        self.notifications = notify(
+            *[(self.user.pk, f"Booking {i}") for i in range(4)], (other.pk, "Other")
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread(self):
+        with self.assertNumQueries(1):
+            return self.client.get(reverse("unread_notifications")).data["unread"]
+
+    def test_mark_read_in_one_update(self):
+        self.assertEqual(self.unread(), 4)
+        ids = [notification.pk for notification in self.notifications]
+
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse("read_notifications"), {"ids": ids[:2]}, format="json"
+            )
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(self.unread(), 2)
+
+        # the notifications of other users are left alone
+        response = self.client.post(
+            reverse("read_notifications"), {"all": True}, format="json"
+        )
+        self.assertEqual(response.data, {"updated": 2})
+        self.assertEqual(self.unread(), 0)
+        self.assertEqual(Notification.objects.filter(read=False).count(), 1)
+
+    def test_invalid_ids(self):
+        for data in (
+            {},
+            {"ids": "1"},
+            {"ids": ["a"]},
+            {"ids": list(range(101))},
+            [],
+            [1, 2],
+            "all",
+        ):
+            with self.subTest(data=data):
+                response = self.client.post(
+                    reverse("read_notifications"), data, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+class StreamTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="customer", is_customer=True)
+        _, self.token = AuthToken.objects.create(self.user)
+
+    def notify(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify((self.user.pk, message))
+
+    async def test_new_notifications_are_streamed(self):
+        await sync_to_async(self.notify)("Missed")
+        missed = await Notification.objects.aget()
+
+        response = await self.async_client.get(
+            reverse("notification_stream"), {"token": self.token, "after": 0}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        event = await anext(events)
+        self.assertTrue(event.startswith(f"id: {missed.pk}\n".encode()))
+        self.assertIn(b'"message": "Missed"', event)
+
+        # published once committed, after what was missed
+        await sync_to_async(self.notify)("Hello")
+        event = await asyncio.wait_for(anext(events), 5)
+        self.assertIn(b'"message": "Hello"', event)
+        await events.aclose()
+
+    def test_wsgi_gets_a_long_poll(self):
+        url = reverse("notification_stream")
+        with mock.patch("notifications.views.LONG_POLL", 0.1):
+            response = self.client.get(url, {"token": self.token, "after": 0})
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, b"")
+
+        # it ends with what it has to send instead of streaming forever
+        self.notify("Missed")
+        response = self.client.get(url, {"token": self.token, "after": 0})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn(b'"message": "Missed"', response.content)
+
+    async def test_the_stream_needs_a_token(self):
+        response = await self.async_client.get(
+            reverse("notification_stream"), {"token": "nope"}
+        )
+        self.assertEqual(response.status_code, 401)
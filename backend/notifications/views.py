@@ -1,17 +1,25 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from knox.auth import TokenAuthentication
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from .broker import get_broker
 from .models import Notification
 from .serializers import NotificationSerializer
+from api.pagination import paginated_response
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_list(request):
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    serializer = NotificationSerializer(notifications, many=True)
-    return Response(serializer.data)
+    notifications = Notification.objects.filter(user=request.user)
+    return paginated_response(request, notifications, NotificationSerializer)
 
 
 # should i put notification details ? i think no
@@ -31,11 +39,111 @@ def notification_detail(request, pk):
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def mark_notification_as_read(request, pk):
-    try:
-        notification = Notification.objects.get(pk=pk, user=request.user)
-    except Notification.DoesNotExist:
+    if not Notification.objects.filter(pk=pk, user=request.user).update(read=True):
         return Response(status=status.HTTP_404_NOT_FOUND)
-
-    notification.read = True
-    notification.save()
     return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# most notifications marked read at once
+MAX_READ_IDS = 100
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def unread_count(request):
+    # counted on the partial index of the unread notifications
+    unread = Notification.objects.filter(user=request.user, read=False).count()
+    return Response({'unread': unread})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_notifications_as_read(request):
+    """
+    Mark the notifications in {"ids": [...]} read, or all of them with
+    {"all": true}, in a single UPDATE. Returns how many were unread.
+    """
+    data = request.data if isinstance(request.data, dict) else {}
+    notifications = Notification.objects.filter(user=request.user, read=False)
+    if data.get('all') is not True:
+        ids = data.get('ids')
+        if (
+            not isinstance(ids, list)
+            or len(ids) > MAX_READ_IDS
+            or not all(isinstance(pk, int) for pk in ids)
+        ):
+            return Response(
+                {'error': f'Send "all": true or up to {MAX_READ_IDS} ids.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        notifications = notifications.filter(pk__in=ids)
+    return Response({'updated': notifications.update(read=True)})
+
+
+# a comment line is sent when nothing happened for this long so proxies
+# keep the stream open
+HEARTBEAT = 15
+
+# under WSGI nothing is sent before the response ends, the stream is then a
+# long poll: it ends with the first events or after this long and EventSource
+# reconnects with its Last-Event-ID
+LONG_POLL = 25
+
+
+def _event(data):
+    return f"id: {data['id']}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _events(user, after, long_poll=False):
+    # subscribed before reading what was missed so nothing falls in between
+    with get_broker().subscribe(user.pk) as queue:
+        sent = False
+        if after is not None:
+            missed = await sync_to_async(list)(
+                Notification.objects.filter(user=user, pk__gt=after).order_by('pk')[:100]
+            )
+            for notification in missed:
+                yield _event(NotificationSerializer(notification).data)
+                after = notification.pk
+                sent = True
+        while not (long_poll and sent):
+            try:
+                data = await asyncio.wait_for(
+                    queue.get(), LONG_POLL if long_poll else HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                if long_poll:
+                    return
+                yield ': heartbeat\n\n'
+                continue
+            if after is None or data['id'] > after:
+                yield _event(data)
+                sent = True
+
+
+# the new notifications of the user as Server-Sent Events, streamed by the
+# ASGI application (backend/asgi.py) instead of polling notification_list.
+# EventSource can't send headers so the knox token comes as ?token=, a
+# reconnecting client gets what it missed after its Last-Event-ID, a new
+# one after the newest notification it fetched, given as ?after=
+async def notification_stream(request):
+    try:
+        user, _ = await sync_to_async(TokenAuthentication().authenticate_credentials)(
+            request.GET.get('token', '').encode()
+        )
+    except AuthenticationFailed as error:
+        return JsonResponse({'detail': str(error.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.GET['after'])
+    except (KeyError, ValueError):
+        after = None
+
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(_events(user, after), content_type='text/event-stream')
+    else:
+        # a WSGI worker would hold on to an endless stream
+        events = [event async for event in _events(user, after, long_poll=True)]
+        response = HttpResponse(''.join(events), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:35
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe_package_days(apps, schema_editor):
+    # a day stored twice for the same offer keeps its first row with the
+    # lowest stock of the two, no booking points at a package day
+    PackageDay = apps.get_model("packages", "PackageDay")
+    duplicates = (
+        PackageDay.objects.order_by()
+        .values("package_offer", "day")
+        .annotate(count=Count("pk"), keep=Min("pk"), stock=Min("stock"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        PackageDay.objects.filter(
+            package_offer=row["package_offer"], day=row["day"]
+        ).exclude(pk=row["keep"]).delete()
+        PackageDay.objects.filter(pk=row["keep"]).update(stock=row["stock"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('packages', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_package_days, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='packageday',
+            unique_together={('package_offer', 'day')},
+        ),
+    ]
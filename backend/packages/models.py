@@ -3,6 +3,7 @@ from users.models import Supplier
 from categories.models import Category
 from location.models import Location
 from datetime import timedelta
+from activities.slots import iter_open_days
 
 class Package(models.Model):
     featured = models.BooleanField(default=False)
@@ -29,6 +30,10 @@ class Package(models.Model):
     min_age = models.IntegerField(blank=True, null=True)
     cancellation_policy = models.TextField(blank=True, null=True)
     additional_info = models.TextField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="package_created_idx")]
+
     def create_package_days(self):
         if not self.days_off:
             self.days_off = ""
@@ -60,12 +65,56 @@ class PackageOffer(models.Model):
     def __str__(self):
         return f"{self.package.title} - {self.title}"
 
+    def get_package_days(self):
+        """
+        Package days computed from the package rules, the stored rows (booked
+        or with an overridden stock) take the place of their day.
+        """
+        package = self.package
+        package_days = {
+            package_day.day: package_day for package_day in self.packageday_set.all()
+        }
+        for day in iter_open_days(
+            package.available_from, package.available_to, package.days_off
+        ):
+            package_days.setdefault(
+                day, PackageDay(day=day, stock=self.stock, package_offer=self)
+            )
+        return sorted(package_days.values(), key=lambda package_day: package_day.day)
+
+    def get_or_create_package_days(self, start_date, end_date):
+        """
+        Store the days between start_date and end_date so they can be booked,
+        the missing ones are inserted in one statement. Days that are not part
+        of the package rules are left out.
+        """
+        package = self.package
+        stored = set(
+            self.packageday_set.filter(day__range=(start_date, end_date)).values_list(
+                "day", flat=True
+            )
+        )
+        missing = [
+            PackageDay(day=day, stock=self.stock, package_offer=self)
+            for day in iter_open_days(
+                max(start_date, package.available_from),
+                min(end_date, package.available_to),
+                package.days_off,
+            )
+            if day not in stored
+        ]
+        PackageDay.objects.bulk_create(missing, ignore_conflicts=True)
+        return self.packageday_set.filter(day__range=(start_date, end_date))
+
 
 class PackageDay(models.Model):
     day = models.DateField()
     package_offer = models.ForeignKey(PackageOffer, on_delete=models.CASCADE)
     stock = models.PositiveIntegerField()
 
+    class Meta:
+        unique_together = ("package_offer", "day")
+
     def __str__(self):
         return f"{self.package_offer.package.title} - {self.day}"
 
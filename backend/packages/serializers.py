@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Min
 from .models import (
     Package,
     PackageDay,
@@ -10,6 +11,7 @@ from .models import (
     PackageOffer,
 )
 from location.serializers import LocationSerializer
+from api.query_plan import QueryPlanMixin
 
 
 class IncludedSerializer(serializers.ModelSerializer):
@@ -61,7 +63,7 @@ class OffPackageSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class PackageOfferSerializer(serializers.ModelSerializer):
+class PackageOfferSerializer(QueryPlanMixin, serializers.ModelSerializer):
     package = OffPackageSerializer()
 
     class Meta:
@@ -69,7 +71,7 @@ class PackageOfferSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "price", "stock", "package"]
 
 
-class PackageSerializer(serializers.ModelSerializer):
+class PackageSerializer(QueryPlanMixin, serializers.ModelSerializer):
     included_items = IncludedSerializer(
         many=True, read_only=True, source="included_set"
     )
@@ -95,3 +97,33 @@ class PackageDaySerializer(serializers.ModelSerializer):
     class Meta:
         model = PackageDay
         fields = "__all__"
+
+
+class PackageListSerializer(QueryPlanMixin, serializers.ModelSerializer):
+    location = LocationSerializer()
+    min_offer_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Package
+        fields = [
+            "id",
+            "title",
+            "image",
+            "duration",
+            "location",
+            "featured",
+            "available_to",
+            "unit",
+            "categories",
+            "min_offer_price",
+        ]
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        return (
+            super()
+            .setup_queryset(queryset)
+            .annotate(min_offer_price=Min("offers__price"))
+        )
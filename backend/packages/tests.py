@@ -1,3 +1,35 @@
-from django.test import TestCase
+from datetime import date
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api.testing import make_package, make_supplier
+from .models import PackageOffer, PackageDay
 
-# Create your tests here.
+
+class AvailabilityModeTests(TestCase):
+    def package_days(self, offer):
+        url = reverse("get_package_days", kwargs={"package_offer_id": offer.pk})
+        days = [(day["day"], day["stock"]) for day in APIClient().get(url).data]
+        return sorted(days)
+
+    def test_lazy_days_match_the_stored_ones(self):
+        package = make_package(
+            make_supplier(),
+            available_from=date(2024, 1, 1),
+            available_to=date(2024, 1, 14),
+            days_off="friday",
+        )
+        offer = PackageOffer.objects.create(
+            package=package, title="Standard", price=100, stock=4
+        )
+
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            lazy = self.package_days(offer)
+        package.create_package_days()
+
+        self.assertEqual(lazy, self.package_days(offer))
+        self.assertEqual(len(lazy), 12)
+        PackageDay.objects.filter(day=date(2024, 1, 2)).update(stock=1)
+        stored = self.package_days(offer)
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            self.assertEqual(self.package_days(offer), stored)
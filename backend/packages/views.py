@@ -1,18 +1,27 @@
-from .models import Package, PackageDay, PackageOffer
-from .serializers import PackageSerializer, PackageDaySerializer
+from .models import Package, PackageOffer
+from .serializers import (
+    PackageSerializer,
+    PackageListSerializer,
+    PackageOfferSerializer,
+    PackageDaySerializer,
+)
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.utils import timezone
+from activities.slots import lazy_availability
+from api.filters import filtered_response
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_packages(request):
     current_time = timezone.now()
-    packages = Package.objects.filter(available_to__gte=current_time)[:20]
-    serializer = PackageSerializer(packages, many=True)
+    packages = PackageListSerializer.setup_queryset(
+        Package.objects.filter(available_to__gte=current_time)
+    )[:20]
+    serializer = PackageListSerializer(packages, many=True)
     return Response(serializer.data)
 
 
@@ -21,14 +30,13 @@ def get_packages(request):
 def get_all_packages(request):
     current_time = timezone.now()
     packages = Package.objects.filter(available_to__gte=current_time)
-    serializer = PackageSerializer(packages, many=True)
-    return Response(serializer.data)
+    return filtered_response(request, packages, PackageListSerializer)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_package(request, pk):
-    package = Package.objects.get(pk=pk)
+    package = PackageSerializer.setup_queryset(Package.objects).get(pk=pk)
     serializer = PackageSerializer(package)
     return Response(serializer.data)
 
@@ -37,8 +45,13 @@ def get_package(request, pk):
 @permission_classes([AllowAny])
 def get_package_days(request, package_offer_id):
     try:
-        package_offer = PackageOffer.objects.get(pk=package_offer_id)
-        package_days = PackageDay.objects.filter(package_offer=package_offer)
+        package_offer = PackageOfferSerializer.setup_queryset(
+            PackageOffer.objects
+        ).get(pk=package_offer_id)
+        if lazy_availability():
+            package_days = package_offer.get_package_days()
+        else:
+            package_days = package_offer.packageday_set.all()
         serializer = PackageDaySerializer(package_days, many=True)
         return Response(serializer.data)
     except PackageOffer.DoesNotExist:
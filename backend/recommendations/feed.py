@@ -0,0 +1,243 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.utils import timezone
+from booking.models import ActivityBooking, TourBooking, PackageBooking
+from favorites.models import Favorite
+from search.index import MODELS
+from users.models import Customer
+from .models import Affinity, Recommendation
+
+# items kept in the feed of a customer
+SIZE = 30
+
+# what a preference, a favorite item and a booked item add to the affinity
+# of the customer to a location or a category
+PREFERENCE = 3
+FAVORITE = 2
+BOOKING = 1
+
+# the path from every booking model to its item
+BOOKINGS = {
+    ActivityBooking: "period__activity_offer__activity",
+    TourBooking: "tourday__tour_offer__tour",
+    PackageBooking: "package_offer__package",
+}
+
+KINDS = {model: kind for kind, model in MODELS.items()}
+
+
+def affinities(customer):
+    """
+    {(dimension, key): weight} of a customer, the dimension is "location"
+    or "category".
+    """
+    weights = Counter()
+    for key in customer.location.values_list("pk", flat=True):
+        weights["location", key] += PREFERENCE
+    for key in customer.preferences.values_list("pk", flat=True):
+        weights["category", key] += PREFERENCE
+    favorites = Favorite.objects.filter(user_id=customer.user_id)
+    sources = [
+        (
+            model.objects.filter(
+                pk__in=favorites.filter(item_type=kind).values("item_id")
+            ),
+            "",
+            FAVORITE,
+        )
+        for kind, model in MODELS.items()
+    ]
+    sources += [
+        (model.objects.filter(customer=customer, expired=False), f"{item}__", BOOKING)
+        for model, item in BOOKINGS.items()
+    ]
+    for queryset, item, weight in sources:
+        # one row per category of the item, its location counts once
+        seen = set()
+        rows = queryset.values_list("pk", f"{item}location", f"{item}categories")
+        for pk, location, category in rows:
+            if pk not in seen and location:
+                weights["location", location] += weight
+            seen.add(pk)
+            if category:
+                weights["category", category] += weight
+    return weights
+
+
+def _rank(scores):
+    # highest score first, the newest item first among equal scores
+    return sorted(scores.items(), key=lambda hit: (-hit[1], -hit[0][1], hit[0][0]))
+
+
+def score_items(weights):
+    """
+    {(kind, id): score} of the available items in a location or a category
+    the customer has an affinity to. One query per kind of item.
+    """
+    locations = [key for dimension, key in weights if dimension == "location"]
+    categories = [key for dimension, key in weights if dimension == "category"]
+    scores = Counter()
+    for kind, model in MODELS.items():
+        candidates = model.objects.filter(
+            Q(location__in=locations) | Q(categories__in=categories),
+            available_to__gte=timezone.localdate(),
+        )
+        rows = model.objects.filter(pk__in=candidates.values("pk")).values_list(
+            "pk", "location", "categories"
+        )
+        seen = set()
+        for pk, location, category in rows:
+            if pk not in seen:
+                scores[kind, pk] += weights.get(("location", location), 0)
+            seen.add(pk)
+            scores[kind, pk] += weights.get(("category", category), 0)
+    return scores
+
+
+def refresh(customer):
+    """
+    Compute the affinities and the feed of a customer again from their
+    preferences, favorites and bookings.
+    """
+    weights = affinities(customer)
+    ranked = _rank(score_items(weights))[:SIZE]
+    with transaction.atomic():
+        Affinity.objects.filter(customer=customer).delete()
+        Affinity.objects.bulk_create(
+            Affinity(customer=customer, dimension=dimension, key=key, weight=weight)
+            for (dimension, key), weight in weights.items()
+        )
+        Recommendation.objects.filter(customer=customer).delete()
+        Recommendation.objects.bulk_create(
+            Recommendation(customer=customer, kind=kind, item_id=pk, score=score)
+            for (kind, pk), score in ranked
+        )
+
+
+def refresh_item(kind, item_id):
+    """
+    Update the feeds an item added to, changed in or removed from the
+    catalog belongs to. Customers whose feed ranks it get it inserted in
+    place, only the customers it leaves are refreshed entirely.
+    """
+    item = (
+        MODELS[kind]
+        .objects.filter(pk=item_id, available_to__gte=timezone.localdate())
+        .first()
+    )
+    stored = Recommendation.objects.filter(kind=kind, item_id=item_id)
+    had = set(stored.values_list("customer", flat=True))
+    stored.delete()
+    scores = {}
+    if item:
+        categories = list(item.categories.values_list("pk", flat=True))
+        scores = dict(
+            Affinity.objects.filter(
+                Q(dimension="location", key=item.location_id)
+                | Q(dimension="category", key__in=categories)
+            )
+            .values("customer")
+            .annotate(score=Sum("weight"))
+            .values_list("customer", "score")
+        )
+
+    feeds = {
+        row["customer"]: row
+        for row in Recommendation.objects.filter(customer__in=scores)
+        .values("customer")
+        .annotate(count=Count("pk"), lowest=Min("score"))
+        .order_by()
+    }
+    added = []
+    full = []
+    for customer_id, score in scores.items():
+        feed = feeds.get(customer_id, {"count": 0, "lowest": 0})
+        if feed["count"] < SIZE:
+            added.append(customer_id)
+        elif score > feed["lowest"]:
+            added.append(customer_id)
+            full.append(customer_id)
+    Recommendation.objects.bulk_create(
+        Recommendation(
+            customer_id=customer_id,
+            kind=kind,
+            item_id=item_id,
+            score=scores[customer_id],
+        )
+        for customer_id in added
+    )
+    # the feeds it made longer than SIZE lose their last item
+    for customer_id in full:
+        last = (
+            Recommendation.objects.filter(customer_id=customer_id)
+            .order_by("score", "item_id", "-kind")
+            .values_list("pk", flat=True)[0]
+        )
+        Recommendation.objects.filter(pk=last).delete()
+    # the ones it left have a free place for the next best item
+    for customer in Customer.objects.filter(pk__in=had - scores.keys()):
+        refresh(customer)
+
+
+def add_booking(booking):
+    """
+    Count a new booking in the affinities of its customer and update the
+    feeds of the booked item. The other items the booking makes the customer
+    like more are ranked again by rebuild_recommendations.
+    """
+    item = booking
+    for field in BOOKINGS[type(booking)].split("__"):
+        item = getattr(item, field)
+    keys = [("location", item.location_id)] + [
+        ("category", key) for key in item.categories.values_list("pk", flat=True)
+    ]
+    for dimension, key in keys:
+        affinity, created = Affinity.objects.get_or_create(
+            customer_id=booking.customer_id,
+            dimension=dimension,
+            key=key,
+            defaults={"weight": BOOKING},
+        )
+        if not created:
+            Affinity.objects.filter(pk=affinity.pk).update(weight=F("weight") + BOOKING)
+    refresh_item(KINDS[type(item)], item.pk)
+
+
+def feed(user, limit=SIZE):
+    # the ranked (kind, id) of the feed of a user, empty for anyone but a
+    # customer
+    if not user.is_authenticated:
+        return []
+    return list(
+        Recommendation.objects.filter(customer__user=user)
+        .order_by("-score", "-item_id", "kind")
+        .values_list("kind", "item_id")[:limit]
+    )
+
+
+def rebuild():
+    refreshed = 0
+    for customer in Customer.objects.iterator():
+        refresh(customer)
+        refreshed += 1
+    return refreshed
+
+
+# refreshed once the change is committed so a rolled back change never
+# reaches a feed
+def customer_changed(customer_id):
+    def run():
+        customer = Customer.objects.filter(pk=customer_id).first()
+        if customer:
+            refresh(customer)
+
+    transaction.on_commit(run)
+
+
+def item_changed(kind, item_id):
+    transaction.on_commit(lambda: refresh_item(kind, item_id))
+
+
+def booking_created(booking):
+    transaction.on_commit(lambda: add_booking(booking))
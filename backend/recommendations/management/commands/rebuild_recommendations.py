@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from recommendations.feed import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Compute the "for you" feed of every customer again, run it daily '
+        "so the items that are no longer available leave the feeds"
+    )
+
+    def handle(self, *args, **options):
+        refreshed = rebuild()
+        self.stdout.write(f"{refreshed} feeds refreshed")
@@ -0,0 +1,92 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=20)),
+                ("item_id", models.PositiveIntegerField()),
+                ("score", models.PositiveIntegerField()),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.customer"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Affinity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dimension", models.CharField(max_length=20)),
+                ("key", models.PositiveIntegerField()),
+                ("weight", models.PositiveIntegerField()),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="users.customer"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["dimension", "key"], name="affinity_key_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="affinity",
+            constraint=models.UniqueConstraint(
+                fields=("customer", "dimension", "key"), name="affinity_customer_key"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recommendation",
+            index=models.Index(
+                fields=["customer", "-score", "-item_id"],
+                name="recommendation_rank_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recommendation",
+            index=models.Index(
+                fields=["kind", "item_id"], name="recommendation_kind_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="recommendation",
+            constraint=models.UniqueConstraint(
+                fields=("customer", "kind", "item_id"), name="recommendation_item_key"
+            ),
+        ),
+    ]
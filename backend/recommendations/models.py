@@ -0,0 +1,43 @@
+from django.db import models
+from users.models import Customer
+
+
+# how much a customer likes a location or a category, summed over their
+# preferences, favorites and bookings. Finds the customers an item
+# changed in the catalog is recommended to
+class Affinity(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    dimension = models.CharField(max_length=20)
+    key = models.PositiveIntegerField()
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "dimension", "key"], name="affinity_customer_key"
+            )
+        ]
+        indexes = [models.Index(fields=["dimension", "key"], name="affinity_key_idx")]
+
+
+# the best scored items of the "for you" feed of a customer
+class Recommendation(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20)
+    item_id = models.PositiveIntegerField()
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "kind", "item_id"],
+                name="recommendation_item_key",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["customer", "-score", "-item_id"],
+                name="recommendation_rank_idx",
+            ),
+            models.Index(fields=["kind", "item_id"], name="recommendation_kind_idx"),
+        ]
@@ -0,0 +1,78 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from search.index import MODELS
+from users.models import Customer
+from favorites.models import Favorite
+from .feed import BOOKINGS, KINDS, booking_created, customer_changed, item_changed
+
+
+# the feed of a customer follows their preferences, favorites and bookings
+def preferences_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        customer_changed(instance.pk)
+        return
+    # a location or a category given or taken from customers, a clear has
+    # no pk_set and is left to rebuild_recommendations
+    for customer_id in pk_set or ():
+        customer_changed(customer_id)
+
+
+for field in ("location", "preferences"):
+    m2m_changed.connect(
+        preferences_changed,
+        sender=getattr(Customer, field).through,
+        dispatch_uid=f"recommendations_customer_{field}",
+    )
+
+
+def favorite_changed(sender, instance, **kwargs):
+    for customer_id in Customer.objects.filter(user_id=instance.user_id).values_list(
+        "pk", flat=True
+    ):
+        customer_changed(customer_id)
+
+
+post_save.connect(
+    favorite_changed, sender=Favorite, dispatch_uid="recommendations_favorite"
+)
+post_delete.connect(
+    favorite_changed, sender=Favorite, dispatch_uid="recommendations_favorite"
+)
+
+
+# a new booking only moves the booked item, the rest of the feed catches up
+# with rebuild_recommendations
+def booking_saved(sender, instance, created, **kwargs):
+    if created:
+        booking_created(instance)
+
+
+for model in BOOKINGS:
+    post_save.connect(
+        booking_saved, sender=model, dispatch_uid=f"recommendations_{model.__name__}"
+    )
+
+
+# an item changed in the catalog moves in the feeds it is ranked in
+def item_saved(sender, instance, **kwargs):
+    item_changed(KINDS[sender], instance.pk)
+
+
+def categories_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        item_changed(KINDS[type(instance)], instance.pk)
+        return
+    for item_id in pk_set or ():
+        item_changed(KINDS[model], item_id)
+
+
+for model in MODELS.values():
+    uid = f"recommendations_{model.__name__}"
+    post_save.connect(item_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(item_saved, sender=model, dispatch_uid=uid)
+    m2m_changed.connect(
+        categories_changed, sender=model.categories.through, dispatch_uid=uid
+    )
@@ -0,0 +1,154 @@
+from datetime import date, time, timedelta
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from activities.models import Activity, ActivityOffer, Period
+from api.testing import make_customer, make_supplier
+from booking.models import ActivityBooking
+from categories.models import Category
+from favorites.models import Favorite
+from location.models import Location
+from tours.models import Tour
+from .feed import feed, rebuild
+from .models import Recommendation
+
+
+class ForYouTests(TestCase):
+    def setUp(self):
+        self.supplier = make_supplier()
+        self.customer = make_customer()
+        self.beirut = Location.objects.create(name="Beirut")
+        self.byblos = Location.objects.create(name="Byblos")
+        self.hiking = Category.objects.create(name="Hiking")
+        self.today = date.today()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.customer.location.add(self.beirut)
+            self.customer.preferences.add(self.hiking)
+
+    def activity(self, title, location, *categories, days=10):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = Activity.objects.create(
+                supplier=self.supplier,
+                location=location,
+                title=title,
+                description="",
+                price=10,
+                available_from=self.today,
+                available_to=self.today + timedelta(days=days),
+                period=60,
+                unit="person",
+                start_time=time(8),
+                end_time=time(12),
+            )
+            activity.categories.add(*categories)
+        return activity
+
+    def ranked(self):
+        return [pk for _, pk in feed(self.customer.user)]
+
+    def test_items_are_ranked_by_affinity(self):
+        both = self.activity("Cedars hike", self.beirut, self.hiking)
+        hike = self.activity("Byblos hike", self.byblos, self.hiking)
+        city = self.activity("City walk", self.beirut)
+        byblos = self.activity("Byblos port", self.byblos)
+        self.activity("Past hike", self.beirut, self.hiking, days=-1)
+        self.assertEqual(self.ranked(), [both.pk, city.pk, hike.pk])
+
+        # liking a hike in Byblos brings the hikes up and Byblos in
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.create(
+                user=self.customer.user, item_type="activity", item_id=hike.pk
+            )
+        self.assertEqual(self.ranked(), [both.pk, hike.pk, city.pk, byblos.pk])
+
+        client = APIClient()
+        client.force_authenticate(self.customer.user)
+        with self.assertNumQueries(3):
+            response = client.get(reverse("for_you"))
+        self.assertEqual(
+            [(item["type"], item["id"]) for item in response.data["results"]],
+            [("activity", pk) for pk in self.ranked()],
+        )
+
+    def test_catalog_changes_update_the_feeds_in_place(self):
+        city = self.activity("City walk", self.beirut)
+        hike = self.activity("Byblos hike", self.byblos, self.hiking)
+        tour = Tour.objects.create(
+            supplier=self.supplier,
+            location=self.byblos,
+            title="Old port",
+            description="",
+            price=10,
+            available_from=self.today,
+            available_to=self.today + timedelta(days=10),
+            period=8,
+            unit="person",
+            pickup_location="Byblos",
+            pickup_time=time(8),
+            dropoff_time=time(18),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            tour.categories.add(self.hiking)
+            self.hiking.activities.add(city)
+            hike.location = self.beirut
+            hike.save()
+        self.assertEqual(
+            feed(self.customer.user),
+            [("activity", hike.pk), ("activity", city.pk), ("tour", tour.pk)],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hike.available_to = self.today - timedelta(days=1)
+            hike.save()
+            city.delete()
+        self.assertEqual(feed(self.customer.user), [("tour", tour.pk)])
+
+        incremental = list(Recommendation.objects.values_list("kind", "item_id"))
+        rebuild()
+        self.assertEqual(
+            list(Recommendation.objects.values_list("kind", "item_id")), incremental
+        )
+
+    @mock.patch("recommendations.feed.SIZE", 2)
+    def test_feeds_keep_their_best_items(self):
+        city = self.activity("City walk", self.beirut)
+        hike = self.activity("Byblos hike", self.byblos, self.hiking)
+        both = self.activity("Cedars hike", self.beirut, self.hiking)
+        self.assertEqual(self.ranked(), [both.pk, hike.pk])
+
+        # the item that left makes room for the next best one
+        with self.captureOnCommitCallbacks(execute=True):
+            both.delete()
+        self.assertEqual(self.ranked(), [hike.pk, city.pk])
+
+    def test_a_booking_only_moves_the_booked_item(self):
+        city = self.activity("City walk", self.beirut)
+        port = self.activity("Byblos port", self.byblos)
+        souk = self.activity("Byblos souk", self.byblos)
+        offer = ActivityOffer.objects.create(activity=port, title="Std", price=10)
+        period = Period.objects.create(
+            day=self.today,
+            time_from=time(8),
+            time_to=time(9),
+            stock=5,
+            activity_offer=offer,
+        )
+
+        with mock.patch("recommendations.feed.refresh") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                ActivityBooking.objects.create(period=period, customer=self.customer)
+        refresh.assert_not_called()
+        self.assertEqual(self.ranked(), [city.pk, port.pk])
+
+        # the other items of Byblos get in with the next rebuild
+        rebuild()
+        self.assertEqual(self.ranked(), [city.pk, souk.pk, port.pk])
+
+    def test_anonymous_users_get_an_empty_feed(self):
+        self.activity("City walk", self.beirut)
+
+        response = APIClient().get(reverse("for_you"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
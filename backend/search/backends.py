@@ -0,0 +1,216 @@
+import re
+from django.db import connection
+from django.db.models import Case, CharField, F, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# every indexed kind gets a slot in the rowid so an item can be found (and
+# replaced) by rowid without a scan: rowid = item id * len(KINDS) + kind slot
+KINDS = ("activity", "tour", "package")
+
+
+def terms(query):
+    return re.findall(r"\w+", query or "")
+
+
+class SearchBackend:
+    """
+    A full text index over the catalog items. search() returns the
+    (kind, item id) hits of a query ordered by relevance together with the
+    cursor that continues after them (None on the last page), a cursor can be
+    anything JSON serializable and search() raises ValueError for one it
+    did not make. Given querysets ({kind: queryset}) only the
+    items in them are hits, kinds left out have none. filter() narrows a
+    queryset of one kind down to the items matching a query.
+    """
+
+    def index(self, kind, pk, document):
+        raise NotImplementedError
+
+    def remove(self, kind, pk):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def search(self, query, limit, cursor=None, querysets=None):
+        raise NotImplementedError
+
+    def filter(self, queryset, kind, query):
+        raise NotImplementedError
+
+
+class Fts5Backend(SearchBackend):
+    """
+    SQLite FTS5 inverted index, ranked with bm25 where a title match counts
+    the most and a description match the least. Every query term matches as
+    a prefix.
+    """
+
+    table = "search_index"
+    # bm25 weights of the title, description and location columns
+    weights = (10.0, 1.0, 5.0)
+
+    def rowid(self, kind, pk):
+        return pk * len(KINDS) + KINDS.index(kind)
+
+    def index(self, kind, pk, document):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(kind, pk)]
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description, location) "
+                "VALUES (%s, %s, %s, %s)",
+                [
+                    self.rowid(kind, pk),
+                    document["title"],
+                    document["description"],
+                    document["location"],
+                ],
+            )
+
+    def remove(self, kind, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid = %s", [self.rowid(kind, pk)]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def match(self, query):
+        # every term quoted so user input can't use the FTS5 query syntax
+        return " ".join(f'"{word}"*' for word in terms(query))
+
+    def search(self, query, limit, cursor=None, querysets=None):
+        match = self.match(query)
+        if not match or querysets == {}:
+            return [], None
+        where = ""
+        restrict_params = []
+        if querysets is not None:
+            # the filtered items join the index inside the database, paging
+            # stays a single keyset query whatever the filters drop
+            restricts = []
+            for kind, queryset in querysets.items():
+                rowids = queryset.annotate(
+                    rowid=F("pk") * len(KINDS) + KINDS.index(kind)
+                ).values("rowid")
+                subquery, subquery_params = rowids.query.sql_with_params()
+                restricts.append(f"rowid IN ({subquery})")
+                restrict_params += subquery_params
+            where = " AND (" + " OR ".join(restricts) + ")"
+        if cursor is not None:
+            # [score, rowid] of the last hit of the previous page
+            try:
+                score, last_rowid = cursor
+                score, last_rowid = float(score), int(last_rowid)
+            except (TypeError, ValueError) as error:
+                raise ValueError("Invalid cursor") from error
+        sql = (
+            f"SELECT rowid, score FROM (SELECT rowid, bm25({self.table}, %s, %s, %s)"
+            f" AS score FROM {self.table} WHERE {self.table} MATCH %s{where})"
+        )
+        params = [*self.weights, match, *restrict_params]
+        if cursor is not None:
+            sql += " WHERE score > %s OR (score = %s AND rowid > %s)"
+            params += [score, score, last_rowid]
+        sql += " ORDER BY score, rowid LIMIT %s"
+        params.append(limit + 1)
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            rows = db_cursor.fetchall()
+
+        hits = [
+            (KINDS[rowid % len(KINDS)], rowid // len(KINDS))
+            for rowid, _ in rows[:limit]
+        ]
+        if len(rows) <= limit:
+            return hits, None
+        last_rowid, last_score = rows[limit - 1]
+        return hits, [last_score, last_rowid]
+
+    def filter(self, queryset, kind, query):
+        match = self.match(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid / {len(KINDS)} FROM {self.table}"
+                f" WHERE {self.table} MATCH %s AND rowid %% {len(KINDS)} = %s",
+                [match, KINDS.index(kind)],
+            )
+        )
+
+
+class LikeBackend(SearchBackend):
+    """
+    Fallback for databases without a full text index: nothing is stored,
+    search runs icontains queries and puts title matches first.
+    """
+
+    def index(self, kind, pk, document):
+        pass
+
+    def remove(self, kind, pk):
+        pass
+
+    def clear(self):
+        pass
+
+    def matches(self, words):
+        matches = Q()
+        for word in words:
+            matches &= (
+                Q(title__icontains=word)
+                | Q(description__icontains=word)
+                | Q(location__name__icontains=word)
+            )
+        return matches
+
+    def search(self, query, limit, cursor=None, querysets=None):
+        from .index import MODELS
+
+        words = terms(query)
+        if querysets is None:
+            querysets = {kind: model.objects.all() for kind, model in MODELS.items()}
+        if not words or not querysets:
+            return [], None
+        try:
+            offset = int(cursor or 0)
+        except (TypeError, ValueError) as error:
+            raise ValueError("Invalid cursor") from error
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+        matching = []
+        for kind, queryset in querysets.items():
+            title_matches = Q()
+            for word in words:
+                title_matches &= Q(title__icontains=word)
+            matching.append(
+                queryset.filter(self.matches(words))
+                .annotate(
+                    kind=Value(kind, output_field=CharField()),
+                    score=Case(
+                        When(title_matches, then=0),
+                        default=1,
+                        output_field=IntegerField(),
+                    ),
+                )
+                .values_list("kind", "id", "score")
+                .order_by()
+            )
+        rows = list(
+            matching[0]
+            .union(*matching[1:])
+            .order_by("score", "kind", "id")[offset : offset + limit + 1]
+        )
+        hits = [(kind, pk) for kind, pk, _ in rows[:limit]]
+        return hits, offset + limit if len(rows) > limit else None
+
+    def filter(self, queryset, kind, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        return queryset.filter(self.matches(words))
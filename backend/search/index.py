@@ -0,0 +1,73 @@
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.utils.module_loading import import_string
+from activities.models import Activity
+from tours.models import Tour
+from packages.models import Package
+
+MODELS = {"activity": Activity, "tour": Tour, "package": Package}
+
+
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def kind_of(item):
+    for kind, model in MODELS.items():
+        if isinstance(item, model):
+            return kind
+
+
+def document(item):
+    return {
+        "title": item.title,
+        "description": item.description,
+        "location": item.location.name,
+    }
+
+
+def index_item(item):
+    get_backend().index(kind_of(item), item.pk, document(item))
+
+
+def remove_item(item):
+    get_backend().remove(kind_of(item), item.pk)
+
+
+def rebuild():
+    backend = get_backend()
+    backend.clear()
+    indexed = 0
+    for kind, model in MODELS.items():
+        for item in model.objects.select_related("location").iterator():
+            backend.index(kind, item.pk, document(item))
+            indexed += 1
+    return indexed
+
+
+def search(query, limit, cursor=None, querysets=None):
+    return get_backend().search(query, limit, cursor, querysets)
+
+
+def matching(queryset, kind, query):
+    return get_backend().filter(queryset, kind, query)
+
+
+# the backend cursors are sent to the client as opaque url safe strings
+def encode_cursor(cursor):
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+
+def decode_cursor(value):
+    """
+    Backend cursor of an encoded cursor, raises ValueError if it was not
+    made by encode_cursor.
+    """
+    if not value:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError("Invalid cursor") from error
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from search.index import rebuild
+from search.suggest import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = (
+        "Index every activity, tour and package and every suggestion again, "
+        "needed after changes that skip the model signals like queryset "
+        "updates or bulk_create"
+    )
+
+    def handle(self, *args, **options):
+        indexed = rebuild()
+        suggestions = rebuild_suggestions()
+        self.stdout.write(f"{indexed} items indexed, {suggestions} suggestions")
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+ITEMS = {
+    "activity": ("activities", "Activity"),
+    "tour": ("tours", "Tour"),
+    "package": ("packages", "Package"),
+}
+# frozen copy of the search.backends rowid layout as it was when this
+# migration was written, later changes to the live one don't apply here
+KINDS = ("activity", "tour", "package")
+
+
+# the FTS5 table only exists on SQLite, other databases use the LikeBackend
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "title, description, location, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for kind, (app_label, model_name) in ITEMS.items():
+            model = apps.get_model(app_label, model_name)
+            items = model.objects.using(schema_editor.connection.alias).values_list(
+                "pk", "title", "description", "location__name"
+            )
+            cursor.executemany(
+                "INSERT INTO search_index (rowid, title, description, location) "
+                "VALUES (%s, %s, %s, %s)",
+                [
+                    (pk * len(KINDS) + KINDS.index(kind), title, description, location)
+                    for pk, title, description, location in items.iterator()
+                ],
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE search_index")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("activities", "0004_activity_activity_created_idx"),
+        ("tours", "0004_tour_tour_created_idx"),
+        ("packages", "0004_package_package_created_idx"),
+    ]
+
+    operations = [migrations.RunPython(create_index, drop_index)]
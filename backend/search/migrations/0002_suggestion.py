@@ -0,0 +1,75 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:50
+
+import unicodedata
+
+from django.db import migrations, models
+
+SOURCES = {
+    "activity": ("activities", "Activity", "title"),
+    "tour": ("tours", "Tour", "title"),
+    "package": ("packages", "Package", "title"),
+    "location": ("location", "Location", "name"),
+    "category": ("categories", "Category", "name"),
+}
+
+
+# frozen copy of search.suggest.suggestion_keys as it was when this
+# migration was written, later changes to the live one don't apply here
+def suggestion_keys(label):
+    text = unicodedata.normalize("NFKD", label.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    words = text.split()
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+def add_suggestions(apps, schema_editor):
+    Suggestion = apps.get_model("search", "Suggestion")
+    for kind, (app_label, model_name, field) in SOURCES.items():
+        model = apps.get_model(app_label, model_name)
+        Suggestion.objects.bulk_create(
+            (
+                Suggestion(kind=kind, item_id=pk, label=label, key=key[:255])
+                for pk, label in model.objects.values_list("pk", field).iterator()
+                for key in suggestion_keys(label)
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+        ("activities", "0004_activity_activity_created_idx"),
+        ("tours", "0004_tour_tour_created_idx"),
+        ("packages", "0004_package_package_created_idx"),
+        ("categories", "0001_initial"),
+        ("location", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Suggestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=20)),
+                ("item_id", models.PositiveIntegerField()),
+                ("label", models.CharField(max_length=255)),
+                ("key", models.CharField(db_index=True, max_length=255)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["kind", "item_id"], name="suggestion_item_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(add_suggestions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+# one row per word a suggestion can be found by, "Hiking in the cedars" is
+# stored under "hiking in the cedars", "in the cedars", "the cedars" and
+# "cedars" so typing the start of any of its words finds it
+class Suggestion(models.Model):
+    kind = models.CharField(max_length=20)
+    item_id = models.PositiveIntegerField()
+    label = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["kind", "item_id"], name="suggestion_item_idx")]
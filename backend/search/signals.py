@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from categories.models import Category
+from location.models import Location
+from .index import MODELS, index_item, remove_item
+from .suggest import remove_suggestions, update_suggestions
+
+
+# the index is written in the same transaction as the item so a rolled back
+# save never leaves it out of sync. Queryset .update() and bulk_create skip
+# these signals, run rebuild_search_index after those.
+def item_saved(sender, instance, **kwargs):
+    index_item(instance)
+    update_suggestions(instance)
+
+
+def item_deleted(sender, instance, **kwargs):
+    remove_item(instance)
+    remove_suggestions(instance)
+
+
+for model in MODELS.values():
+    uid = f"search_{model.__name__}"
+    post_save.connect(item_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(item_deleted, sender=model, dispatch_uid=uid)
+
+
+# items are found by the name of their location as well
+@receiver(post_save, sender=Location, dispatch_uid="search_location")
+def location_saved(sender, instance, created, **kwargs):
+    update_suggestions(instance)
+    if created:
+        return
+    for model in MODELS.values():
+        for item in model.objects.filter(location=instance):
+            item.location = instance
+            index_item(item)
+
+
+@receiver(post_save, sender=Category, dispatch_uid="search_category")
+def category_saved(sender, instance, **kwargs):
+    update_suggestions(instance)
+
+
+@receiver(post_delete, sender=Location, dispatch_uid="search_location")
+@receiver(post_delete, sender=Category, dispatch_uid="search_category")
+def name_deleted(sender, instance, **kwargs):
+    remove_suggestions(instance)
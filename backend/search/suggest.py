@@ -0,0 +1,91 @@
+import unicodedata
+from activities.models import Activity
+from categories.models import Category
+from location.models import Location
+from packages.models import Package
+from tours.models import Tour
+from .models import Suggestion
+
+# kind of suggestion -> model and the field it is suggested by
+SOURCES = {
+    "activity": (Activity, "title"),
+    "tour": (Tour, "title"),
+    "package": (Package, "title"),
+    "location": (Location, "name"),
+    "category": (Category, "name"),
+}
+
+# sorts after every character, key < prefix + END matches the whole prefix
+END = "\U0010ffff"
+
+
+def normalize(text):
+    """Lower case without accents and with single spaces."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.split())
+
+
+def suggestion_keys(label):
+    words = normalize(label).split()
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+def kind_of(instance):
+    for kind, (model, _) in SOURCES.items():
+        if isinstance(instance, model):
+            return kind
+
+
+def update_suggestions(instance):
+    kind = kind_of(instance)
+    label = getattr(instance, SOURCES[kind][1])
+    Suggestion.objects.filter(kind=kind, item_id=instance.pk).delete()
+    Suggestion.objects.bulk_create(
+        Suggestion(kind=kind, item_id=instance.pk, label=label, key=key[:255])
+        for key in suggestion_keys(label)
+    )
+
+
+def remove_suggestions(instance):
+    Suggestion.objects.filter(kind=kind_of(instance), item_id=instance.pk).delete()
+
+
+def rebuild_suggestions():
+    Suggestion.objects.all().delete()
+    for kind, (model, field) in SOURCES.items():
+        Suggestion.objects.bulk_create(
+            (
+                Suggestion(kind=kind, item_id=pk, label=label, key=key[:255])
+                for pk, label in model.objects.values_list("pk", field).iterator()
+                for key in suggestion_keys(label)
+            ),
+            batch_size=1000,
+        )
+    return Suggestion.objects.count()
+
+
+def suggest(prefix, limit):
+    """
+    At most limit suggestions whose label has a word starting with prefix,
+    a range scan on the key index in alphabetical order.
+    """
+    prefix = normalize(prefix)
+    if not prefix:
+        return []
+    # an item is found once per matching word, read a few rows more than
+    # needed so the duplicates don't leave the list short
+    rows = (
+        Suggestion.objects.filter(key__gte=prefix, key__lt=prefix + END)
+        .order_by("key")
+        .values_list("kind", "item_id", "label")[: limit * 4]
+    )
+    suggestions = {}
+    for kind, item_id, label in rows:
+        suggestions.setdefault((kind, item_id), label)
+        if len(suggestions) == limit:
+            break
+    return [
+        {"type": kind, "id": item_id, "label": label}
+        for (kind, item_id), label in suggestions.items()
+    ]
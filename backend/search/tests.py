@@ -0,0 +1,210 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from activities.models import Activity
+from api.testing import make_activity, make_package, make_supplier, make_tour
+from categories.models import Category
+from location.models import Location
+from .index import encode_cursor, rebuild, search
+from .suggest import suggest
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.supplier = make_supplier()
+        self.beirut = Location.objects.create(name="Beirut")
+
+    def activity(self, title, description="", location=None):
+        return make_activity(
+            self.supplier,
+            title,
+            location or self.beirut,
+            days=10,
+            description=description,
+        )
+
+    def tour(self, title, description=""):
+        return make_tour(
+            self.supplier, title, self.beirut, days=10, description=description
+        )
+
+    def package(self, title, description=""):
+        return make_package(
+            self.supplier,
+            title,
+            self.beirut,
+            days=10,
+            description=description,
+            duration="2 days",
+            period=2,
+        )
+
+    def test_title_matches_rank_first_across_kinds(self):
+        tour = self.tour("Old souks", "ends with a hike to the castle")
+        activity = self.activity("Hiking in the cedars")
+        package = self.package("Cedars weekend", "with a short hike")
+
+        hits, cursor = search("hik", 10)
+
+        self.assertEqual(hits[0], ("activity", activity.pk))
+        self.assertCountEqual(hits[1:], [("tour", tour.pk), ("package", package.pk)])
+        self.assertIsNone(cursor)
+
+    def test_every_word_must_match(self):
+        activity = self.activity("Rock climbing")
+        self.activity("Ice climbing")
+        self.activity("Rock garden")
+
+        hits, _ = search("climb rock", 10)
+
+        self.assertEqual(hits, [("activity", activity.pk)])
+        self.assertEqual(search("", 10), ([], None))
+        # query syntax characters are plain text
+        self.assertEqual(search('"climb* -rock', 10)[0], hits)
+
+    def test_index_follows_saves_and_deletes(self):
+        activity = self.activity("Kayaking")
+        activity.title = "Paragliding"
+        activity.save()
+        self.assertEqual(search("kayak", 10)[0], [])
+        self.assertEqual(search("paraglid", 10)[0], [("activity", activity.pk)])
+
+        self.beirut.name = "Jounieh"
+        self.beirut.save()
+        self.assertEqual(search("jounieh", 10)[0], [("activity", activity.pk)])
+
+        activity.delete()
+        self.assertEqual(search("paraglid", 10)[0], [])
+
+    def test_rebuild(self):
+        activity = self.activity("Kayaking")
+        Activity.objects.update(title="Sailing")
+
+        self.assertEqual(rebuild(), 1)
+        self.assertEqual(search("sail", 10)[0], [("activity", activity.pk)])
+
+    def test_endpoint_merges_and_paginates(self):
+        for index in range(3):
+            self.activity(f"Cave {index}")
+            self.tour(f"Cave tour {index}")
+        client = APIClient()
+
+        url = reverse("search") + "?query=cave&page_size=4"
+        seen = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [(item["type"], item["id"]) for item in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+        self.assertEqual({kind for kind, _ in seen}, {"activity", "tour"})
+
+        # not base64 JSON, or JSON that is not [score, rowid]
+        for cursor in ("nope", "MQ==", "WzFd", "Ingi", encode_cursor(["a", 1])):
+            with self.subTest(cursor=cursor):
+                response = client.get(
+                    reverse("search"), {"query": "cave", "cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_filters_and_facets(self):
+        byblos = Location.objects.create(name="Byblos")
+        hiking = Category.objects.create(name="Hiking")
+        trail = self.activity("Cedar trail")
+        trail.categories.add(hiking)
+        self.activity("Cedar reef", location=byblos)
+        tour = self.tour("Cedar forest")
+        tour.categories.add(hiking)
+        self.package("Cedar weekend")
+        client = APIClient()
+
+        url = reverse("search") + f"?query=cedar&categories={hiking.pk}&page_size=1"
+        seen = []
+        while url:
+            response = client.get(url)
+            seen += [(item["type"], item["id"]) for item in response.data["results"]]
+            url = response.data["next"]
+        self.assertCountEqual(seen, [("activity", trail.pk), ("tour", tour.pk)])
+
+        response = client.get(reverse("search"), {"query": "cedar", "featured": "true"})
+        self.assertEqual(response.data["results"], [])
+        facets = response.data["facets"]
+        self.assertEqual(facets["categories"], [])
+        self.assertEqual(facets["locations"], [])
+
+        facets = client.get(reverse("search"), {"query": "cedar"}).data["facets"]
+        self.assertEqual(
+            facets["categories"], [{"id": hiking.pk, "name": "Hiking", "count": 2}]
+        )
+        self.assertEqual(
+            [(facet["name"], facet["count"]) for facet in facets["locations"]],
+            [("Beirut", 3), ("Byblos", 1)],
+        )
+
+        response = client.get(reverse("search"), {"query": "cedar", "date": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SEARCH_BACKEND="search.backends.LikeBackend")
+    def test_filters_and_facets_like_backend(self):
+        self.test_filters_and_facets()
+
+    @override_settings(SEARCH_BACKEND="search.backends.LikeBackend")
+    def test_like_backend(self):
+        activity = self.activity("Wine tasting")
+        tour = self.tour("Batroun", "wine and the old port")
+
+        hits, cursor = search("wine", 1)
+        self.assertEqual(hits, [("activity", activity.pk)])
+        self.assertEqual(search("wine", 1, cursor)[0], [("tour", tour.pk)])
+        with self.assertRaises(ValueError):
+            search("wine", 1, [1])
+
+
+class SuggestionTests(TestCase):
+    def setUp(self):
+        self.location = Location.objects.create(name="Chouf")
+        self.category = Category.objects.create(name="Hiking")
+        self.activity = make_activity(
+            make_supplier(), "Hike in the Cèdres", self.location
+        )
+
+    def labels(self, prefix, limit=10):
+        return [(item["type"], item["label"]) for item in suggest(prefix, limit)]
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(
+            self.labels("hik"),
+            [("activity", "Hike in the Cèdres"), ("category", "Hiking")],
+        )
+        # case and accents don't matter, neither does the word position
+        self.assertEqual(self.labels("CEDR"), [("activity", "Hike in the Cèdres")])
+        self.assertEqual(self.labels("the ced"), [("activity", "Hike in the Cèdres")])
+        self.assertEqual(self.labels("ch"), [("location", "Chouf")])
+        self.assertEqual(self.labels("  "), [])
+        self.assertEqual(len(self.labels("hi", limit=1)), 1)
+
+    def test_suggestions_follow_changes(self):
+        self.activity.title = "Snowshoeing"
+        self.activity.save()
+        self.location.name = "Shouf"
+        self.location.save()
+        self.category.delete()
+
+        self.assertEqual(self.labels("hi"), [])
+        self.assertEqual(
+            self.labels("s"), [("location", "Shouf"), ("activity", "Snowshoeing")]
+        )
+
+    def test_endpoint(self):
+        response = APIClient().get(
+            reverse("search_suggestions"), {"query": "hi", "limit": "x"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["query"], "hi")
+        self.assertEqual(
+            response.data["suggestions"][0],
+            {"type": "activity", "id": self.activity.pk, "label": "Hike in the Cèdres"},
+        )
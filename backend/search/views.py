@@ -0,0 +1,20 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .suggest import suggest
+
+SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+
+
+# search as you type, only labels so every keystroke stays cheap
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def suggestions(request):
+    try:
+        limit = int(request.GET.get("limit", SUGGESTIONS))
+    except ValueError:
+        limit = SUGGESTIONS
+    limit = min(max(limit, 1), MAX_SUGGESTIONS)
+    query = request.GET.get("query", "")
+    return Response({"query": query, "suggestions": suggest(query, limit)})
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from activities.slots import lazy_availability
 from .models import (
     Tour,
     TourDay,
@@ -54,7 +55,7 @@ class TourAdmin(admin.ModelAdmin):
 
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
-        if not change:
+        if not change and not lazy_availability():
             form.instance.create_tour_days()
 
 
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:35
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def dedupe_tour_days(apps, schema_editor):
+    # a day stored twice for the same offer keeps its first row with the
+    # lowest stock of the two, the bookings of the others move to it
+    TourDay = apps.get_model("tours", "TourDay")
+    TourBooking = apps.get_model("booking", "TourBooking")
+    duplicates = (
+        TourDay.objects.order_by()
+        .values("tour_offer", "day")
+        .annotate(count=Count("pk"), keep=Min("pk"), stock=Min("stock"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        others = TourDay.objects.filter(
+            tour_offer=row["tour_offer"], day=row["day"]
+        ).exclude(pk=row["keep"])
+        TourBooking.objects.filter(tourday__in=others).update(tourday=row["keep"])
+        others.delete()
+        TourDay.objects.filter(pk=row["keep"]).update(stock=row["stock"])
+
+
+class Migration(migrations.Migration):
+    # the rows are merged in their own transaction, Postgres refuses to
+    # alter a table with pending foreign key checks
+    atomic = False
+
+    dependencies = [
+        ('tours', '0002_initial'),
+        ('booking', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            dedupe_tour_days, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AlterUniqueTogether(
+            name='tourday',
+            unique_together={('tour_offer', 'day')},
+        ),
+    ]
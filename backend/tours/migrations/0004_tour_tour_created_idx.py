@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        ("location", "0001_initial"),
+        ("tours", "0003_alter_tourday_unique_together"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tour",
+            index=models.Index(fields=["created_at", "id"], name="tour_created_idx"),
+        ),
+    ]
@@ -3,6 +3,7 @@ from categories.models import Category
 from users.models import Supplier
 from location.models import Location
 from datetime import timedelta
+from activities.slots import is_open_day, iter_open_days
 
 class Tour(models.Model):
     featured = models.BooleanField(default=False)
@@ -53,6 +54,7 @@ class Tour(models.Model):
 
     class Meta:
         verbose_name_plural = "tours"
+        indexes = [models.Index(fields=["created_at", "id"], name="tour_created_idx")]
 
 
 class TourOffer(models.Model):
@@ -64,12 +66,41 @@ class TourOffer(models.Model):
     def __str__(self):
         return f"{self.tour.title} - {self.title}"
 
+    def get_tour_days(self):
+        """
+        Tour days computed from the tour rules, the stored rows (booked or
+        with an overridden stock) take the place of their day.
+        """
+        tour = self.tour
+        tour_days = {tour_day.day: tour_day for tour_day in self.tourday_set.all()}
+        for day in iter_open_days(tour.available_from, tour.available_to, tour.days_off):
+            tour_days.setdefault(day, TourDay(day=day, stock=self.stock, tour_offer=self))
+        return sorted(tour_days.values(), key=lambda tour_day: tour_day.day)
+
+    def get_or_create_tour_day(self, day):
+        """
+        Store the tour day so it can be booked, raises TourDay.DoesNotExist
+        if the day is not part of the tour rules.
+        """
+        tour = self.tour
+        if not is_open_day(
+            day, tour.available_from, tour.available_to, tour.days_off
+        ) and not self.tourday_set.filter(day=day).exists():
+            raise TourDay.DoesNotExist
+        tour_day, _ = TourDay.objects.get_or_create(
+            day=day, tour_offer=self, defaults={"stock": self.stock}
+        )
+        return tour_day
+
 
 class TourDay(models.Model):
     day = models.DateField()
     stock = models.IntegerField()
     tour_offer = models.ForeignKey(TourOffer, on_delete=models.CASCADE)
 
+    class Meta:
+        unique_together = ("tour_offer", "day")
+
     def __str__(self):
         return f"{self.tour_offer.tour.title} - {self.day}"
 
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db.models import Min
 from .models import (
     Tour,
     TourDay,
@@ -10,6 +11,7 @@ from .models import (
     TourOffer,
 )
 from location.serializers import LocationSerializer
+from api.query_plan import QueryPlanMixin
 
 
 class IncludedSerializer(serializers.ModelSerializer):
@@ -62,7 +64,7 @@ class OffTourSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class TourOfferSerializer(serializers.ModelSerializer):
+class TourOfferSerializer(QueryPlanMixin, serializers.ModelSerializer):
     tour = OffTourSerializer()
 
     class Meta:
@@ -70,7 +72,7 @@ class TourOfferSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "price", "stock", "tour"]
 
 
-class TourSerializer(serializers.ModelSerializer):
+class TourSerializer(QueryPlanMixin, serializers.ModelSerializer):
     included_items = IncludedSerializer(
         many=True, read_only=True, source="included_set"
     )
@@ -97,3 +99,34 @@ class TourDaySerializer(serializers.ModelSerializer):
     class Meta:
         model = TourDay
         fields = "__all__"
+
+
+# what a tour card shows in the listings
+class TourListSerializer(QueryPlanMixin, serializers.ModelSerializer):
+    location = LocationSerializer()
+    min_offer_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Tour
+        fields = [
+            "id",
+            "title",
+            "image",
+            "price",
+            "location",
+            "featured",
+            "available_to",
+            "unit",
+            "categories",
+            "min_offer_price",
+        ]
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        return (
+            super()
+            .setup_queryset(queryset)
+            .annotate(min_offer_price=Min("tour_offer__price"))
+        )
@@ -1,3 +1,34 @@
-from django.test import TestCase
+from datetime import date
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api.testing import make_supplier, make_tour
+from .models import TourOffer, TourDay
 
-# Create your tests here.
+
+class AvailabilityModeTests(TestCase):
+    def tour_days(self, offer):
+        url = reverse("get_tour_days", kwargs={"tour_offer_id": offer.pk})
+        days = [(day["day"], day["stock"]) for day in APIClient().get(url).data]
+        return sorted(days)
+
+    def test_lazy_days_match_the_stored_ones(self):
+        tour = make_tour(
+            make_supplier(),
+            available_from=date(2024, 1, 1),
+            available_to=date(2024, 1, 14),
+            days_off="saturday, sunday",
+        )
+        offer = TourOffer.objects.create(tour=tour, title="Standard", price=10, stock=8)
+
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            lazy = self.tour_days(offer)
+        tour.create_tour_days()
+
+        self.assertEqual(lazy, self.tour_days(offer))
+        self.assertEqual(len(lazy), 10)
+        # a stored day with less stock takes the place of its computed one
+        TourDay.objects.filter(day=date(2024, 1, 2)).update(stock=3)
+        stored = self.tour_days(offer)
+        with override_settings(AVAILABILITY_MODE="lazy"):
+            self.assertEqual(self.tour_days(offer), stored)
@@ -1,18 +1,27 @@
-from .models import Tour, TourDay, TourOffer
-from .serializers import TourSerializer, TourDaySerializer
+from .models import Tour, TourOffer
+from .serializers import (
+    TourSerializer,
+    TourListSerializer,
+    TourOfferSerializer,
+    TourDaySerializer,
+)
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from django.utils import timezone
+from activities.slots import lazy_availability
+from api.filters import filtered_response
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_tours(request):
     current_time = timezone.now()
-    packages = Tour.objects.filter(available_to__gte=current_time)[:20]
-    serializer = TourSerializer(packages, many=True)
+    packages = TourListSerializer.setup_queryset(
+        Tour.objects.filter(available_to__gte=current_time)
+    )[:20]
+    serializer = TourListSerializer(packages, many=True)
     return Response(serializer.data)
 
 
@@ -21,14 +30,13 @@ def get_tours(request):
 def get_all_tours(request):
     current_time = timezone.now()
     packages = Tour.objects.filter(available_to__gte=current_time)
-    serializer = TourSerializer(packages, many=True)
-    return Response(serializer.data)
+    return filtered_response(request, packages, TourListSerializer)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_tour(request, pk):
-    package = Tour.objects.get(pk=pk)
+    package = TourSerializer.setup_queryset(Tour.objects).get(pk=pk)
     serializer = TourSerializer(package)
     return Response(serializer.data)
 
@@ -37,8 +45,13 @@ def get_tour(request, pk):
 @permission_classes([AllowAny])
 def get_tour_days(request, tour_offer_id):
     try:
-        tour_offer = TourOffer.objects.get(pk=tour_offer_id)
-        tour_days = TourDay.objects.filter(tour_offer=tour_offer)
+        tour_offer = TourOfferSerializer.setup_queryset(TourOffer.objects).get(
+            pk=tour_offer_id
+        )
+        if lazy_availability():
+            tour_days = tour_offer.get_tour_days()
+        else:
+            tour_days = tour_offer.tourday_set.all()
         serializer = TourDaySerializer(tour_days, many=True)
         return Response(serializer.data)
     except TourOffer.DoesNotExist:
@@ -26,7 +26,14 @@ const ActivityDetails = () => {
 
     const handleBooking = async () => {
         try {
-            const data = { period_id: selectedPeriod.id, quantity };
+            // computed periods have no id yet, they are stored on booking
+            const data = {
+                period_id: selectedPeriod.id,
+                offer_id: selectedPeriod.activity_offer.id,
+                day: selectedPeriod.day,
+                time_from: selectedPeriod.time_from,
+                quantity,
+            };
             const response = await api.post('/api/bookingactivity/', data);
             if (response.data) {
                 navigate("/");
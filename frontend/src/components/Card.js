@@ -14,7 +14,12 @@ const Card = ({ item, onClick }) => (
         <p className="card-to"><FaClock className='card-icon'/> Available till {item.available_to}</p>
         {/* <p className="card-category"><FaTag className='card-icon'/> {item.categories.map(cat => cat.name).join(', ')}</p> */}
       </div>
-      <div className="card-price"><FaDollarSign /> {item.offers[0].price} <span>per {item.unit}</span></div>
+      {/* min_offer_price is null until the item has an offer */}
+      {item.min_offer_price != null ? (
+        <div className="card-price"><FaDollarSign /> {item.min_offer_price} <span>per {item.unit}</span></div>
+      ) : (
+        <div className="card-price"><span>No offers yet</span></div>
+      )}
     </div>
   </div>
 );
@@ -7,7 +7,8 @@ import {
   Card,
   CardContent,
   CardHeader,
-  Alert
+  Alert,
+  Button
 } from '@mui/material';
 import {
   FaDollarSign,
@@ -30,6 +31,7 @@ const Bookings = () => {
   const [activityBookings, setActivityBookings] = useState([]);
   const [packageBookings, setPackageBookings] = useState([]);
   const [tourBookings, setTourBookings] = useState([]);
+  const [nextPages, setNextPages] = useState({});
   const today = new Date();
 
   const isBookingStillValid = (bookingDay) => {
@@ -44,9 +46,14 @@ const Bookings = () => {
         const packagesResponse = await api.get('/api/customer/packagesb/');
         const toursResponse = await api.get('/api/customer/toursb/');
 
-        setActivityBookings(activitiesResponse.data);
-        setPackageBookings(packagesResponse.data);
-        setTourBookings(toursResponse.data);
+        setActivityBookings(activitiesResponse.data.results);
+        setPackageBookings(packagesResponse.data.results);
+        setTourBookings(toursResponse.data.results);
+        setNextPages({
+          activities: activitiesResponse.data.next,
+          packages: packagesResponse.data.next,
+          tours: toursResponse.data.next
+        });
       } catch (err) {
         setError(err);
       } finally {
@@ -57,6 +64,29 @@ const Bookings = () => {
     fetchBookings();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      // each list pages on its own, follow whichever still has a next page
+      const [activitiesResponse, packagesResponse, toursResponse] = await Promise.all([
+        nextPages.activities ? api.get(nextPages.activities) : null,
+        nextPages.packages ? api.get(nextPages.packages) : null,
+        nextPages.tours ? api.get(nextPages.tours) : null
+      ]);
+      if (activitiesResponse) setActivityBookings([...activityBookings, ...activitiesResponse.data.results]);
+      if (packagesResponse) setPackageBookings([...packageBookings, ...packagesResponse.data.results]);
+      if (toursResponse) setTourBookings([...tourBookings, ...toursResponse.data.results]);
+      setNextPages({
+        activities: activitiesResponse ? activitiesResponse.data.next : null,
+        packages: packagesResponse ? packagesResponse.data.next : null,
+        tours: toursResponse ? toursResponse.data.next : null
+      });
+    } catch (err) {
+      setError(err);
+    }
+  };
+
+  const hasMore = nextPages.activities || nextPages.packages || nextPages.tours;
+
   if (loading) return <Container className="container"><CircularProgress /></Container>;
   if (error) return <Container className="container"><Alert severity="error">Error loading bookings: {error.message}</Alert></Container>;
 
@@ -149,10 +179,10 @@ const Bookings = () => {
                 <Typography variant="body1" className={`booking-status ${booking.confirmed ? 'confirmed' : 'not-confirmed'}`}>
                   {booking.confirmed ? <><FaCheck className="icon-inline" /> Confirmed</> : <><FaTimes className="icon-inline" /> Not confirmed</>}
                 </Typography>
-                {booking.confirmed && booking.qr_code && (
+                {booking.confirmed && booking.qr_code_url && (
                   <div>
                     <Typography variant="body2"><FaQrcode className="icon-inline" /> QR Code:</Typography>
-                    <img src={`${MainUrl}${booking.qr_code}`} alt="QR Code" className="qr-code" />
+                    <img src={`${MainUrl}${booking.qr_code_url}`} alt="QR Code" className="qr-code" />
                   </div>
                 )}
               </CardContent>
@@ -190,6 +220,11 @@ const Bookings = () => {
             </CardContent>
           </Card>
         </Grid>
+        {hasMore && (
+          <Grid item>
+            <Button onClick={loadMore}>Load More</Button>
+          </Grid>
+        )}
       </Grid>
     </Container>
   );
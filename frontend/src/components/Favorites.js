@@ -5,14 +5,17 @@ import Card from "./Card";
 import "./Favorites.css";
 
 const Favorites = () => {
-    const [favorites, setFavorites] = useState({ activities: [], tours: [], packages: [] });
+    const [favorites, setFavorites] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
     const navigate = useNavigate();
 
     useEffect(() => {
         const fetchFavorites = async () => {
             try {
                 const response = await api.get('/api/all-favorites/');
-                setFavorites(response.data);
+                // the first page, newest first
+                setFavorites(response.data.results);
+                setNextPage(response.data.next);
             } catch (error) {
                 console.error("Failed to fetch favorites", error);
             }
@@ -21,6 +24,16 @@ const Favorites = () => {
         fetchFavorites();
     }, []);
 
+    const loadMore = async () => {
+        try {
+            const response = await api.get(nextPage);
+            setFavorites([...favorites, ...response.data.results]);
+            setNextPage(response.data.next);
+        } catch (error) {
+            console.error("Failed to fetch favorites", error);
+        }
+    };
+
     const handleCardClick = (id, type) => {
         navigate(`/${type}-details/${id}`);
     };
@@ -29,16 +42,11 @@ const Favorites = () => {
         <div className="favorites-container">
             <h1>My Favorites</h1>
             <div className="favorites-list">
-                {favorites.activities.map((fav) => (
-                    <Card key={fav.activity.id} item={fav.activity} onClick={() => handleCardClick(fav.activity.id, 'activity')} />
-                ))}
-                {favorites.tours.map((fav) => (
-                    <Card key={fav.tour.id} item={fav.tour} onClick={() => handleCardClick(fav.tour.id, 'tour')} />
-                ))}
-                {favorites.packages.map((fav) => (
-                    <Card key={fav.package.id} item={fav.package} onClick={() => handleCardClick(fav.package.id, 'package')} />
+                {favorites.map((item) => (
+                    <Card key={`${item.type}-${item.id}`} item={item} onClick={() => handleCardClick(item.id, item.type)} />
                 ))}
             </div>
+            {nextPage && <button onClick={loadMore}>Load More</button>}
         </div>
     );
 };
@@ -88,14 +88,8 @@ const MainPage = () => {
         <div className="section">
           <h1 className="section-title">Recommended</h1>
           <div className="scrollable-row">
-            {forYouItems.activities?.map((activity) => (
-              <Card key={activity.id} item={activity} onClick={() => handleCardClick(activity.id, 'activity')} />
-            ))}
-            {forYouItems.packages?.map((pkg) => (
-              <Card key={pkg.id} item={pkg} onClick={() => handleCardClick(pkg.id, 'package')} />
-            ))}
-            {forYouItems.tours?.map((tour) => (
-              <Card key={tour.id} item={tour} onClick={() => handleCardClick(tour.id, 'tour')} />
+            {forYouItems.results?.map((item) => (
+              <Card key={`${item.type}-${item.id}`} item={item} onClick={() => handleCardClick(item.id, item.type)} />
             ))}
           </div>
         </div>
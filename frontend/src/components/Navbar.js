@@ -13,7 +13,7 @@ import Badge from '@mui/material/Badge';
 import NotificationsIcon from '@mui/icons-material/Notifications';
 import { FaSearch } from 'react-icons/fa';
 import AuthPopup from './AuthPopup';
-import api from '../services/api.js';
+import api, { MainUrl } from '../services/api.js';
 import { useNavigate } from 'react-router-dom';
 import './Navbar.css';
 
@@ -34,17 +34,41 @@ const Navbar = () => {
     const storedUsername = localStorage.getItem('username');
     if (storedUsername) {
       setLoggedInUser(storedUsername);
-      fetchNotifications();
+      let stream = null;
+      let closed = false;
+      fetchNotifications().then(newest => {
+        if (closed) return;
+        // new notifications are pushed by the server instead of polled, the
+        // ones created since the fetch are sent first
+        const token = localStorage.getItem('token');
+        const after = newest === null ? '' : `&after=${newest}`;
+        stream = new EventSource(`${MainUrl}/api/notifications/stream/?token=${token}${after}`);
+        stream.onmessage = (event) => {
+          const notification = JSON.parse(event.data);
+          setNotifications(current => [notification, ...current.filter(n => n.id !== notification.id)]);
+          setUnreadCount(count => count + 1);
+        };
+      });
+      return () => {
+        closed = true;
+        if (stream) stream.close();
+      };
     }
   }, []);
 
+  // returns the id of the newest notification fetched, 0 without any and
+  // null when the fetch failed
   const fetchNotifications = async () => {
     try {
       const response = await api.get('/api/notifications/');
-      setNotifications(response.data);
-      setUnreadCount(response.data.filter(notification => !notification.read).length);
+      // only the newest page, the notifications page loads the rest
+      setNotifications(response.data.results);
+      const unread = await api.get('/api/notifications/unread/');
+      setUnreadCount(unread.data.unread);
+      return Math.max(0, ...response.data.results.map(notification => notification.id));
     } catch (error) {
       console.error('Error fetching notifications:', error);
+      return null;
     }
   };
 
@@ -92,13 +116,11 @@ const Navbar = () => {
   const handleNotificationOpen = async (event) => {
     setNotificationAnchorEl(event.currentTarget);
 
-    // Mark notifications as read
+    // Mark notifications as read, all of them in one request
     try {
-      const unreadNotifications = notifications.filter(notification => !notification.read);
-      for (const notification of unreadNotifications) {
-        await api.put(`/api/readnotification/${notification.id}/`);
-      }
-      fetchNotifications();  // Fetch notifications again to update the state
+      await api.post('/api/notifications/read/', { all: true });
+      setNotifications(current => current.map(notification => ({ ...notification, read: true })));
+      setUnreadCount(0);
     } catch (error) {
       console.error('Error marking notifications as read:', error);
     }
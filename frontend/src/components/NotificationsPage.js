@@ -3,6 +3,7 @@ import { styled } from '@mui/system';
 import Typography from '@mui/material/Typography';
 import Container from '@mui/material/Container';
 import Paper from '@mui/material/Paper';
+import Button from '@mui/material/Button';
 import api from '../services/api.js';
 import {useNavigate} from "react-router-dom";
 
@@ -18,6 +19,7 @@ const TimeText = styled(Typography)({
 
 const NotificationsPage = () => {
   const [notifications, setNotifications] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const navigate = useNavigate();
 
     const handleNotfClick = () =>{
@@ -27,7 +29,8 @@ const NotificationsPage = () => {
     const fetchNotifications = async () => {
       try {
         const response = await api.get('/api/notifications/');
-        setNotifications(response.data);
+        setNotifications(response.data.results);
+        setNextPage(response.data.next);
       } catch (error) {
         console.error('Error fetching notifications:', error);
       }
@@ -36,6 +39,16 @@ const NotificationsPage = () => {
     fetchNotifications();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      const response = await api.get(nextPage);
+      setNotifications([...notifications, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error('Error fetching notifications:', error);
+    }
+  };
+
   return (
     <Container maxWidth="md">
       <Typography variant="h4" gutterBottom>
@@ -47,6 +60,7 @@ const NotificationsPage = () => {
           <TimeText variant="body2">{new Date(notification.created_at).toLocaleString()}</TimeText>
         </NotificationPaper>
       ))}
+      {nextPage && <Button onClick={loadMore}>Load More</Button>}
     </Container>
   );
 };
@@ -1,7 +1,8 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
 import PostService from '../services/PostService';
-import { Card, CardContent, Typography, CardMedia } from '@mui/material';
+import axios from 'axios';
+import { Card, CardContent, Typography, CardMedia, Button } from '@mui/material';
 import EventIcon from '@mui/icons-material/Event';
 import PersonIcon from '@mui/icons-material/Person';
 import CategoryIcon from '@mui/icons-material/Category';
@@ -9,13 +10,22 @@ import './PostList.css';  // Import the CSS file
 
 const PostList = () => {
   const [posts, setPosts] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
 
   useEffect(() => {
     PostService.getPosts().then((response) => {
-      setPosts(response.data);
+      setPosts(response.data.results);
+      setNextPage(response.data.next);
     });
   }, []);
 
+  const loadMore = () => {
+    axios.get(nextPage).then((response) => {
+      setPosts([...posts, ...response.data.results]);
+      setNextPage(response.data.next);
+    });
+  };
+
   return (
     <div>
       <div className="banner">
@@ -63,6 +73,7 @@ const PostList = () => {
             </Card>
           ))}
         </div>
+        {nextPage && <Button onClick={loadMore}>Load More</Button>}
       </div>
     </div>
   );
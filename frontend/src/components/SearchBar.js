@@ -8,6 +8,7 @@ import { useNavigate } from "react-router-dom";
 const SearchBar = () => {
     const [searchResults, setSearchResults] = useState(null);
     const [query, setQuery] = useState('');
+    const [suggestions, setSuggestions] = useState([]);
     const navigate = useNavigate();
 
     const handleSearch = async () => {
@@ -26,6 +27,33 @@ const SearchBar = () => {
         }
     };
 
+    const handleQueryChange = async (value) => {
+        setQuery(value);
+        if (!value.trim()) {
+            setSuggestions([]);
+            return;
+        }
+        try {
+            const response = await api.get(`/api/search/suggestions/?query=${encodeURIComponent(value)}`);
+            setSuggestions(response.data.suggestions);
+        } catch (error) {
+            console.error('Error during fetch:', error);
+        }
+    };
+
+    // results are ordered by relevance, the next page continues the list
+    const loadMore = async () => {
+        try {
+            const response = await api.get(searchResults.next);
+            setSearchResults({
+                next: response.data.next,
+                results: [...searchResults.results, ...response.data.results],
+            });
+        } catch (error) {
+            console.error('Error during fetch:', error);
+        }
+    };
+
   const handleCardClick = (id, type) => {
     navigate(`/${type}-details/${id}`);
   };
@@ -40,8 +68,14 @@ const SearchBar = () => {
                         placeholder="Search for activities, locations, tours and ideas"
                         className="search-input"
                         value={query}
-                        onChange={(e) => setQuery(e.target.value)}
+                        onChange={(e) => handleQueryChange(e.target.value)}
+                        list="search-suggestions"
                     />
+                    <datalist id="search-suggestions">
+                        {suggestions.map(suggestion => (
+                            <option key={`${suggestion.type}-${suggestion.id}`} value={suggestion.label} />
+                        ))}
+                    </datalist>
                     <button className="search-button" onClick={handleSearch}>
                         <FaSearch />
                     </button>
@@ -51,15 +85,10 @@ const SearchBar = () => {
             <div >
                 {searchResults ? (
                     <div className="search-results-container">
-                {searchResults.activities ? searchResults.activities.map(activity => (
-                  <Card key={activity.id} item={activity} onClick={() => handleCardClick(activity.id, 'activity')} />
-                )): "no activities"}
-                {searchResults.packages ? searchResults.packages.map(pkg => (
-                  <Card key={pkg.id} item={pkg} onClick={() => handleCardClick(pkg.id, 'package')} />
-                )): "no packages"}
-                {searchResults.tours ? searchResults.tours.map(tour => (
-                  <Card key={tour.id} item={tour} onClick={() => handleCardClick(tour.id, 'tour')} />
-                )): "no tours"}
+                {searchResults.results.length ? searchResults.results.map(item => (
+                  <Card key={`${item.type}-${item.id}`} item={item} onClick={() => handleCardClick(item.id, item.type)} />
+                )): "no results"}
+                {searchResults.next && <button className="search-button" onClick={loadMore}>Load More</button>}
                     </div>
                 ): 
                 <br />}
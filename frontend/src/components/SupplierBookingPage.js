@@ -24,6 +24,9 @@ const SupplierBookingPage = () => {
     const [tourBookings, setTourBookings] = useState([]);
     const [dashboardData, setDashboardData] = useState(null);
     const [filter, setFilter] = useState('all');
+    const [arrivals, setArrivals] = useState([]);
+    const [nextArrivals, setNextArrivals] = useState(null);
+    const [nextPages, setNextPages] = useState({});
 
     const fetchBookings = async () => {
         try {
@@ -32,10 +35,17 @@ const SupplierBookingPage = () => {
             const toursResponse = await api.get('/api/supplier/toursb/');
             const dashboardResponse = await api.get('/api/supplier-dashboard');
             
-            setActivityBookings(activitiesResponse.data);
-            setPackageBookings(packagesResponse.data);
-            setTourBookings(toursResponse.data);
+            setActivityBookings(activitiesResponse.data.results);
+            setPackageBookings(packagesResponse.data.results);
+            setTourBookings(toursResponse.data.results);
+            setNextPages({
+                activity: activitiesResponse.data.next,
+                package: packagesResponse.data.next,
+                tour: toursResponse.data.next,
+            });
             setDashboardData(dashboardResponse.data);
+            setArrivals(dashboardResponse.data.upcoming_arrivals.results);
+            setNextArrivals(dashboardResponse.data.upcoming_arrivals.next);
         } catch (err) {
             setError(err);
         } finally {
@@ -47,6 +57,32 @@ const SupplierBookingPage = () => {
         fetchBookings();
     }, []);
 
+    const loadMoreArrivals = async () => {
+        try {
+            const response = await api.get(nextArrivals);
+            setArrivals([...arrivals, ...response.data.results]);
+            setNextArrivals(response.data.next);
+        } catch (err) {
+            setError(err);
+        }
+    };
+
+    const loadMoreBookings = async (type) => {
+        const lists = {
+            activity: [activityBookings, setActivityBookings],
+            package: [packageBookings, setPackageBookings],
+            tour: [tourBookings, setTourBookings],
+        };
+        const [bookings, setBookings] = lists[type];
+        try {
+            const response = await api.get(nextPages[type]);
+            setBookings([...bookings, ...response.data.results]);
+            setNextPages({ ...nextPages, [type]: response.data.next });
+        } catch (err) {
+            setError(err);
+        }
+    };
+
     const handleConfirm = async (type, bookingId) => {
         try {
             let endpoint = '';
@@ -185,17 +221,18 @@ const SupplierBookingPage = () => {
                         <Card className="summary-card">
                             <CardContent>
                                 <Typography variant="h5" component="h2">
-                                    <FaUser className="icon-inline" /> Today's Customers:
+                                    <FaUser className="icon-inline" /> Arriving in the next 24 hours:
                                 </Typography>
-                                {dashboardData.todays_customers.length > 0 ? (
-                                    dashboardData.todays_customers.map((customer, index) => (
-                                        <Typography key={index} variant="body1">
-                                            {customer[0]} at {new Date(customer[1]).toLocaleTimeString()}
+                                {arrivals.length > 0 ? (
+                                    arrivals.map(arrival => (
+                                        <Typography key={`${arrival.type}-${arrival.booking_id}`} variant="body1">
+                                            {arrival.customer.username} ({arrival.quantity}) for {arrival.title} at {new Date(arrival.arrives_at).toLocaleString()}
                                         </Typography>
                                     ))
                                 ) : (
-                                    <Typography variant="body1">No customers today.</Typography>
+                                    <Typography variant="body1">No customers arriving.</Typography>
                                 )}
+                                {nextArrivals && <Button onClick={loadMoreArrivals}>Load More</Button>}
                             </CardContent>
                         </Card>
                     </Grid>
@@ -223,6 +260,7 @@ const SupplierBookingPage = () => {
                         <CardHeader title={<><FaBookmark className="icon-inline" /> Activity Bookings</>} />
                         <CardContent>
                             {renderBookingList(activityBookings, 'activity')}
+                            {nextPages.activity && <Button onClick={() => loadMoreBookings('activity')}>Load More</Button>}
                         </CardContent>
                     </Card>
                 </Grid>
@@ -231,6 +269,7 @@ const SupplierBookingPage = () => {
                         <CardHeader title={<><FaBoxOpen className="icon-inline" /> Package Bookings</>} />
                         <CardContent>
                             {renderBookingList(packageBookings, 'package')}
+                            {nextPages.package && <Button onClick={() => loadMoreBookings('package')}>Load More</Button>}
                         </CardContent>
                     </Card>
                 </Grid>
@@ -239,6 +278,7 @@ const SupplierBookingPage = () => {
                         <CardHeader title={<><FaRoute className="icon-inline" /> Tour Bookings</>} />
                         <CardContent>
                             {renderBookingList(tourBookings, 'tour')}
+                            {nextPages.tour && <Button onClick={() => loadMoreBookings('tour')}>Load More</Button>}
                         </CardContent>
                     </Card>
                 </Grid>
@@ -29,6 +29,8 @@ const TourDetails = () => {
                 if (selectedTourDay.stock >= quantity) {
                     const bookingResponse = await api.post("/api/bookingtour/", {
                         tourday_id: selectedTourDay.id,
+                        tour_offer_id: selectedTourDay.tour_offer.id,
+                        day: selectedTourDay.day,
                         quantity,
                     });
                     console.log("Booking successful:", bookingResponse.data);
@@ -23,8 +23,9 @@ const PeriodsDropdown = ({ selectedDate, offerId, setSelectedPeriod, selectedPer
   };
 
   const handlePeriodChange = (event) => {
-    const periodId = event.target.value;
-    const selected = periods.find(period => period.id === parseInt(periodId));
+    // computed periods have no id yet, the start time is unique within a day
+    const timeFrom = event.target.value;
+    const selected = periods.find(period => period.time_from === timeFrom);
     setSelectedPeriod(selected);
   };
 
@@ -35,12 +36,12 @@ const PeriodsDropdown = ({ selectedDate, offerId, setSelectedPeriod, selectedPer
       <TextField
         select
         label="Select Period"
-        value={selectedPeriod?.id || ''}
+        value={selectedPeriod?.time_from || ''}
         onChange={handlePeriodChange}
         fullWidth
       >
         {periods.map((period) => (
-          <MenuItem key={period.id} value={period.id}>
+          <MenuItem key={period.time_from} value={period.time_from}>
             from {period.time_from} till {period.time_to} - ${period.activity_offer.price} ({period.stock} available)
           </MenuItem>
         ))}
@@ -7,23 +7,16 @@ import { Checkbox, FormControlLabel, FormGroup, Button, Select, MenuItem, InputL
 
 const AllActivities = () => {
   const [activities, setActivities] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [categories, setCategories] = useState([]);
   const [locations, setLocations] = useState([]);
   const [selectedCategories, setSelectedCategories] = useState([]);
   const [selectedLocation, setSelectedLocation] = useState(0);
   const [showAllCategories, setShowAllCategories] = useState(false);
+  const [facets, setFacets] = useState({ categories: [], locations: [] });
   const navigate = useNavigate();
 
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const activitiesResponse = await api.get('/api/all-activities/');
-        setActivities(activitiesResponse.data);
-      } catch (error) {
-        console.error('Failed to fetch data', error);
-      }
-    };
-
     const fetchCategories = async () => {
       try {
         const categoriesResponse = await api.get('/api/categories/');
@@ -44,11 +37,43 @@ const AllActivities = () => {
       }
     };
 
-    fetchData();
     fetchCategories();
     fetchLocations();
   }, []);
 
+  // the filtering happens on the server, every change fetches the first page
+  useEffect(() => {
+    const fetchData = async () => {
+      const params = {};
+      if (selectedCategories.length > 0 && selectedCategories.length < categories.length) {
+        params.categories = selectedCategories.join(',');
+      }
+      if (selectedLocation !== 0) {
+        params.locations = selectedLocation;
+      }
+      try {
+        const activitiesResponse = await api.get('/api/all-activities/', { params });
+        setActivities(activitiesResponse.data.results);
+        setNextPage(activitiesResponse.data.next);
+        setFacets(activitiesResponse.data.facets);
+      } catch (error) {
+        console.error('Failed to fetch data', error);
+      }
+    };
+
+    fetchData();
+  }, [selectedCategories, selectedLocation, categories.length]);
+
+  const loadMore = async () => {
+    try {
+      const response = await api.get(nextPage);
+      setActivities([...activities, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error('Failed to fetch data', error);
+    }
+  };
+
   const handleCardClick = (id) => {
     navigate(`/activity-details/${id}`);
   };
@@ -67,19 +92,11 @@ const AllActivities = () => {
     setSelectedLocation(selectedLocationId);
   };
 
-  const filteredActivities = activities.filter(item => {
-    // Filter by selected categories
-    if (selectedCategories.length > 0 && !selectedCategories.some(id => item.categories.includes(id))) {
-      return false;
-    }
-
-    // Filter by selected location
-    if (selectedLocation !== 0 && item.location.id !== selectedLocation) {
-      return false;
-    }
-
-    return true;
-  });
+  // number of items a category or location gives, next to its name
+  const withCount = (facetList, option) => {
+    const facet = facetList.find(facet => facet.id === option.id);
+    return `${option.name} (${facet ? facet.count : 0})`;
+  };
 
   return (
     <div className="container">
@@ -98,7 +115,7 @@ const AllActivities = () => {
                     value={category.id}
                   />
                 }
-                label={category.name}
+                label={withCount(facets.categories, category)}
               />
             ))}
           </FormGroup>
@@ -116,17 +133,18 @@ const AllActivities = () => {
             >
               <MenuItem value={0}>All Locations</MenuItem>
               {locations.map(location => (
-                <MenuItem key={location.id} value={location.id}>{location.name}</MenuItem>
+                <MenuItem key={location.id} value={location.id}>{withCount(facets.locations, location)}</MenuItem>
               ))}
             </Select>
           </FormControl>
         </div>
       </div>
       <div className="scrollable-row">
-        {filteredActivities.map(item => (
+        {activities.map(item => (
           <Card key={item.id} item={item} onClick={() => handleCardClick(item.id)} />
         ))}
       </div>
+      {nextPage && <Button onClick={loadMore}>Load More</Button>}
     </div>
   );
 };